@@ -58,6 +58,8 @@ function LoginScreen() {
           if (role === "manager") {
             navigate("/dashboard/manager", { state: { company: data.company } });
           } else {
+            // Form1 Save stores the rendered files under this employee
+            sessionStorage.setItem("employee", JSON.stringify(data.employee));
             navigate("/dashboard/employee", { state: { employee: data.employee } });
           }
         }, 800);
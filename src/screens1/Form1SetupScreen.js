@@ -755,6 +755,91 @@ const countOccurrences = (textArray, value) => {
   }, 0);
 };
 
+// Submit a file as a background extraction job and poll until its result is ready.
+// The server answers 202 while the job is still running.
+const extractViaJob = async (file) => {
+  const fileFormData = new FormData();
+  fileFormData.append('file', file);
+  const { data: job } = await axios.post('http://127.0.0.1:5000/api/jobs/extract-text', fileFormData);
+  for (;;) {
+    const resp = await axios.get(`http://127.0.0.1:5000${job.result_url}`);
+    if (resp.status === 200) return resp.data;
+    await new Promise((resolve) => setTimeout(resolve, 1000));
+  }
+};
+
+// Send every file in one request to /api/extract-text-bulk; the server extracts
+// them concurrently and streams one NDJSON record per file as it finishes.
+// Results come back in upload order; a failed file yields {} instead of failing the batch.
+const extractBulk = async (files) => {
+  const fileFormData = new FormData();
+  files.forEach((file) => fileFormData.append('files', file));
+  const resp = await fetch('http://127.0.0.1:5000/api/extract-text-bulk', { method: 'POST', body: fileFormData });
+  if (!resp.ok || !resp.body) throw new Error(`Bulk extraction failed (${resp.status})`);
+
+  const results = files.map(() => ({}));
+  const reader = resp.body.getReader();
+  const decoder = new TextDecoder();
+  let buffer = '';
+  for (;;) {
+    const { value, done } = await reader.read();
+    if (done) break;
+    buffer += decoder.decode(value, { stream: true });
+    const lines = buffer.split('\n');
+    buffer = lines.pop();
+    lines.filter(Boolean).forEach((line) => {
+      const record = JSON.parse(line);
+      if (record.type !== 'file') return;
+      if (record.status >= 400) console.warn(`Extraction failed for ${record.filename}:`, record.error);
+      else results[record.index] = record;
+    });
+  }
+  return results;
+};
+
+// Fields are extracted and majority-merged on the server (/api/form1/extract-fields).
+// raw=1 also returns the texts: the screen shows them and re-checks edited values against them.
+// Resolves to null when no file yielded text.
+const extractFieldsOnServer = async (files) => {
+  const fileFormData = new FormData();
+  files.forEach((file) => fileFormData.append('files', file));
+  const resp = await axios.post('http://127.0.0.1:5000/api/form1/extract-fields?raw=1', fileFormData,
+    { validateStatus: (status) => status === 200 || status === 422 });
+  if (resp.status === 422) return null;
+  return {
+    formData: resp.data.formData,
+    rawTexts: resp.data.rawTexts,
+    partNameOptions: resp.data.options.partName,
+    serialNumberOptions: resp.data.options.serialNumber,
+  };
+};
+
+// Fallback for older backends: extract the texts, then parse and merge them here.
+const extractFieldsInBrowser = async (files) => {
+  let results;
+  try {
+    results = await extractBulk(files);
+  } catch (bulkErr) {
+    console.warn('Bulk extraction unavailable, using per-file jobs:', bulkErr);
+    results = await Promise.all(files.map(extractViaJob));
+  }
+  const parsedResults = [];
+  const rawTexts = [];
+  results.forEach(({ extracted_text }, i) => {
+    if (extracted_text && extracted_text.trim() !== '') {
+      rawTexts.push({ name: files[i].name, text: extracted_text });
+      parsedResults.push(parseExtractedText(extracted_text));
+    }
+  });
+  if (parsedResults.length === 0) return null;
+  return {
+    formData: mergeParsedData(parsedResults),
+    rawTexts,
+    partNameOptions: Array.from(new Set(parsedResults.map(r => r.partDescription || r.partName).filter(Boolean))),
+    serialNumberOptions: Array.from(new Set(parsedResults.map(r => r.serialNumber).filter(Boolean))),
+  };
+};
+
 export default function Form1SetupScreen() {
   const { files, extractedData, setExtractedData } = useFiles();
   const navigate = useNavigate();
@@ -821,38 +906,23 @@ export default function Form1SetupScreen() {
       if (!files || files.length === 0) return;
       setIsLoading(true);
       setError('');
-      const parsedResults = [];
-      const rawResults = [];
       try {
-        for (const file of files) {
-          const fileFormData = new FormData();
-          fileFormData.append('file', file);
-          const response = await axios.post('http://127.0.0.1:5000/api/extract-text', fileFormData);
-          const { extracted_text } = response.data;
-          if (extracted_text && extracted_text.trim() !== '') {
-            rawResults.push({ name: file.name, text: extracted_text });
-            parsedResults.push(parseExtractedText(extracted_text));
-          }
+        let extracted;
+        try {
+          extracted = await extractFieldsOnServer(files);
+        } catch (fieldsErr) {
+          console.warn('Server-side field extraction unavailable, parsing in the browser:', fieldsErr);
+          extracted = await extractFieldsInBrowser(files);
         }
-        if (parsedResults.length === 0) {
+        if (!extracted) {
           setError('OCR failed to extract any text from the uploaded files.');
         } else {
-          const mergedData = mergeParsedData(parsedResults);
-          setFormData(mergedData);
-          setRawTexts(rawResults);
-          
-          const newPartNameOptions = Array.from(new Set(parsedResults.map(r => r.partDescription || r.partName).filter(Boolean)));
-          const newSerialNumberOptions = Array.from(new Set(parsedResults.map(r => r.serialNumber).filter(Boolean)));
-          setPartNameOptions(newPartNameOptions);
-          setSerialNumberOptions(newSerialNumberOptions);
-
-          setExtractedData({
-            formData: mergedData,
-            rawTexts: rawResults,
-            partNameOptions: newPartNameOptions,
-            serialNumberOptions: newSerialNumberOptions,
-            rows: rows,
-          });
+          setFormData(extracted.formData);
+          setRawTexts(extracted.rawTexts);
+          setPartNameOptions(extracted.partNameOptions);
+          setSerialNumberOptions(extracted.serialNumberOptions);
+
+          setExtractedData({ ...extracted, rows: rows });
         }
       } catch (err) {
         console.error('API Error:', err);
@@ -918,8 +988,14 @@ export default function Form1SetupScreen() {
         formData,
         rows,
       });
-      alert("Form 1 data saved locally!");
       setOpenDialog(false);
+      const employeeId = location.state?.employee?.employee_id
+        || JSON.parse(sessionStorage.getItem("employee") || "{}").employee_id;
+      if (employeeId) {
+        handleServerStore(employeeId);
+      } else {
+        alert("Form 1 data saved locally!");
+      }
     } else if (action === 'next') {
       setExtractedData({
         ...extractedData,
@@ -970,6 +1046,42 @@ export default function Form1SetupScreen() {
     navigate('/');
   };
 
+// Render on the server (/api/form1/render); the jsPDF / SheetJS exports below
+// stay as the fallback when the backend is unreachable.
+const renderPayload = () => ({
+  formData,
+  rows: rows.map((row) => ({ ...row, referenceFile: row.referenceFile ? { name: row.referenceFile.name } : null })),
+});
+
+// Save: with an employee_id the server renders both files and stores them as
+// the employee's next Form1 version (no browser render, no upload).
+const handleServerStore = async (employeeId) => {
+  try {
+    const resp = await axios.post('http://127.0.0.1:5000/api/form1/render', { ...renderPayload(), employee_id: employeeId });
+    alert(`Form 1 saved as version ${resp.data.version} for employee ${employeeId}!`);
+  } catch (err) {
+    console.warn('Storing Form1 on the server failed:', err);
+    alert("Form 1 data saved locally, but the server copy could not be stored.");
+  }
+};
+
+const handleServerExport = async (format) => {
+  try {
+    const payload = { ...renderPayload(), format };
+    const resp = await axios.post('http://127.0.0.1:5000/api/form1/render', payload, { responseType: 'blob' });
+    const url = URL.createObjectURL(resp.data);
+    const link = document.createElement('a');
+    link.href = url;
+    link.download = format === 'pdf' ? 'Form1_FAI_Report.pdf' : 'FAIR_Form1_Report.xlsx';
+    link.click();
+    URL.revokeObjectURL(url);
+  } catch (err) {
+    console.warn('Server-side Form1 export failed, exporting in the browser:', err);
+    if (format === 'pdf') handlePdfExport();
+    else handleExcelExport(formData, rows);
+  }
+};
+
 const handlePdfExport = () => {
     const doc = new jsPDF('p', 'mm', 'a4');
     const marginX = 10;
@@ -2276,7 +2388,7 @@ const handleExcelExport = (formData, rows) => {
     {/* Download Excel */}
     <Button
       variant="outlined"
-      onClick={() => handleExcelExport(formData, rows)}
+      onClick={() => handleServerExport('excel')}
       sx={{ flex: 1, minWidth: 150 }}
     >
       Download Excel
@@ -2287,7 +2399,7 @@ const handleExcelExport = (formData, rows) => {
     {/* Download PDF */}
     <Button
       variant="outlined"
-      onClick={handlePdfExport}
+      onClick={() => handleServerExport('pdf')}
       sx={{ flex: 1, minWidth: 150 }}
     >
       Download PDF
@@ -575,6 +575,8 @@ export default function Form3SetupScreen() {
   // ⬇️ Add this at the top with your other states
 const [ipsFile, setIpsFile] = useState(null);
 const [ipsLoading, setIpsLoading] = useState(false);
+const [cmmLoading, setCmmLoading] = useState(false);
+const [cmmSummary, setCmmSummary] = useState(null);
 
   const [resultsValue, setResultsValue] = useState({});
   const [secondaryResults, setSecondaryResults] = useState({}); // New state for nested values
@@ -771,6 +773,63 @@ useEffect(() => {
     setValues(prev => ({ ...prev, [name]: value }));
   };
 
+  // Form 3 rows -> characteristics for /api/cmm/evaluate (feature = bubble number).
+  // Rows without a bubble number are skipped: cell-char-<row> holds the operation,
+  // not a feature. Returns [rowIndex, characteristic] pairs.
+  const buildCharacteristics = () =>
+    rows.flatMap((_, i) => (values[`cell-bubble-${i}`] ? [[i, {
+      feature_no: values[`cell-bubble-${i}`],
+      type: values[`req-tol-${i}`] || "",
+      nominal: values[`req-sym-nom-${i}`] || values[`req-bilat-nom-${i}`] || "",
+      tol: values[`req-sym-tol-${i}`] || "",
+      high: values[`req-bilat-high-${i}`] || "",
+      low: values[`req-bilat-low-${i}`] || "",
+      upper: values[`req-upper-${i}`] || values[`req-range-up-${i}`] || "",
+      lower: values[`req-lower-${i}`] || values[`req-range-low-${i}`] || "",
+      basic: values[`req-basic-${i}`] || "",
+    }]] : []));
+
+  // CMM report: actuals are matched and checked against tolerance on the server in one request
+  const handleCmmUpload = async (e) => {
+    const file = e.target.files?.[0];
+    e.target.value = "";
+    if (!file) return;
+
+    setCmmLoading(true);
+    try {
+      const pairs = buildCharacteristics();
+      const rowOf = pairs.map(([i]) => i);
+      const formData = new FormData();
+      formData.append("file", file);
+      formData.append("characteristics", JSON.stringify(pairs.map(([, c]) => c)));
+
+      const response = await fetch("http://127.0.0.1:5000/api/cmm/evaluate", {
+        method: "POST",
+        body: formData,
+      });
+      const result = await response.json();
+      if (!response.ok) throw new Error(result.error || `HTTP ${response.status}`);
+
+      // columnar result: one array per column, in the order the characteristics were sent
+      const { actual, status } = result.data;
+      const primary = {};
+      const secondary = {};
+      actual.forEach((value, j) => {
+        if (value === null) return;
+        primary[rowOf[j]] = "Variable";
+        secondary[rowOf[j]] = String(value);
+      });
+      setResultsValue(prev => ({ ...prev, ...primary }));
+      setSecondaryResults(prev => ({ ...prev, ...secondary }));
+      setCmmSummary({ ...result.summary, failed: status.flatMap((s, j) => (s === "fail" ? [rowOf[j] + 1] : [])) });
+    } catch (err) {
+      console.error("CMM evaluation failed", err);
+      setCmmSummary({ error: err.message });
+    } finally {
+      setCmmLoading(false);
+    }
+  };
+
   const handleIpsUpload = async (e) => {
     const file = e.target.files?.[0];
     if (!file) return;
@@ -782,50 +841,48 @@ useEffect(() => {
       const formData = new FormData();
       formData.append("file", file);
   
-      const response = await fetch("http://127.0.0.1:5000/api/extract-text-stream", {
+      // NDJSON frames: start (sheet, columns), rows (one batch each), end (row count) or error
+      const response = await fetch("http://127.0.0.1:5000/api/extract-text-stream?batch=500", {
         method: "POST",
         body: formData,
       });
   
-      if (!response.body) throw new Error("No response body");
+      if (!response.ok || !response.body) throw new Error(`IPS extraction failed (${response.status})`);
   
       const reader = response.body.getReader();
       const decoder = new TextDecoder();
       let buffer = "";
-      let firstBatch = true;
   
       const newRows = [];
-      const newValues = {};
   
-      while (true) {
+      for (;;) {
         const { value, done } = await reader.read();
         if (done) break;
   
         buffer += decoder.decode(value, { stream: true });
+        const lines = buffer.split("\n");
+        buffer = lines.pop(); // incomplete line; wait for more data
   
-        // parse complete JSON objects as they arrive
-        const parts = buffer.split(/}\s*,\s*/);
-        for (let i = 0; i < parts.length - 1; i++) {
-          const chunk = (i === 0 && firstBatch ? parts[i].replace(/^\{"extracted_data":\[/, "") : parts[i]) + "}";
-          firstBatch = false;
-          try {
-            const item = JSON.parse(chunk);
+        const batchValues = {};
+        lines.filter(Boolean).forEach((line) => {
+          const frame = JSON.parse(line);
+          if (frame.type === "error") throw new Error(frame.error);
+          if (frame.type !== "rows") return;
+          frame.rows.forEach((item) => {
             const idx = newRows.length;
             newRows.push({ id: idx + 1 });
-            newValues[`cell-char-${idx}`] = item.operation || "";
-            newValues[`cell-bubble-${idx}`] = item.feature_no || "";
-            newValues[`cell-${idx}-1`] = item.drawing_ref || "";
-            newValues[`req-desc-${idx}`] = item.description || "";
+            batchValues[`cell-char-${idx}`] = item.operation || "";
+            batchValues[`cell-bubble-${idx}`] = item.feature_no || "";
+            batchValues[`cell-${idx}-1`] = item.drawing_ref || "";
+            batchValues[`req-desc-${idx}`] = item.description || "";
+          });
+        });
   
-            // update UI incrementally
-            setRows([...newRows]);
-            setValues(prev => ({ ...prev, ...newValues }));
-          } catch {
-            // incomplete JSON fragment; wait for more data
-          }
+        // update UI once per chunk read, not per row
+        if (Object.keys(batchValues).length) {
+          setRows([...newRows]);
+          setValues(prev => ({ ...prev, ...batchValues }));
         }
-  
-        buffer = parts[parts.length - 1]; // leftover for next loop
       }
     } catch (err) {
       console.error("Streaming upload failed", err);
@@ -1272,6 +1329,20 @@ const textLines = [
     </Typography>
   </Box>
 )}
+<Box mb={3}>
+  <Button variant="outlined" component="label" disabled={cmmLoading || !rows.length}>
+    {cmmLoading ? "Evaluating..." : "Upload CMM Report"}
+    <input type="file" hidden onChange={handleCmmUpload} accept=".xlsx,.xlsm,application/vnd.openxmlformats-officedocument.spreadsheetml.sheet" />
+  </Button>
+  {cmmSummary && (
+    <Typography variant="body2" sx={{ mt: 1, color: cmmSummary.error || cmmSummary.fail ? "red" : "green" }}>
+      {cmmSummary.error
+        ? `CMM evaluation failed: ${cmmSummary.error}`
+        : `Pass: ${cmmSummary.pass}, Fail: ${cmmSummary.fail}, Not measured: ${cmmSummary.missing}, Not checked: ${cmmSummary.unchecked}` +
+          (cmmSummary.failed.length ? ` (rows ${cmmSummary.failed.join(", ")})` : "")}
+    </Typography>
+  )}
+</Box>
 <Dialog open={ipsLoading}>
   <DialogContent sx={{ display: 'flex', alignItems: 'center', gap: 2 }}>
     <CircularProgress /> 
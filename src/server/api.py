@@ -6,64 +6,133 @@ Merged Flask backend:
 - CMM Excel parser
 - Supplier autocomplete
 
-Run:  python app.py
+Run:  python api.py            (development)
+      see wsgi.py              (production; the app is built by create_app())
+
+Extraction libraries and the MySQL driver are imported on first use (see
+startup_profile.py); /api/startup shows the import-time breakdown.
 """
 
-import os
-import io
-import re
-import csv
-import json
-import random
-from typing import List
-from datetime import datetime, timedelta
-
-from flask import Flask, request, jsonify, Response, stream_with_context
-from flask_cors import CORS
-
-# --- OCR / File processing deps
-import pytesseract
-from PIL import Image, ImageEnhance
-import fitz  # PyMuPDF
-import docx
-import openpyxl
-
-# --- Email + DB
-import smtplib
-from email.mime.text import MIMEText
-from email.mime.multipart import MIMEMultipart
-import mysql.connector
+import startup_profile
+from startup_profile import lazy_import
+
+with startup_profile.stage("import stdlib + flask"):
+    import os
+    import io
+    import re
+    import json
+    import time
+    import random
+    import uuid
+    import tempfile
+    import threading
+    import mimetypes
+    from functools import wraps
+    from concurrent.futures import ThreadPoolExecutor, as_completed
+    from datetime import datetime, timedelta
+
+    from flask import Blueprint, Flask, current_app, request, jsonify, send_file, Response, stream_with_context
+    from flask_cors import CORS
+    from werkzeug.wsgi import wrap_file
+
+# --- OCR / File processing deps (loaded by the first route that uses them)
+Image = lazy_import("PIL.Image")
+fitz = lazy_import("fitz")  # PyMuPDF
+docx = lazy_import("docx")
+pdf_pages = lazy_import("pdf_pages")
+ocr_engine = lazy_import("ocr_engine")
+form1_render = lazy_import("form1_render")  # reportlab
+cmm_eval = lazy_import("cmm_eval")  # numpy
+
+with startup_profile.stage("import backend modules"):
+    # --- Email + DB
+    import smtplib
+    from email.mime.text import MIMEText
+    from email.mime.multipart import MIMEMultipart
+    import db_pool
+    import uploads
+    import chunked_uploads
+    import file_store
+    import columnar
+    import cmm_report
+    import form1_fields
+    import supplier_registry
+    import ocr_jobs
+    import batch_reports
+    import extract_cache
+    from db_pool import get_db, get_cursor
+
+# All routes live on this blueprint; create_app() builds the Flask app around it.
+api = Blueprint("api", __name__)
+
 
 # ==============================
 # 🚀 FLASK APP INIT
 # ==============================
-app = Flask(__name__)
-app.config['MAX_CONTENT_LENGTH'] = 20 * 1024 * 1024  # allow up to 20 MB uploads
-CORS(app)
-
-# --- OPTIONAL: Serve a built frontend (set FRONTEND_BUILD_PATH env var to enable)
-FRONTEND_BUILD_PATH = os.environ.get("FRONTEND_BUILD_PATH", "")
-if FRONTEND_BUILD_PATH and os.path.isdir(FRONTEND_BUILD_PATH):
-    app.static_folder = FRONTEND_BUILD_PATH
-
-    @app.route('/', defaults={'path': ''})
-    @app.route('/<path:path>')
-    def serve_frontend(path):
-        # serve exact file if it exists, else fallback to index.html (SPA)
-        if path and os.path.exists(os.path.join(app.static_folder, path)):
-            return app.send_static_file(path)
-        return app.send_static_file('index.html')
+def create_app():
+    """App factory: cheap to call, nothing heavy is imported or connected here."""
+    with startup_profile.stage("create_app"):
+        app = Flask(__name__)
+        # uploads are spooled to disk; size limit from UPLOAD_MAX_MB (see uploads.py)
+        uploads.init_app(app)
+        CORS(app)
 
-# ==============================
-# ✅ MySQL Connection
-# ==============================
-db = mysql.connector.connect(
-    host="localhost",
-    user="root",
-    password="areeb@123",
-    database="innovascape"
-)
-cursor = db.cursor(dictionary=True)
+        # --- OPTIONAL: Serve a built frontend (set FRONTEND_BUILD_PATH env var to enable)
+        frontend_build_path = os.environ.get("FRONTEND_BUILD_PATH", "")
+        if frontend_build_path and os.path.isdir(frontend_build_path):
+            app.static_folder = frontend_build_path
+            # on the app, not the shared blueprint: create_app() may run more than once
+            app.add_url_rule('/', 'serve_frontend', serve_frontend, defaults={'path': ''})
+            app.add_url_rule('/<path:path>', 'serve_frontend', serve_frontend)
+
+        # Pooled MySQL connections, checked out per request and returned on teardown;
+        # the driver is imported and the first connection opened on first checkout.
+        db_pool.init_app(app)
+
+        app.register_blueprint(api)
+    return app
+
+
+def serve_frontend(path):
+    # serve exact file if it exists, else fallback to index.html (SPA)
+    if path and os.path.exists(os.path.join(current_app.static_folder, path)):
+        return current_app.send_static_file(path)
+    return current_app.send_static_file('index.html')
+
+
+def warm():
+    """Load everything create_app() defers (gunicorn master, see wsgi.py)."""
+    with startup_profile.stage("warm"):
+        startup_profile.warm()
+        # load only: the watcher thread is started by each worker after fork
+        supplier_registry.registry.load()
+
+
+@api.app_errorhandler(413)
+def upload_too_large(e):
+    return jsonify({"error": f"File too large (limit {uploads.UPLOAD_MAX_MB} MB)"}), 413
+
+
+@api.app_errorhandler(chunked_uploads.UploadError)
+def chunked_upload_error(e):
+    return jsonify({"error": str(e), **e.extra}), e.status_code
+
+
+@api.app_errorhandler(db_pool.PoolTimeout)
+def db_pool_exhausted(e):
+    print("❌ DB pool exhausted:", e)
+    return jsonify({"error": "Server busy, please retry"}), 503
+
+
+@api.route("/api/db/pool-stats", methods=["GET"])
+def db_pool_stats():
+    return jsonify(db_pool.pool.stats())
+
+
+@api.route("/api/startup", methods=["GET"])
+def startup_info():
+    """Import-time breakdown, loaded heavy modules and RSS of this worker."""
+    return jsonify(startup_profile.report())
 
 # ==============================
 # 🚀 Email Transporter (Gmail app password)
@@ -98,7 +167,7 @@ def send_email(to, subject, text, html=None):
 # ==============================
 # 🔐 COMPANY ROUTES
 # ==============================
-@app.route("/api/register", methods=["POST"])
+@api.route("/api/register", methods=["POST"])
 def register_company():
     data = request.json
     companyName = data.get("companyName")
@@ -110,17 +179,18 @@ def register_company():
         return jsonify({"error": "All fields are required"}), 400
 
     try:
+        cursor = get_cursor()
         cursor.execute(
             "INSERT INTO companies (company_name, email, company_id, password) VALUES (%s, %s, %s, %s)",
             (companyName, email, companyId, password),
         )
-        db.commit()
+        get_db().commit()
         return jsonify({"message": "✅ Company registered successfully!", "companyId": companyId})
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
 
-@app.route("/api/login", methods=["POST"])
+@api.route("/api/login", methods=["POST"])
 def company_login():
     data = request.json
     cid = data.get("id")
@@ -129,6 +199,7 @@ def company_login():
     if not cid or not password:
         return jsonify({"error": "ID and Password required"}), 400
 
+    cursor = get_cursor()
     cursor.execute("SELECT * FROM companies WHERE company_id=%s OR email=%s", (cid, cid))
     company = cursor.fetchone()
 
@@ -141,7 +212,10 @@ def company_login():
 # ==============================
 # 👤 EMPLOYEE ROUTES
 # ==============================
-@app.route("/api/employees", methods=["POST"])
+# explicit column list: never pull file data along with auth lookups
+EMPLOYEE_COLUMNS = "id, employee_id, email, password, otp, otp_expiry, created_at, password_changed_at, company_id"
+
+@api.route("/api/employees", methods=["POST"])
 def add_employee():
     data = request.json
     employee_id = data.get("employee_id")
@@ -152,6 +226,7 @@ def add_employee():
     if not all([employee_id, email, password, company_id]):
         return jsonify({"error": "All fields required"}), 400
 
+    cursor = get_cursor()
     cursor.execute("SELECT * FROM companies WHERE company_id=%s", (company_id,))
     if not cursor.fetchone():
         return jsonify({"error": "❌ Invalid Company ID"}), 400
@@ -161,14 +236,15 @@ def add_employee():
             "INSERT INTO employees (employee_id, email, password, company_id, created_at) VALUES (%s, %s, %s, %s, NOW())",
             (employee_id, email, password, company_id),
         )
-        db.commit()
+        get_db().commit()
         return jsonify({"message": "✅ Employee added successfully!", "employeeId": employee_id})
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
 
-@app.route("/api/employees", methods=["GET"])
+@api.route("/api/employees", methods=["GET"])
 def get_employees():
+    cursor = get_cursor()
     cursor.execute("SELECT employee_id, email, company_id, password, created_at, password_changed_at FROM employees")
     employees = cursor.fetchall()
 
@@ -186,14 +262,15 @@ def get_employees():
     return jsonify(employees)
 
 
-@app.route("/api/employees/check/<string:employee_id>", methods=["GET"])
+@api.route("/api/employees/check/<string:employee_id>", methods=["GET"])
 def check_employee_id(employee_id):
+    cursor = get_cursor()
     cursor.execute("SELECT employee_id FROM employees WHERE employee_id=%s", (employee_id,))
     exists = cursor.fetchone()
     return jsonify({"exists": bool(exists)})
 
 
-@app.route("/api/employees/login", methods=["POST"])
+@api.route("/api/employees/login", methods=["POST"])
 def employee_login():
     data = request.json
     identifier = data.get("identifier")
@@ -202,7 +279,8 @@ def employee_login():
     if not identifier or not password:
         return jsonify({"error": "Employee ID or Email and Password required"}), 400
 
-    cursor.execute("SELECT * FROM employees WHERE employee_id=%s OR email=%s", (identifier, identifier))
+    cursor = get_cursor()
+    cursor.execute(f"SELECT {EMPLOYEE_COLUMNS} FROM employees WHERE employee_id=%s OR email=%s", (identifier, identifier))
     employee = cursor.fetchone()
 
     if not employee or password != employee["password"]:
@@ -228,11 +306,12 @@ def employee_login():
 # ==============================
 # 🔁 PASSWORD RESET (Employee)
 # ==============================
-@app.route("/api/employees/forgot-password", methods=["POST"])
+@api.route("/api/employees/forgot-password", methods=["POST"])
 def employee_forgot_password():
     data = request.json
     identifier = data.get("identifier")
 
+    cursor = get_cursor()
     cursor.execute("SELECT email, employee_id FROM employees WHERE employee_id=%s OR email=%s", (identifier, identifier))
     employee = cursor.fetchone()
 
@@ -247,7 +326,7 @@ def employee_forgot_password():
         "UPDATE employees SET otp=%s, otp_expiry=%s WHERE employee_id=%s",
         (otp, otp_expiry, employee["employee_id"])
     )
-    db.commit()
+    get_db().commit()
 
     send_email(
         employee["email"],
@@ -258,7 +337,7 @@ def employee_forgot_password():
     return jsonify({"message": f"✅ OTP sent to Employee: {employee['employee_id']}"})
 
 # Verify OTP endpoint
-@app.route("/api/employees/verify-otp", methods=["POST"])
+@api.route("/api/employees/verify-otp", methods=["POST"])
 def employee_verify_otp():
     """
     Verify the 5-digit OTP for an employee (identifier = employee_id or email).
@@ -271,7 +350,8 @@ def employee_verify_otp():
     if not identifier or otp is None:
         return jsonify({"error": "Identifier and OTP are required"}), 400
 
-    cursor.execute("SELECT * FROM employees WHERE employee_id=%s OR email=%s", (identifier, identifier))
+    cursor = get_cursor()
+    cursor.execute(f"SELECT {EMPLOYEE_COLUMNS} FROM employees WHERE employee_id=%s OR email=%s", (identifier, identifier))
     employee = cursor.fetchone()
 
     if not employee:
@@ -289,11 +369,11 @@ def employee_verify_otp():
 
     # Optionally clear OTP immediately so user can proceed to reset password
     cursor.execute("UPDATE employees SET otp=NULL, otp_expiry=NULL WHERE employee_id=%s", (employee["employee_id"],))
-    db.commit()
+    get_db().commit()
 
     return jsonify({"message": "✅ OTP verified", "employee_id": employee["employee_id"], "email": employee["email"]})
 
-@app.route("/api/employees/reset-password", methods=["POST"])
+@api.route("/api/employees/reset-password", methods=["POST"])
 def employee_reset_password():
     """
     Resets employee password.
@@ -309,7 +389,8 @@ def employee_reset_password():
     if not identifier or not newPassword:
         return jsonify({"error": "Identifier and newPassword are required"}), 400
 
-    cursor.execute("SELECT * FROM employees WHERE employee_id=%s OR email=%s", (identifier, identifier))
+    cursor = get_cursor()
+    cursor.execute(f"SELECT {EMPLOYEE_COLUMNS} FROM employees WHERE employee_id=%s OR email=%s", (identifier, identifier))
     employee = cursor.fetchone()
 
     if not employee:
@@ -335,7 +416,7 @@ def employee_reset_password():
             "UPDATE employees SET password=%s, otp=NULL, otp_expiry=NULL, password_changed_at=%s WHERE employee_id=%s",
             (newPassword, password_changed_at, employee["employee_id"])
         )
-        db.commit()
+        get_db().commit()
         return jsonify({"message": "✅ Password updated successfully!"})
     except Exception as e:
         print(f"ERROR updating password for {employee['employee_id']}: {e}")
@@ -345,7 +426,7 @@ def employee_reset_password():
 # ==============================
 # 📤 EMPLOYEE CREDENTIALS SHARE
 # ==============================
-@app.route("/api/employees/share", methods=["POST"])
+@api.route("/api/employees/share", methods=["POST"])
 def share_employee_credentials():
     data = request.json
     employee_id = data.get("employee_id")
@@ -376,11 +457,12 @@ def share_employee_credentials():
 # ==============================
 # 🔁 PASSWORD RESET (Manager/Company)
 # ==============================
-@app.route("/api/manager/forgot-password", methods=["POST"])
+@api.route("/api/manager/forgot-password", methods=["POST"])
 def manager_forgot_password():
     data = request.json
     identifier = data.get("identifier")
 
+    cursor = get_cursor()
     cursor.execute("SELECT company_id, email FROM companies WHERE company_id=%s OR email=%s", (identifier, identifier))
     company = cursor.fetchone()
 
@@ -395,7 +477,7 @@ def manager_forgot_password():
         "UPDATE companies SET otp=%s, otp_expiry=%s WHERE company_id=%s",
         (otp, otp_expiry, company["company_id"])
     )
-    db.commit()
+    get_db().commit()
 
     send_email(company["email"], "OTP for Password Reset", f"Your OTP is {otp}. Valid for 1 minute.")
 
@@ -407,7 +489,7 @@ def manager_forgot_password():
     })
 
 
-@app.route("/api/manager/verify-otp", methods=["POST"])
+@api.route("/api/manager/verify-otp", methods=["POST"])
 def manager_verify_otp():
     """Verify 5-digit OTP for a company/manager (identifier = company_id or email)."""
     data = request.json or {}
@@ -417,6 +499,7 @@ def manager_verify_otp():
     if not identifier or otp is None:
         return jsonify({"error": "Identifier and OTP are required"}), 400
 
+    cursor = get_cursor()
     cursor.execute("SELECT * FROM companies WHERE company_id=%s OR email=%s", (identifier, identifier))
     company = cursor.fetchone()
 
@@ -434,12 +517,12 @@ def manager_verify_otp():
 
     # Clear OTP so it can't be reused
     cursor.execute("UPDATE companies SET otp=NULL, otp_expiry=NULL WHERE company_id=%s", (company["company_id"],))
-    db.commit()
+    get_db().commit()
 
     return jsonify({"message": "✅ OTP verified", "company_id": company["company_id"], "email": company["email"]})
 
 
-@app.route("/api/manager/resend-otp", methods=["POST"])
+@api.route("/api/manager/resend-otp", methods=["POST"])
 def manager_resend_otp():
     data = request.json or {}
     identifier = data.get("identifier")
@@ -447,6 +530,7 @@ def manager_resend_otp():
     if not identifier:
         return jsonify({"error": "Identifier is required"}), 400
 
+    cursor = get_cursor()
     cursor.execute("SELECT company_id, email FROM companies WHERE company_id=%s OR email=%s", (identifier, identifier))
     company = cursor.fetchone()
 
@@ -460,7 +544,7 @@ def manager_resend_otp():
         "UPDATE companies SET otp=%s, otp_expiry=%s WHERE company_id=%s",
         (otp, otp_expiry, company["company_id"])
     )
-    db.commit()
+    get_db().commit()
 
     ok = send_email(company["email"], "OTP for Password Reset (Resent)", f"Your new OTP is {otp}. Valid for 1 minute.")
     if not ok:
@@ -468,7 +552,7 @@ def manager_resend_otp():
 
     return jsonify({"message": "✅ Verification code resent", "company_id": company["company_id"], "email": company["email"]})
 
-@app.route("/api/manager/reset-password", methods=["POST"])
+@api.route("/api/manager/reset-password", methods=["POST"])
 def manager_reset_password():
     """
     Resets company (manager) password.
@@ -484,6 +568,7 @@ def manager_reset_password():
     if not identifier or not newPassword:
         return jsonify({"error": "Identifier and newPassword are required"}), 400
 
+    cursor = get_cursor()
     cursor.execute("SELECT * FROM companies WHERE company_id=%s OR email=%s", (identifier, identifier))
     company = cursor.fetchone()
 
@@ -510,7 +595,7 @@ def manager_reset_password():
             "UPDATE companies SET password=%s, otp=NULL, otp_expiry=NULL WHERE company_id=%s",
             (newPassword, company["company_id"])
         )
-        db.commit()
+        get_db().commit()
         return jsonify({"message": "✅ Password updated successfully!"})
     except Exception as e:
         print(f"ERROR updating password for company {company.get('company_id')}: {e}")
@@ -519,255 +604,312 @@ def manager_reset_password():
 
 
 # ==============================
-# 🧠 Utility functions for OCR/CMM
+# ⚙️ CPU-bound route slots
+# ==============================
+# OCR / PDF / Excel routes share a small per-process slot count so they can't
+# occupy every WSGI thread; auth and email routes always have threads left.
+# See wsgi.py / gunicorn.conf.py for the full concurrency model.
+CPU_ROUTE_SLOTS = int(os.environ.get("CPU_ROUTE_SLOTS", max(1, (os.cpu_count() or 2) // 2)))
+CPU_ROUTE_WAIT = float(os.environ.get("CPU_ROUTE_WAIT", "60"))  # seconds to queue before 503
+_cpu_slots = threading.BoundedSemaphore(CPU_ROUTE_SLOTS)
+
+def cpu_bound(fn):
+    """Run the route inside a CPU slot; streamed responses hold it until closed."""
+    @wraps(fn)
+    def wrapper(*args, **kwargs):
+        if not _cpu_slots.acquire(timeout=CPU_ROUTE_WAIT):
+            return jsonify({"error": "Server busy, please retry"}), 503
+        try:
+            resp = current_app.make_response(fn(*args, **kwargs))
+        except Exception:
+            _cpu_slots.release()
+            raise
+        if resp.is_streamed:
+            resp.call_on_close(_cpu_slots.release)
+        else:
+            _cpu_slots.release()
+        return resp
+    return wrapper
+
+
+# ==============================
+# 🧠 OCR settings (CMM cell helpers: cmm_report.py)
+# ==============================
+PDF_OCR_DPI = 200   # rasterization dpi for scanned PDF pages
+PDF_OCR_PSM = 4     # tesseract page segmentation mode for full pages / images
+CROP_OCR_PSM = 6    # single uniform block (cropped regions)
+
+
+# ==============================
+# 📄 OCR / EXTRACTION ENDPOINTS
 # ==============================
-def ocr_image(img, psm=4):
-    """Performs OCR on a PIL image with a given Page Segmentation Mode."""
-    gray = img.convert('L')
-    gray = ImageEnhance.Contrast(gray).enhance(2)
-    config = f'--oem 3 --psm {psm}'
-    return pytesseract.image_to_string(gray, config=config).strip()
-
-def _normalize_feature_no(s):
-    """Keep only digits and hyphens (e.g., '140-1'); trim spaces."""
-    if s is None:
-        return ""
-    return re.sub(r"[^0-9\-]", "", str(s)).strip()
-
-def _pick_first_actual(v):
-    s = "" if v is None else str(v).strip()
-    if not s:
-        return ""
-    m = re.search(r'[+-]?\d+(?:\.\d+)?', s)
-    if m:
-        return m.group(0)
-    return re.split(r'[,;|\s/]+', s)[0].strip()
-
-def _to_float(v):
-    if v is None:
-        return None
-    m = re.search(r'[+-]?\d+(?:\.\d+)?', str(v))
-    if not m:
-        return None
+def _open_pdf(source):
+    return fitz.open(source) if isinstance(source, str) else fitz.open(stream=source, filetype="pdf")
+
+
+def _ips_items(source):
+    """
+    Rows of an IPS workbook (header on row 2 of Sheet2, else the active sheet)
+    as /api/extract-text items, one at a time: the sheet is read in a single
+    pass and never held as a list.
+    """
+    with uploads.open_workbook(source) as wb:
+        # Adjust sheet name to your format if needed
+        ws = wb["Sheet2"] if "Sheet2" in wb.sheetnames else wb.active
+        rows = ws.iter_rows(values_only=True)
+        # Header expected at 2nd row based on your sample; adjust as needed
+        if next(rows, None) is None:
+            return
+        header = next(rows, None)
+        if header is None:
+            return
+        header = [h.strip().lower() if isinstance(h, str) else None for h in header]
+        # column positions instead of a dict per row (the last duplicate header wins, as before)
+        pos = {h: i for i, h in enumerate(header)}
+        op_i, feat_i, ref_i, desc_i = (pos.get(name, len(header))
+                                       for name in ("operation", "feature\nnumber", "drawing ref", "description"))
+
+        for r in rows:
+            n = min(len(r), len(header))
+            op = r[op_i] if op_i < n else None
+            if not op:
+                continue
+            feat = r[feat_i] if feat_i < n else None
+            ref = r[ref_i] if ref_i < n else None
+            desc = r[desc_i] if desc_i < n else None
+            yield {
+                "operation": str(op).strip(),
+                "feature_no": str(feat).strip() if feat else "",
+                "drawing_ref": str(ref).strip() if ref else "",
+                "description": str(desc).strip() if desc else "",
+            }
+
+
+EXTRACT_STREAM_CHUNK = int(os.environ.get("EXTRACT_STREAM_CHUNK", str(64 * 1024)))   # characters per streamed write
+EXTRACT_STREAM_CACHE_ROWS = int(os.environ.get("EXTRACT_STREAM_CACHE_ROWS", "5000"))   # larger results are not cached
+
+
+def _ips_json_stream(items, source, cache_key=None):
+    """
+    {"extracted_data": [...]} written item by item from _ips_items(), byte for
+    byte as jsonify() would (compact, sorted keys) and buffered up to
+    EXTRACT_STREAM_CHUNK characters per write. Results of up to
+    EXTRACT_STREAM_CACHE_ROWS items are stored under `cache_key` once complete.
+    Releases `source`.
+    """
+    kept = [] if cache_key else None
     try:
-        return float(m.group(0))
-    except Exception:
-        return None
+        buf = ['{"extracted_data":[']
+        size = 0
+        sep = ""
+        for item in items:
+            piece = sep + json.dumps(item, sort_keys=True, separators=(",", ":"))
+            sep = ","
+            buf.append(piece)
+            size += len(piece)
+            if size >= EXTRACT_STREAM_CHUNK:
+                yield "".join(buf)
+                buf, size = [], 0
+            if kept is not None:
+                kept.append(item)
+                if len(kept) > EXTRACT_STREAM_CACHE_ROWS:
+                    kept = None
+        buf.append("]}\n")
+        yield "".join(buf)
+        if kept is not None:
+            extract_cache.cache.put(cache_key, {"extracted_data": kept})
+    finally:
+        items.close()
+        uploads.release(source)
+
+
+def _extract_file(filename, source, progress=None):
+    """
+    Core of /api/extract-text, shared by the synchronous route and background jobs.
+    `filename` must be lower-cased; `source` is a file path or the file bytes
+    (see uploads.source_of). Returns (payload, status_code). For PDFs,
+    progress(page, total, source, ms) is called as each page completes.
+    """
+    # --- Excel (IPS / generic) ---
+    if filename.endswith(('.xlsm', '.xlsx', '.xls')):
+        return {"extracted_data": list(_ips_items(source))}, 200
+
+    # --- PDF ---
+    elif filename.endswith('.pdf'):
+        pdf_doc = _open_pdf(source)
+
+        # Pages are OCR'd in parallel (pdf_pages.PDF_OCR_WORKERS) and returned in page order.
+        # Case A OCRs below 50 chars, case B below 20, so case B can reuse case A's pages.
+        pages = None
+
+        # Case A: "inspection planning sheet" in filename
+        if "inspection planning sheet" in filename:
+            pages = pdf_pages.page_texts(pdf_doc, source, 50, PDF_OCR_DPI, PDF_OCR_PSM, progress)
+            full_text = "".join((ocr if ocr is not None else raw) + "\n" for raw, ocr in pages)
+
+            lines = [ln.strip() for ln in full_text.splitlines() if ln.strip()]
+            # Group lines into rows starting with operation number
+            grouped = []
+            current = []
+            for ln in lines:
+                if re.match(r"^\d{3,4}\b", ln):
+                    if current:
+                        grouped.append(" ".join(current))
+                    current = [ln]
+                else:
+                    current.append(ln)
+            if current:
+                grouped.append(" ".join(current))
+
+            final_data = []
+            pattern = re.compile(r"^(\d{1,4})\s+(\S+)(?:\s+(SHEET[0-9A-Z\-]+))?\s+(.*)$")
+            for row in grouped:
+                m = pattern.match(row)
+                if m:
+                    op = m.group(1)
+                    feature_no = m.group(2)
+                    drawing_ref = m.group(3) or ""
+                    desc = m.group(4).strip()
+                    final_data.append({
+                        "operation": op,
+                        "feature_no": feature_no,
+                        "drawing_ref": drawing_ref,
+                        "description": desc
+                    })
+            if final_data:
+                return {"extracted_data": final_data}, 200
+
+        # Case B: fallback PDF text
+        if pages is None:
+            pages = pdf_pages.page_texts(pdf_doc, source, 20, PDF_OCR_DPI, PDF_OCR_PSM, progress)
+        final_text = "".join((raw if len(raw) >= 20 else ocr) + "\n\n" for raw, ocr in pages)
+        return {"extracted_text": final_text}, 200
+
+    # --- DOCX ---
+    elif filename.endswith('.docx'):
+        doc = docx.Document(uploads.open_source(source))
+        final_text = "\n".join([para.text for para in doc.paragraphs])
+        return {"extracted_text": final_text}, 200
+
+    # --- Images ---
+    elif filename.endswith(('.png', '.jpg', '.jpeg')):
+        img = Image.open(uploads.open_source(source))
+        final_text = ocr_engine.ocr_image(img, psm=PDF_OCR_PSM)
+        return {"extracted_text": final_text}, 200
 
-def _is_numeric_like(v):
-    if v is None:
-        return False
-    if isinstance(v, (int, float)):
-        return True
+    else:
+        return {"error": "Unsupported file type"}, 400
+
+
+def _extract_branch(filename):
+    """Which _extract_file branch a (lower-cased) filename takes; part of the cache key."""
+    if filename.endswith(('.xlsm', '.xlsx', '.xls')):
+        return "excel"
+    if filename.endswith('.pdf'):
+        return "pdf-ips" if "inspection planning sheet" in filename else "pdf"
+    if filename.endswith('.docx'):
+        return "docx"
+    if filename.endswith(('.png', '.jpg', '.jpeg')):
+        return "image"
+    return None
+
+
+# branches whose text can come from OCR
+_OCR_BRANCHES = ("pdf", "pdf-ips", "image")
+
+
+def _ocr_key():
+    """Resolved OCR engine and language, for cache keys: the engines' output differs."""
+    return f"{ocr_engine.get_engine().name}:{ocr_engine.OCR_LANG}"
+
+
+def _extract_file_cached(filename, source, progress=None):
+    """_extract_file behind the content-hash cache. Returns (payload, status_code, hit)."""
+    branch = _extract_branch(filename)
+    if branch is None:
+        return {"error": "Unsupported file type"}, 400, False
+    ocr = {"ocr": _ocr_key()} if branch in _OCR_BRANCHES else {}
+    key = extract_cache.make_key(uploads.digest_source(source), route="extract-text",
+                                 branch=branch, psm=PDF_OCR_PSM, dpi=PDF_OCR_DPI, **ocr)
+    return extract_cache.cache.get_or_compute(key, lambda: _extract_file(filename, source, progress))
+
+
+def _extract_job(filename, source, progress=None):
+    """Job body: `source` comes from uploads.take() and is released when done."""
     try:
-        float(str(v).strip())
-        return True
-    except Exception:
-        return False
+        payload, status_code, _ = _extract_file_cached(filename, source, progress)
+        return payload, status_code
+    finally:
+        uploads.release(source)
 
-def _is_feature_like(v):
-    txt = _normalize_feature_no(v)
-    return bool(txt) and (1 <= len(txt) <= 12)
 
-def _is_refer_only(s: str) -> bool:
-    """Return True if the feature text is marked as 'Refer Only'."""
-    if s is None:
-        return False
-    t = str(s).replace("\u00A0", " ")
-    t = re.sub(r"\s+", " ", t).strip().lower()
-    t = re.sub(r"[.,;:()\[\]{}/_-]+", " ", t)
-    return re.search(r"\bref(?:er(?:ence)?)?\s*only\b", t) is not None
+@api.route('/api/ocr/engine', methods=['GET'])
+def ocr_engine_info():
+    engine = ocr_engine.get_engine()
+    info = engine.info()
+    if request.args.get("check") == "1":
+        info["health"] = engine.health()
+    return jsonify(info)
 
-# --- Supplier dataset bootstrapping
-DATA_DIR = os.path.join(os.path.dirname(__file__), "data")
-SUPPLIER_NAMES: List[str] = []
 
-def _norm(s: str) -> str:
-    return " ".join(str(s).split()).strip() if s is not None else ""
+@api.route('/api/extract-cache/stats', methods=['GET'])
+def extract_cache_stats():
+    return jsonify(extract_cache.cache.stats())
 
-def _load_suppliers_on_boot() -> List[str]:
-    names: List[str] = []
 
-    # 1) JSON
-    json_path = os.path.join(DATA_DIR, "suppliers.json")
-    if os.path.isfile(json_path):
-        try:
-            with open(json_path, "r", encoding="utf-8") as f:
-                payload = json.load(f)
-            if isinstance(payload, dict):
-                if "suppliers" in payload and isinstance(payload["suppliers"], list):
-                    names.extend([_norm(x) for x in payload["suppliers"]])
-                elif "names" in payload and isinstance(payload["names"], list):
-                    names.extend([_norm(x) for x in payload["names"]])
-            elif isinstance(payload, list):
-                names.extend([_norm(x) for x in payload])
-        except Exception:
-            pass
+def _ndjson(record):
+    return json.dumps(record) + "\n"
 
-    # 2) Excel
-    if not names:
-        try:
-            for fname in ("suppliers.xlsx", "suppliers.xlsm", "suppliers.xls"):
-                x_path = os.path.join(DATA_DIR, fname)
-                if os.path.isfile(x_path):
-                    wb = openpyxl.load_workbook(x_path, read_only=True, keep_vba=True, data_only=True)
-                    ws = wb.active
-                    rows = list(ws.iter_rows(values_only=True))
-                    if not rows:
-                        continue
-                    header = [(_norm(h).lower() if h is not None else "") for h in rows[0]]
-                    choices = ("supplier name", "supplier", "vendor", "vendor name", "name")
-                    col_idx = 0
-                    for i, h in enumerate(header):
-                        if any(h.startswith(c) for c in choices):
-                            col_idx = i
-                            break
-                    if col_idx == 0 and header and header[0] == "":
-                        col_idx = 0
-                    for r in rows[1:]:
-                        if r and col_idx < len(r) and r[col_idx]:
-                            names.append(_norm(r[col_idx]))
-                    if names:
-                        break
-        except Exception:
-            pass
-
-    # 3) CSV
-    if not names:
-        c_path = os.path.join(DATA_DIR, "suppliers.csv")
-        if os.path.isfile(c_path):
-            try:
-                with open(c_path, "r", encoding="utf-8", errors="ignore", newline="") as f:
-                    rdr = csv.DictReader(f)
-                    if rdr.fieldnames:
-                        fn = [(_norm(h).lower() if h else "") for h in rdr.fieldnames]
-                        choices = ("supplier name", "supplier", "vendor", "vendor name", "name")
-                        col = None
-                        for i, h in enumerate(fn):
-                            if any(h.startswith(c) for c in choices):
-                                col = rdr.fieldnames[i]
-                                break
-                        if col is None:
-                            col = rdr.fieldnames[0]
-                        for row in rdr:
-                            val = row.get(col)
-                            if val:
-                                names.append(_norm(val))
-            except Exception:
-                pass
-
-    if not names:
-        names = [
-            _norm("Acme Components"),
-            _norm("Globex Engineering"),
-            _norm("Initech Precision"),
-            _norm("Umbrella Machining"),
-        ]
-
-    return sorted({n for n in names if n})
-
-SUPPLIER_NAMES = _load_suppliers_on_boot()
-
-def _find_header_row_and_cols(ws, max_scan_rows=50):
-    feature_syns = [
-        r"feature.?number",
-        r"\bfeature\s*n(?:o|c)\b",
-        r"\bfeature\s*nu",
-        r"\bfeature\b",
-        r"\bballoon\b",
-        r"\bbubble\b",
-        r"char(?:\.|acteristic)?\s*no",
-        r"\bchar\s*no\b",
-        r"\bdim(?:\.|ension)?\s*no\b",
-        r"\bfeat\s*no\b",
-        r"\bid\b"
-    ]
-    actual_syns = [
-        r"\bactual\b",
-        r"\bactua\b",
-        r"\bmeasured\b",
-        r"\bresult\b",
-        r"\bvalue\b",
-        r"\bmeasurement\b",
-        r"\bread\b"
-    ]
-
-    best_row = None
-    best_score = -1
-    cand_feat_idx = None
-    cand_act_idx = None
-
-    for i, row in enumerate(ws.iter_rows(values_only=True), start=1):
-        if i > max_scan_rows:
-            break
-        row_vals = [str(c).strip().lower() if c is not None else "" for c in row]
-        if not any(row_vals):
-            continue
-
-        feat_idx, act_idx = None, None
-        score = 0
-        for idx, cell in enumerate(row_vals):
-            if not cell:
-                continue
-            if any(re.search(p, cell) for p in feature_syns):
-                if feat_idx is None:
-                    feat_idx = idx
-                score += 2
-            if any(re.search(p, cell) for p in actual_syns):
-                if act_idx is None:
-                    act_idx = idx
-                score += 2
-            if feat_idx is None and (cell.startswith("feature n") or cell.startswith("feature nu") or cell == "feature"):
-                feat_idx = idx
-                score += 1
-            if act_idx is None and (cell.startswith("actua") or cell.startswith("meas") or cell.startswith("resul") or cell == "value"):
-                act_idx = idx
-                score += 1
-
-        if feat_idx is not None and act_idx is not None and score > best_score:
-            best_row, best_score = i, score
-            cand_feat_idx, cand_act_idx = feat_idx, act_idx
-
-    if cand_feat_idx is not None and cand_act_idx is not None:
-        return best_row, cand_feat_idx, cand_act_idx
-
-    col_stats = {}
-    for i, row in enumerate(ws.iter_rows(values_only=True), start=1):
-        if i > max_scan_rows:
-            break
-        vals = list(row)
-        for idx, v in enumerate(vals):
-            st = col_stats.setdefault(idx, {"feature_like": 0, "numeric_like": 0, "nonempty": 0})
-            if v is not None and str(v).strip() != "":
-                st["nonempty"] += 1
-                if _is_feature_like(v):
-                    st["feature_like"] += 1
-                if _is_numeric_like(v):
-                    st["numeric_like"] += 1
-
-    feature_col = None
-    actual_col = None
-    best_feat = -1
-    best_num = -1
-    for idx, st in col_stats.items():
-        if st["feature_like"] > best_feat and st["feature_like"] >= 3:
-            best_feat = st["feature_like"]
-            feature_col = idx
-        if st["numeric_like"] > best_num and st["numeric_like"] >= 3:
-            best_num = st["numeric_like"]
-            actual_col = idx
-
-    if feature_col is not None and actual_col is not None and feature_col != actual_col:
-        return None, feature_col, actual_col
-
-    return None, None, None
 
+def _extract_pages_ndjson(filename, source):
+    """
+    NDJSON stream for /api/extract-text?stream=ndjson: a `start` record, one
+    `page` record per page as soon as it is done (in page order), then `end`.
+    Only the current page's text is held. The inspection-planning-sheet table
+    parser needs the whole document, so streamed PDFs always get plain page text.
+    `source` comes from uploads.take() and is released at the end of the stream.
+    """
+    t_start = time.perf_counter()
+    try:
+        if filename.endswith('.pdf'):
+            pdf_doc = _open_pdf(source)
+            yield _ndjson({"type": "start", "filename": filename, "pages": pdf_doc.page_count})
+            count = 0
+            for page_no, raw, ocr, page_source, ms in pdf_pages.iter_page_texts(
+                    pdf_doc, source, 20, PDF_OCR_DPI, PDF_OCR_PSM):
+                count += 1
+                yield _ndjson({"type": "page", "page": page_no, "source": page_source,
+                               "text": ocr if ocr is not None else raw, "ms": ms})
+        elif filename.endswith(('.png', '.jpg', '.jpeg')):
+            yield _ndjson({"type": "start", "filename": filename, "pages": 1})
+            t0 = time.perf_counter()
+            text = ocr_engine.ocr_image(Image.open(uploads.open_source(source)), psm=PDF_OCR_PSM)
+            count = 1
+            yield _ndjson({"type": "page", "page": 1, "source": "ocr", "text": text, "ms": _ms_since(t0)})
+        else:
+            yield _ndjson({"type": "error", "error": "Streaming is supported for PDF and image files"})
+            return
+        yield _ndjson({"type": "end", "pages": count, "ms": _ms_since(t_start)})
+    except Exception as e:
+        print(f"ERROR in /api/extract-text (stream): {e}")
+        import traceback
+        traceback.print_exc()
+        yield _ndjson({"type": "error", "error": "Failed to process the file. Check server logs for details."})
+    finally:
+        uploads.release(source)
 
-# ==============================
-# 📄 OCR / EXTRACTION ENDPOINTS
-# ==============================
-@app.route('/api/extract-text', methods=['POST'])
+
+def _ms_since(t0):
+    return round((time.perf_counter() - t0) * 1000, 1)
+
+
+@api.route('/api/extract-text', methods=['POST'])
+@cpu_bound
 def extract_text_from_file():
+    """
+    Extracts text/rows from an uploaded file. With ?stream=ndjson (or
+    Accept: application/x-ndjson) PDFs and images are streamed page by page.
+    """
     if 'file' not in request.files:
         return jsonify({"error": "No file part in the request"}), 400
 
@@ -777,124 +919,231 @@ def extract_text_from_file():
 
     filename = file.filename.lower()
 
-    try:
-        file_content = file.read()
-
-        # --- Excel (IPS / generic) ---
-        if filename.endswith(('.xlsm', '.xlsx', '.xls')):
-            xlsm_bytes = io.BytesIO(file_content)
-            wb = openpyxl.load_workbook(xlsm_bytes, data_only=True, keep_vba=True, read_only=True)
+    if request.args.get("stream") == "ndjson" or "application/x-ndjson" in request.headers.get("Accept", ""):
+        if not filename.endswith(('.pdf', '.png', '.jpg', '.jpeg')):
+            return jsonify({"error": "Streaming is supported for PDF and image files"}), 400
+        return Response(stream_with_context(_extract_pages_ndjson(filename, uploads.take(file))),
+                        mimetype='application/x-ndjson', headers={"X-Accel-Buffering": "no"})
 
-            # Adjust sheet name to your format if needed
-            ws = wb["Sheet2"] if "Sheet2" in wb.sheetnames else wb.active
+    if _extract_branch(filename) == "excel":
+        return _extract_excel_streamed(filename, file)
 
-            rows = list(ws.iter_rows(values_only=True))
-            # Header expected at 2nd row based on your sample; adjust as needed
-            if len(rows) < 2:
-                return jsonify({"extracted_data": []})
-            header = [h.strip().lower() if isinstance(h, str) else None for h in rows[1]]
-
-            data = []
-            for r in rows[2:]:
-                rd = dict(zip(header, r))
-                op = rd.get("operation")
-                feat = rd.get("feature\nnumber")
-                ref = rd.get("drawing ref")
-                desc = rd.get("description")
-                if op:
-                    data.append({
-                        "operation": str(op).strip(),
-                        "feature_no": str(feat).strip() if feat else "",
-                        "drawing_ref": str(ref).strip() if ref else "",
-                        "description": str(desc).strip() if desc else "",
-                    })
-            return jsonify({"extracted_data": data})
-
-        # --- PDF ---
-        elif filename.endswith('.pdf'):
-            pdf_doc = fitz.open(stream=file_content, filetype="pdf")
-
-            # Case A: "inspection planning sheet" in filename
-            if "inspection planning sheet" in filename:
-                full_text = ""
-                for page_num, page in enumerate(pdf_doc, start=1):
-                    page_text = page.get_text("text").strip()
-                    if len(page_text) < 50:
-                        pix = page.get_pixmap(dpi=200)
-                        img = Image.frombytes("RGB", [pix.width, pix.height], pix.samples)
-                        page_text = ocr_image(img, psm=4)
-                    full_text += page_text + "\n"
-
-                lines = [ln.strip() for ln in full_text.splitlines() if ln.strip()]
-                # Group lines into rows starting with operation number
-                grouped = []
-                current = []
-                for ln in lines:
-                    if re.match(r"^\d{3,4}\b", ln):
-                        if current:
-                            grouped.append(" ".join(current))
-                        current = [ln]
-                    else:
-                        current.append(ln)
-                if current:
-                    grouped.append(" ".join(current))
-
-                final_data = []
-                pattern = re.compile(r"^(\d{1,4})\s+(\S+)(?:\s+(SHEET[0-9A-Z\-]+))?\s+(.*)$")
-                for row in grouped:
-                    m = pattern.match(row)
-                    if m:
-                        op = m.group(1)
-                        feature_no = m.group(2)
-                        drawing_ref = m.group(3) or ""
-                        desc = m.group(4).strip()
-                        final_data.append({
-                            "operation": op,
-                            "feature_no": feature_no,
-                            "drawing_ref": drawing_ref,
-                            "description": desc
-                        })
-                if final_data:
-                    return jsonify({"extracted_data": final_data})
-
-            # Case B: fallback PDF text
-            final_text = ""
-            for page in pdf_doc:
-                page_text = page.get_text().strip()
-                if len(page_text) < 20:
-                    pix = page.get_pixmap(dpi=200)
-                    img = Image.frombytes("RGB", [pix.width, pix.height], pix.samples)
-                    page_text = ocr_image(img, psm=4)
-                final_text += page_text + "\n\n"
-            return jsonify({"extracted_text": final_text})
-
-        # --- DOCX ---
-        elif filename.endswith('.docx'):
-            doc = docx.Document(io.BytesIO(file_content))
-            final_text = "\n".join([para.text for para in doc.paragraphs])
-            return jsonify({"extracted_text": final_text})
-
-        # --- Images ---
-        elif filename.endswith(('.png', '.jpg', '.jpeg')):
-            img = Image.open(io.BytesIO(file_content))
-            final_text = ocr_image(img)
-            return jsonify({"extracted_text": final_text})
+    try:
+        payload, status_code, hit = _extract_file_cached(filename, uploads.source_of(file))
+        resp = jsonify(payload)
+        resp.headers["X-Cache"] = "hit" if hit else "miss"
+        return resp, status_code
+    except Exception as e:
+        print(f"ERROR in /api/extract-text: {e}")
+        import traceback
+        traceback.print_exc()
+        return jsonify({"error": "Failed to process the file. Check server logs for details."}), 500
 
-        else:
-            return jsonify({"error": "Unsupported file type"}), 400
 
+def _extract_excel_streamed(filename, file):
+    """
+    Excel branch of /api/extract-text: a cached result is returned as before;
+    otherwise the rows are streamed as they are read (a 50k-row IPS would
+    otherwise sit in memory three times: sheet tuples, items, JSON text).
+    """
+    source = uploads.take(file)
+    try:
+        key = extract_cache.make_key(uploads.digest_source(source), route="extract-text",
+                                     branch="excel", psm=PDF_OCR_PSM, dpi=PDF_OCR_DPI)
+        cached = extract_cache.cache.get(key)
+        if cached is not None:
+            uploads.release(source)
+            resp = jsonify(cached)
+            resp.headers["X-Cache"] = "hit"
+            return resp
+        items = _ips_items(source)
+        first = next(items, None)   # opens the workbook: a broken file still gets a JSON 500
     except Exception as e:
+        uploads.release(source)
         print(f"ERROR in /api/extract-text: {e}")
         import traceback
         traceback.print_exc()
         return jsonify({"error": "Failed to process the file. Check server logs for details."}), 500
 
+    if first is not None:
+        items = _chain_first(first, items)
+    return Response(stream_with_context(_ips_json_stream(items, source, key)), mimetype='application/json',
+                    headers={"X-Cache": "miss"})
+
+
+def _chain_first(first, rest):
+    # a generator (not itertools.chain) so close() reaches `rest` and closes the workbook
+    try:
+        yield first
+        yield from rest
+    finally:
+        rest.close()
 
-@app.route('/api/extract-text-stream', methods=['POST'])
+
+# ==============================
+# 📚 Bulk extraction (folder upload)
+# ==============================
+# Files of one request are extracted concurrently on a shared per-process pool;
+# OCR runs in tesseract / PyMuPDF code that releases the GIL.
+EXTRACT_BULK_WORKERS = int(os.environ.get("EXTRACT_BULK_WORKERS", "4"))
+EXTRACT_BULK_MAX_FILES = int(os.environ.get("EXTRACT_BULK_MAX_FILES", "50"))
+_bulk_executor = None
+_bulk_lock = threading.Lock()
+
+
+def _get_bulk_executor():
+    # created on first use so preloaded gunicorn workers each get their own threads
+    global _bulk_executor
+    with _bulk_lock:
+        if _bulk_executor is None:
+            _bulk_executor = ThreadPoolExecutor(max_workers=EXTRACT_BULK_WORKERS, thread_name_prefix="bulk-extract")
+        return _bulk_executor
+
+
+def _extract_bulk_one(index, filename, source):
+    """One file of a bulk request; never raises, `source` is released when done."""
+    t0 = time.perf_counter()
+    try:
+        payload, status_code, hit = _extract_file_cached(filename.lower(), source)
+        record = {"cache": "hit" if hit else "miss", **payload}
+    except Exception as e:
+        print(f"ERROR in /api/extract-text-bulk ({filename}): {e}")
+        import traceback
+        traceback.print_exc()
+        status_code, record = 500, {"error": "Failed to process the file. Check server logs for details."}
+    finally:
+        uploads.release(source)
+    return {"type": "file", "index": index, "filename": filename, "status": status_code,
+            "ms": _ms_since(t0), **record}
+
+
+@api.route('/api/extract-text-bulk', methods=['POST'])
+@cpu_bound
+def extract_text_bulk():
+    """
+    Extract many files (multipart field `files`, repeated) in one request.
+    NDJSON response: `start`, one `file` record per file in completion order
+    (`index` is its position in the upload, `status` the HTTP status
+    /api/extract-text would have returned), then `end`.
+    """
+    files = [f for f in request.files.getlist('files') if f.filename]
+    if not files:
+        return jsonify({"error": "No files in the request (field 'files')"}), 400
+    if len(files) > EXTRACT_BULK_MAX_FILES:
+        return jsonify({"error": f"At most {EXTRACT_BULK_MAX_FILES} files per request"}), 400
+
+    # the generator runs after the request is torn down: keep every upload alive until its file is done
+    sources = [uploads.take(f) for f in files]
+    names = [f.filename for f in files]
+
+    def generate():
+        t_start = time.perf_counter()
+        executor = _get_bulk_executor()
+        futures = {executor.submit(_extract_bulk_one, i, name, src): i
+                   for i, (name, src) in enumerate(zip(names, sources))}
+        errors = 0
+        try:
+            yield _ndjson({"type": "start", "files": len(futures)})
+            for fut in as_completed(futures):
+                record = fut.result()
+                errors += record["status"] >= 400
+                yield _ndjson(record)
+            yield _ndjson({"type": "end", "files": len(futures), "errors": errors, "ms": _ms_since(t_start)})
+        finally:
+            # client went away: drop files that have not started yet
+            for fut, i in futures.items():
+                if fut.cancel():
+                    uploads.release(sources[i])
+
+    return Response(stream_with_context(generate()), mimetype='application/x-ndjson',
+                    headers={"X-Accel-Buffering": "no"})
+
+
+@api.route('/api/form1/extract-fields', methods=['POST'])
+@cpu_bound
+def extract_form1_fields():
+    """
+    Typed Form1 fields from many documents: multipart `files` (extracted like
+    /api/extract-text-bulk) or JSON {"texts": [{"name", "text"}]}. Fields are
+    extracted per file, then merged by majority vote (see form1_fields.py).
+    The texts themselves are only returned with ?raw=1.
+    """
+    t_start = time.perf_counter()
+    texts, files_out = [], []
+    if request.is_json:
+        items = (request.get_json(silent=True) or {}).get("texts")
+        if not isinstance(items, list) or not items:
+            return jsonify({"error": "texts must be a non-empty list"}), 400
+        for i, item in enumerate(items):
+            item = item if isinstance(item, dict) else {"text": item}
+            texts.append((i, item.get("name") or f"text-{i + 1}", str(item.get("text") or "")))
+    else:
+        files = [f for f in request.files.getlist('files') if f.filename]
+        if not files:
+            return jsonify({"error": "No files in the request (field 'files')"}), 400
+        if len(files) > EXTRACT_BULK_MAX_FILES:
+            return jsonify({"error": f"At most {EXTRACT_BULK_MAX_FILES} files per request"}), 400
+        executor = _get_bulk_executor()
+        futures = [executor.submit(_extract_bulk_one, i, f.filename, uploads.take(f)) for i, f in enumerate(files)]
+        for fut in futures:
+            record = fut.result()
+            text = record.get("extracted_text")
+            if record["status"] >= 400 or not text or not text.strip():
+                files_out.append({"index": record["index"], "filename": record["filename"],
+                                  "status": record["status"], "error": record.get("error", "No text extracted")})
+                continue
+            texts.append((record["index"], record["filename"], text))
+
+    results = []
+    for index, name, text in texts:
+        result = form1_fields.extract(text)
+        results.append(result)
+        files_out.append({"index": index, "filename": name, "status": 200, **result})
+    files_out.sort(key=lambda f: f["index"])
+
+    merged = form1_fields.merge(results)
+    body = {
+        **merged,
+        "occurrences": form1_fields.occurrences([t for _, _, t in texts], merged["formData"]),
+        "options": {
+            "partName": list(dict.fromkeys(r["fields"]["partName"] for r in results if r["fields"]["partName"])),
+            "serialNumber": list(dict.fromkeys(r["fields"]["serialNumber"] for r in results
+                                               if r["fields"]["serialNumber"])),
+        },
+        "files": files_out,
+        "ms": _ms_since(t_start),
+    }
+    if request.args.get("raw") == "1":
+        body["rawTexts"] = [{"name": name, "text": text} for _, name, text in texts]
+    return jsonify(body), 200 if results else 422
+
+
+# IPS rows streamed by /api/extract-text-stream, in output order; drawing refs and
+# descriptions are free text, so only operations are dictionary-encoded
+IPS_ROW_SCHEMA = [("operation", columnar.STR), ("feature_no", columnar.TEXT),
+                  ("drawing_ref", columnar.TEXT), ("description", columnar.TEXT)]
+# header names (row 2, lower-cased) each field is read from
+IPS_ROW_COLUMNS = {"operation": "operation", "feature_no": "feature\nnumber",
+                   "drawing_ref": "drawing ref", "description": "description"}
+EXTRACT_STREAM_BATCH = int(os.environ.get("EXTRACT_STREAM_BATCH", "200"))   # rows per `rows` frame (default)
+EXTRACT_STREAM_BATCH_MAX = int(os.environ.get("EXTRACT_STREAM_BATCH_MAX", "5000"))   # cap for ?batch=
+_HAS_DIGIT = re.compile(r'\d')
+_HAS_LETTER = re.compile(r'[a-zA-Z]')
+
+
+@api.route('/api/extract-text-stream', methods=['POST'])
+@cpu_bound
 def extract_text_stream():
     """
-    Streams rows from a large Excel (xls/xlsx/xlsm) file as JSON array
-    so the frontend can render rows incrementally.
+    Streams rows from a large Excel (xls/xlsx/xlsm) file as NDJSON, one frame
+    per line, so the frontend can parse in linear time and render in batches:
+
+      {"type": "start", "filename", "sheet", "header": [...], "columns": {field: index or null}}
+      {"type": "rows", "offset": n, "rows": [{operation, feature_no, drawing_ref, description}, ...]}
+      {"type": "end", "rows": count, "ms": elapsed}
+      {"type": "error", "error": message}   (instead of `end` when the file cannot be read)
+
+    ?batch=N sets the rows per frame (default EXTRACT_STREAM_BATCH); each frame is flushed as it is written.
     """
     if 'file' not in request.files:
         return jsonify({"error": "No file part in the request"}), 400
@@ -907,51 +1156,77 @@ def extract_text_stream():
     if not filename.endswith(('.xlsm', '.xlsx', '.xls')):
         return jsonify({"error": "Only Excel files are supported for streaming"}), 400
 
-    def generate():
-        xlsm_bytes = io.BytesIO(file.read())
-        wb = openpyxl.load_workbook(xlsm_bytes, data_only=True, keep_vba=True, read_only=True)
-        ws = wb["Sheet2"] if "Sheet2" in wb.sheetnames else wb.active
-
-        # send JSON array start
-        yield '{"extracted_data":['
-        first = True
-
-        rows = ws.iter_rows(values_only=True)
-        try:
-            next(rows)  # skip row 1
-            header = [h.strip().lower() if isinstance(h, str) else None for h in next(rows)]  # header row 2
-        except StopIteration:
-            yield "]}"; return
-
-        for r in rows:
-            rd = dict(zip(header, r))
-            op = rd.get("operation")
-            feature_no_raw = rd.get("feature\nnumber")
-            feature_no = str(feature_no_raw).strip() if feature_no_raw else ""
-            # Only keep feature numbers that contain digits and no letters
-            if not feature_no or not re.search(r'\d', feature_no) or re.search(r'[a-zA-Z]', feature_no):
-                continue
-            if not op:
-                continue
-            item = {
-                "operation": str(op).strip(),
-                "feature_no": feature_no,
-                "drawing_ref": str(rd.get("drawing ref") or "").strip(),
-                "description": str(rd.get("description") or "").strip()
-            }
-            if not first:
-                yield ","
-            first = False
-            yield json.dumps(item)
+    try:
+        batch = int(request.args.get("batch", EXTRACT_STREAM_BATCH))
+    except ValueError:
+        return jsonify({"error": "batch must be an integer"}), 400
+    batch = min(max(batch, 1), EXTRACT_STREAM_BATCH_MAX)
 
-        yield "]}"
+    # the generator runs after the request is torn down: keep the spooled upload alive until it finishes
+    source = uploads.take(file)
+    return Response(stream_with_context(_ips_rows_ndjson(filename, source, batch)),
+                    mimetype='application/x-ndjson', headers={"X-Accel-Buffering": "no"})
 
-               
 
-    return Response(stream_with_context(generate()), mimetype='application/json')
+def _ips_rows_ndjson(filename, source, batch):
+    """Frames of /api/extract-text-stream. `source` comes from uploads.take() and is released at the end."""
+    t_start = time.perf_counter()
+    try:
+        with uploads.open_workbook(source) as wb:
+            ws = wb["Sheet2"] if "Sheet2" in wb.sheetnames else wb.active
+            rows = ws.iter_rows(values_only=True)
+            next(rows, None)  # skip row 1
+            raw_header = list(next(rows, None) or ())  # header row 2
+            header = [h.strip().lower() if isinstance(h, str) else None for h in raw_header]
+
+            # column positions instead of a dict per row (the last duplicate header wins, as before)
+            pos = {h: i for i, h in enumerate(header) if h is not None}
+            columns = {field: pos.get(name) for field, name in IPS_ROW_COLUMNS.items()}
+            yield _ndjson({"type": "start", "filename": filename, "sheet": ws.title,
+                           "header": [None if h is None else str(h) for h in raw_header], "columns": columns})
+
+            op_i, feat_i, ref_i, desc_i = (len(header) if i is None else i for i in columns.values())
+            table = columnar.Table(IPS_ROW_SCHEMA)
+            count = 0
+
+            def frame():
+                # rows are serialized straight from the table's columns, then dropped
+                out = '{"type": "rows", "offset": %d, "rows": [%s]}\n' % (count - len(table), ",".join(table.json_rows()))
+                table.clear()
+                return out
+
+            for r in rows:
+                # cells past the header are unnamed (a sheet without <dimension> can have longer data rows)
+                n = min(len(r), len(header))
+                op = r[op_i] if op_i < n else None
+                feature_no_raw = r[feat_i] if feat_i < n else None
+                feature_no = str(feature_no_raw).strip() if feature_no_raw else ""
+                # Only keep feature numbers that contain digits and no letters
+                if not feature_no or not _HAS_DIGIT.search(feature_no) or _HAS_LETTER.search(feature_no):
+                    continue
+                if not op:
+                    continue
+                ref = r[ref_i] if ref_i < n else None
+                desc = r[desc_i] if desc_i < n else None
+                table.append(str(op).strip(), feature_no, str(ref or "").strip(), str(desc or "").strip())
+                count += 1
+                if len(table) >= batch:
+                    yield frame()
+            if len(table):
+                yield frame()
+
+        yield _ndjson({"type": "end", "rows": count, "ms": _ms_since(t_start)})
+    except Exception as e:
+        print(f"ERROR in /api/extract-text-stream: {e}")
+        import traceback
+        traceback.print_exc()
+        yield _ndjson({"type": "error", "error": "Failed to process the file. Check server logs for details."})
+    finally:
+        uploads.release(source)
 
 
-@app.route('/api/ocr-image', methods=['POST'])
+@api.route('/api/ocr-image', methods=['POST'])
+@cpu_bound
 def ocr_cropped_image():
     if 'cropped_image' not in request.files:
         return jsonify({"error": "No cropped_image part in the request"}), 400
@@ -961,9 +1236,17 @@ def ocr_cropped_image():
         return jsonify({"error": "No file selected for cropping"}), 400
 
     try:
-        img = Image.open(file.stream)
-        extracted_text = ocr_image(img, psm=6)
-        return jsonify({"extracted_text": extracted_text})
+        source = uploads.source_of(file)
+        key = extract_cache.make_key(uploads.digest_source(source), route="ocr-image", psm=CROP_OCR_PSM,
+                                     ocr=_ocr_key())
+
+        def compute():
+            return {"extracted_text": ocr_engine.ocr_image(Image.open(uploads.open_source(source)), psm=CROP_OCR_PSM)}, 200
+
+        payload, status_code, hit = extract_cache.cache.get_or_compute(key, compute)
+        resp = jsonify(payload)
+        resp.headers["X-Cache"] = "hit" if hit else "miss"
+        return resp, status_code
     except Exception as e:
         print(f"ERROR in /api/ocr-image: {e}")
         import traceback
@@ -971,10 +1254,144 @@ def ocr_cropped_image():
         return jsonify({"error": "Failed to perform OCR on the cropped image."}), 500
 
 
+# ==============================
+# 📦 Chunked / resumable uploads
+# ==============================
+# init -> PUT chunks -> finalize; the finished file is then passed to the
+# extraction / CMM / save-form1 routes as `<field>_upload_id` (see chunked_uploads.py).
+@api.route('/api/uploads', methods=['POST'])
+def create_chunked_upload():
+    data = request.get_json(silent=True) or {}
+    if not isinstance(data, dict):
+        return jsonify({"error": "Request body must be a JSON object"}), 400
+    status = chunked_uploads.store.create(data.get("filename"), data.get("size"),
+                                          sha256=data.get("sha256"), content_type=data.get("content_type"))
+    return jsonify(status), 201
+
+
+@api.route('/api/uploads/stats', methods=['GET'])
+def chunked_upload_stats():
+    return jsonify(chunked_uploads.store.stats())
+
+
+@api.route('/api/uploads/<upload_id>', methods=['GET'])
+def chunked_upload_status(upload_id):
+    return jsonify(chunked_uploads.store.status(upload_id))
+
+
+@api.route('/api/uploads/<upload_id>', methods=['PUT'])
+def put_upload_chunk(upload_id):
+    offset = request.args.get("offset", request.headers.get("Upload-Offset"))
+    if offset is None:
+        return jsonify({"error": "offset is required"}), 400
+    # request.stream: the chunk is copied to disk as it arrives, never buffered whole
+    status = chunked_uploads.store.write_chunk(upload_id, offset, request.stream,
+                                               length=request.content_length)
+    return jsonify(status)
+
+
+@api.route('/api/uploads/<upload_id>/finalize', methods=['POST'])
+def finalize_chunked_upload(upload_id):
+    data = request.get_json(silent=True) or {}
+    if not isinstance(data, dict):
+        return jsonify({"error": "Request body must be a JSON object"}), 400
+    status = chunked_uploads.store.finalize(upload_id, sha256=data.get("sha256"),
+                                            digest=uploads.digest_source)
+    return jsonify(status)
+
+
+@api.route('/api/uploads/<upload_id>', methods=['DELETE'])
+def delete_chunked_upload(upload_id):
+    chunked_uploads.store.delete(upload_id)
+    return jsonify({"message": "Upload deleted"})
+
+
+# ==============================
+# ⏳ Background extraction jobs
+# ==============================
+# Same extraction as /api/extract-text, but the request returns a job id right
+# away and the client polls /api/jobs/<id> (or subscribes to /events).
+@api.route('/api/jobs/extract-text', methods=['POST'])
+def submit_extract_job():
+    if 'file' not in request.files:
+        return jsonify({"error": "No file part in the request"}), 400
+
+    file = request.files['file']
+    if file.filename == '':
+        return jsonify({"error": "No file selected"}), 400
+
+    source = uploads.take(file)
+    try:
+        job = ocr_jobs.jobs.submit("extract-text", _extract_job, file.filename.lower(), source,
+                                   name=file.filename)
+    except ocr_jobs.JobStoreFull:
+        uploads.release(source)
+        return jsonify({"error": "Too many extraction jobs pending, please retry"}), 503
+
+    return jsonify({
+        "job_id": job.id,
+        "status": job.status,
+        "status_url": f"/api/jobs/{job.id}",
+        "result_url": f"/api/jobs/{job.id}/result",
+        "events_url": f"/api/jobs/{job.id}/events",
+    }), 202
+
+
+@api.route('/api/jobs', methods=['GET'])
+def job_stats():
+    return jsonify(ocr_jobs.jobs.stats())
+
+
+@api.route('/api/jobs/<job_id>', methods=['GET'])
+def job_status(job_id):
+    snap = ocr_jobs.jobs.status(job_id)
+    if snap is None:
+        return jsonify({"error": "Unknown or expired job"}), 404
+    return jsonify(snap)
+
+
+@api.route('/api/jobs/<job_id>/result', methods=['GET'])
+def job_result(job_id):
+    snap = ocr_jobs.jobs.status(job_id)
+    if snap is None:
+        return jsonify({"error": "Unknown or expired job"}), 404
+    stored = ocr_jobs.jobs.result(job_id)
+    if stored is None:
+        if snap["status"] == ocr_jobs.ERROR:
+            return jsonify({"error": snap["error"]}), 500
+        return jsonify(snap), 202
+    payload, status_code = stored
+    return jsonify(payload), status_code
+
+
+@api.route('/api/jobs/<job_id>/events', methods=['GET'])
+def job_events(job_id):
+    """Server-sent events: one `data:` snapshot per change until the job finishes."""
+    snap = ocr_jobs.jobs.status(job_id)
+    if snap is None:
+        return jsonify({"error": "Unknown or expired job"}), 404
+
+    def generate(snap):
+        yield f"data: {json.dumps(snap)}\n\n"
+        while snap["status"] not in (ocr_jobs.DONE, ocr_jobs.ERROR):
+            nxt = ocr_jobs.jobs.wait(job_id, snap["version"], timeout=15.0)
+            if nxt is None:
+                return
+            if nxt["version"] == snap["version"]:
+                yield ": keep-alive\n\n"
+                continue
+            snap = nxt
+            yield f"data: {json.dumps(snap)}\n\n"
+
+    return Response(generate(snap), mimetype='text/event-stream',
+                    headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+
+
 # ==============================
 # 📊 CMM Parser
 # ==============================
-@app.route('/api/parse-cmm', methods=['POST'])
+@api.route('/api/parse-cmm', methods=['POST'])
+@cpu_bound
 def parse_cmm_report():
     """
     Accepts an Excel CMM measurement report and returns a merged mapping
@@ -991,69 +1408,18 @@ def parse_cmm_report():
         return jsonify({"error": "Only Excel files are supported"}), 400
 
     try:
-        xls_bytes = io.BytesIO(file.read())
-        wb = openpyxl.load_workbook(xls_bytes, data_only=True, read_only=True, keep_vba=True)
-
-        feature_map = {}        # key -> first/merged actual
-        feature_range_map = {}  # key -> min/max float
-        refer_only_keys = set()
-        detector_debug = []     # to help debugging which columns were detected
-
-        for sheet_name in wb.sheetnames:
-            ws = wb[sheet_name]
-            header_row_idx, feat_col_idx, act_col_idx = _find_header_row_and_cols(ws)
-
-            detector_debug.append({
-                "sheet": sheet_name,
-                "header_row_idx": header_row_idx,
-                "feature_col_idx": feat_col_idx,
-                "actual_col_idx": act_col_idx,
-            })
-
-            if feat_col_idx is None or act_col_idx is None:
-                continue
-
-            for r_idx, row in enumerate(ws.iter_rows(values_only=True), start=1):
-                if header_row_idx is not None and r_idx <= header_row_idx:
-                    continue
+        # sheets are parsed in worker processes from the spooled file, merged in sheet order
+        features, refer_only_keys, detector_debug = cmm_report.parse_workbook(uploads.source_of(file))
 
-                vals = list(row)
-                feat_raw = vals[feat_col_idx] if feat_col_idx < len(vals) else None
-                act_val = vals[act_col_idx] if act_col_idx < len(vals) else None
-                key = _normalize_feature_no(feat_raw)
-
-                if _is_refer_only(feat_raw) and key:
-                    refer_only_keys.add(key)
-                if not key:
-                    continue
-
-                val = _pick_first_actual(act_val)
-                if key not in feature_map or (not feature_map[key] and val):
-                    feature_map[key] = val
-
-                fv = _to_float(val)
-                if fv is not None:
-                    rng = feature_range_map.get(key)
-                    if rng is None:
-                        feature_range_map[key] = {"min": fv, "max": fv}
-                    else:
-                        if fv < rng["min"]:
-                            rng["min"] = fv
-                        if fv > rng["max"]:
-                            rng["max"] = fv
-
-        if not feature_map:
+        if not len(features):
             return jsonify({
                 "error": "Could not detect 'Feature Number' and 'Actual' columns in any sheet",
                 "detector_debug": detector_debug
             }), 400
 
-        return jsonify({
-            "feature_actual_map": feature_map,
-            "feature_range_map": feature_range_map,
-            "refer_only_keys": sorted(refer_only_keys),
-            "detector_debug": detector_debug
-        })
+        # serialized straight from the feature table's columns
+        return Response(cmm_report.response_json(features, refer_only_keys, detector_debug),
+                        mimetype='application/json')
 
     except Exception as e:
         print(f"ERROR in /api/parse-cmm: {e}")
@@ -1062,26 +1428,88 @@ def parse_cmm_report():
         return jsonify({"error": "Failed to parse CMM report."}), 500
 
 
+CMM_EVAL_MAX_ROWS = int(os.environ.get("CMM_EVAL_MAX_ROWS", "100000"))
+
+
+@api.route('/api/cmm/evaluate', methods=['POST'])
+@cpu_bound
+def evaluate_cmm():
+    """
+    Form 3 characteristics vs. CMM actuals, evaluated in bulk (cmm_eval.py).
+    JSON: {characteristics: [{feature_no, type, nominal, tol, high, low, upper,
+    lower, basic}], feature_actual_map, feature_range_map?, refer_only_keys?}
+    (a previous /api/parse-cmm result), or multipart with the CMM workbook as
+    `file` and `characteristics` as a JSON field. Returns columnar results.
+    """
+    t0 = time.perf_counter()
+    if request.files.get('file'):
+        try:
+            characteristics = json.loads(request.form.get("characteristics") or "[]")
+        except ValueError:
+            return jsonify({"error": "characteristics must be a JSON list"}), 400
+        try:
+            features, refer_only_keys, _ = cmm_report.parse_workbook(uploads.source_of(request.files['file']))
+        except Exception as e:
+            print(f"ERROR in /api/cmm/evaluate: {e}")
+            return jsonify({"error": "Failed to parse CMM report."}), 400
+    else:
+        data = request.get_json(silent=True) or {}
+        characteristics = data.get("characteristics")
+        feature_map = data.get("feature_actual_map")
+        feature_range_map = data.get("feature_range_map") or {}
+        refer_only_keys = data.get("refer_only_keys") or []
+        if not isinstance(feature_map, dict) or not isinstance(feature_range_map, dict):
+            return jsonify({"error": "feature_actual_map (object) or a CMM file is required"}), 400
+        features = cmm_report.features_from_maps(feature_map, feature_range_map)
+
+    if not isinstance(characteristics, list) or not all(isinstance(c, dict) for c in characteristics):
+        return jsonify({"error": "characteristics must be a list of objects"}), 400
+    if len(characteristics) > CMM_EVAL_MAX_ROWS:
+        return jsonify({"error": f"At most {CMM_EVAL_MAX_ROWS} characteristics per request"}), 400
+    unknown = {c.get("type") for c in characteristics} - set(cmm_eval.TOLERANCE_TYPES) - {None, ""}
+    if unknown:
+        return jsonify({"error": f"Unknown tolerance type(s): {', '.join(sorted(map(str, unknown)))}"}), 400
+
+    result = cmm_eval.evaluate(characteristics, features, refer_only_keys)
+    result["ms"] = round((time.perf_counter() - t0) * 1000, 1)
+    return jsonify(result)
+
+
 # ==============================
 # 🏷️ Supplier Autocomplete
 # ==============================
-@app.route("/api/suppliers", methods=["GET"])
+# Supplier dataset: loaded on first lookup, then watched for changes and
+# swapped in atomically (see supplier_registry.py)
+@api.route("/api/suppliers", methods=["GET"])
 def suppliers():
     try:
         prefix = request.args.get("prefix", "", type=str) or ""
         limit = request.args.get("limit", default=10, type=int)
-        p = _norm(prefix).lower()
-        matches = [s for s in SUPPLIER_NAMES if s.lower().startswith(p)] if p else SUPPLIER_NAMES[:]
-        if limit is not None and limit >= 0:
-            matches = matches[:limit]
-        return jsonify({"suppliers": matches})
+        fuzzy = request.args.get("fuzzy", "1") != "0"
+        matches = supplier_registry.registry.search(prefix, limit=limit, fuzzy=fuzzy)
+        resp = {"suppliers": [name for name, _, _ in matches]}
+        if request.args.get("detail") == "1":
+            resp["matches"] = [{"name": name, "match": kind, "score": score} for name, kind, score in matches]
+        return jsonify(resp)
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
+
+@api.route("/api/suppliers/registry", methods=["GET"])
+def supplier_registry_info():
+    """Dataset version, source file and load time of the live supplier index."""
+    return jsonify(supplier_registry.registry.info())
+
+
+@api.route("/api/suppliers/reload", methods=["POST"])
+def supplier_registry_reload():
+    swapped = supplier_registry.registry.reload(force=True)
+    return jsonify({"reloaded": swapped, **supplier_registry.registry.info()})
+
 # ==============================
 # 📥 Save Form1 PDF + Excel for Employee
 # ==============================
-@app.route("/api/employees/save-form1", methods=["POST"])
+@api.route("/api/employees/save-form1", methods=["POST"])
 def save_form1_files():
     try:
         employee_id = request.form.get("employee_id")
@@ -1091,23 +1519,226 @@ def save_form1_files():
         if not employee_id or not pdf_file or not excel_file:
             return jsonify({"error": "❌ employee_id, pdf, and excel are required"}), 400
 
-        pdf_data = pdf_file.read()
-        excel_data = excel_file.read()
+        cursor = get_cursor()
+        cursor.execute("SELECT employee_id FROM employees WHERE employee_id=%s", (employee_id,))
+        if not cursor.fetchone():
+            return jsonify({"error": "Employee not found"}), 404
 
-        cursor.execute(
-            "UPDATE employees SET form1_pdf=%s, form1_excel=%s WHERE employee_id=%s",
-            (pdf_data, excel_data, employee_id)
-        )
-        db.commit()
+        # files go to the content-addressed store (deduplicated); each save is a new version
+        pdf = file_store.store.put(uploads.source_of(pdf_file))
+        excel = file_store.store.put(uploads.source_of(excel_file))
+        version = file_store.add_form1_version(cursor, employee_id, pdf, excel,
+                                               pdf_file.filename, excel_file.filename)
+        get_db().commit()
 
-        return jsonify({"message": f"✅ Form1 PDF & Excel stored for employee {employee_id}"})
+        return jsonify({
+            "message": f"✅ Form1 PDF & Excel stored for employee {employee_id}",
+            "version": version,
+            "pdf_sha256": pdf.sha256,
+            "excel_sha256": excel.sha256,
+        })
+    except chunked_uploads.UploadError:
+        raise
     except Exception as e:
         print("❌ Error saving Form1 files:", e)
         return jsonify({"error": str(e)}), 500
 
 
+@api.route("/api/employees/<string:employee_id>/form1", methods=["GET"])
+def form1_history(employee_id):
+    """All saved Form1 versions for an employee, newest first."""
+    versions = file_store.form1_history(get_cursor(), employee_id)
+    for v in versions:
+        v["created_at"] = v["created_at"].strftime("%Y-%m-%d %H:%M:%S") if v.get("created_at") else "N/A"
+    return jsonify({"employee_id": employee_id, "versions": versions})
+
+
+def _send_stored(sha256, size, filename, last_modified, immutable=False, as_attachment=False):
+    """
+    Stream a stored blob in blocks. Handles Range (206/416), If-None-Match /
+    If-Modified-Since (304) and HEAD; the ETag is the content hash.
+    """
+    try:
+        f = file_store.store.open_blob(sha256)
+    except FileNotFoundError:
+        return jsonify({"error": "Stored file is missing"}), 404
+    mimetype = mimetypes.guess_type(filename)[0] or "application/octet-stream"
+    rv = Response(wrap_file(request.environ, f, buffer_size=64 * 1024), mimetype=mimetype, direct_passthrough=True)
+    rv.content_length = size
+    rv.set_etag(sha256)
+    rv.last_modified = last_modified
+    rv.headers.set("Content-Disposition", "attachment" if as_attachment else "inline", filename=filename)
+    if immutable:
+        # a numbered version never changes
+        rv.headers["Cache-Control"] = "private, max-age=31536000, immutable"
+    else:
+        rv.headers["Cache-Control"] = "private, no-cache"
+    return rv.make_conditional(request, accept_ranges=True, complete_length=size)
+
+
+@api.route("/api/employees/<string:employee_id>/form1/<version>/<kind>", methods=["GET"])
+def download_form1_file(employee_id, version, kind):
+    """
+    Download a stored Form1 file: kind = pdf | excel, version = number | latest.
+    ?download=1 sends it as an attachment instead of inline (PDF preview).
+    """
+    if kind not in ("pdf", "excel"):
+        return jsonify({"error": "kind must be pdf or excel"}), 400
+    if version != "latest" and not version.isdigit():
+        return jsonify({"error": "version must be a number or 'latest'"}), 400
+
+    row = file_store.form1_version(get_cursor(), employee_id, None if version == "latest" else int(version))
+    if not row or not row[f"{kind}_sha256"]:
+        return jsonify({"error": "Form1 file not found"}), 404
+
+    default_name = f"{employee_id}_form1_v{row['version']}" + (".pdf" if kind == "pdf" else ".xlsx")
+    return _send_stored(
+        row[f"{kind}_sha256"],
+        row[f"{kind}_size"],
+        row[f"{kind}_filename"] or default_name,
+        row["created_at"],
+        immutable=version != "latest",
+        as_attachment=request.args.get("download") == "1",
+    )
+
+
+# ==============================
+# 🖨️ Render Form1 PDF + Excel on the server
+# ==============================
+FORM1_RENDERERS = {"pdf": ("render_pdf", ".pdf"), "excel": ("render_xlsx", ".xlsx")}
+
+
+def _render_form1(payload, kind):
+    """Render one Form1 file into an anonymous temp file (rewound)."""
+    out = tempfile.TemporaryFile()
+    try:
+        getattr(form1_render, FORM1_RENDERERS[kind][0])(payload, out)
+    except BaseException:
+        out.close()
+        raise
+    out.seek(0)
+    return out
+
+
+@api.route("/api/form1/render", methods=["POST"])
+@cpu_bound
+def render_form1():
+    """
+    Body: {"formData": {...}, "rows": [...], "format": "pdf"|"excel", "employee_id": optional}.
+    Without employee_id the rendered file is returned as a download. With it,
+    both files are rendered and stored as the employee's next Form1 version.
+    """
+    payload = request.get_json(silent=True)
+    if not isinstance(payload, dict) or not isinstance(payload.get("formData"), dict):
+        return jsonify({"error": "formData is required"}), 400
+    if not isinstance(payload.get("rows", []), list):
+        return jsonify({"error": "rows must be a list"}), 400
+
+    employee_id = payload.get("employee_id")
+    if not employee_id:
+        kind = payload.get("format", "pdf")
+        if kind not in FORM1_RENDERERS:
+            return jsonify({"error": "format must be pdf or excel"}), 400
+        f = _render_form1(payload, kind)
+        size = os.fstat(f.fileno()).st_size
+        filename = "Form1_FAI_Report" + FORM1_RENDERERS[kind][1]
+        # no direct_passthrough: werkzeug skips call_on_close with it, and the CPU slot is released there
+        rv = Response(wrap_file(request.environ, f, buffer_size=64 * 1024),
+                      mimetype=mimetypes.guess_type(filename)[0])
+        rv.content_length = size
+        rv.headers.set("Content-Disposition", "attachment", filename=filename)
+        return rv
+
+    try:
+        cursor = get_cursor()
+        cursor.execute("SELECT employee_id FROM employees WHERE employee_id=%s", (employee_id,))
+        if not cursor.fetchone():
+            return jsonify({"error": "Employee not found"}), 404
+
+        stored = {}
+        for kind in FORM1_RENDERERS:
+            with _render_form1(payload, kind) as f:
+                stored[kind] = file_store.store.put(f)
+        pdf_name = f"{employee_id}_Form1_FAI_Report.pdf"
+        excel_name = f"{employee_id}_Form1_FAI_Report.xlsx"
+        version = file_store.add_form1_version(cursor, employee_id, stored["pdf"], stored["excel"],
+                                               pdf_name, excel_name)
+        get_db().commit()
+    except Exception as e:
+        print("❌ Error rendering Form1:", e)
+        return jsonify({"error": str(e)}), 500
+
+    base = f"/api/employees/{employee_id}/form1/{version}"
+    return jsonify({
+        "message": f"✅ Form1 PDF & Excel rendered for employee {employee_id}",
+        "version": version,
+        "pdf_sha256": stored["pdf"].sha256,
+        "excel_sha256": stored["excel"].sha256,
+        "pdf_url": base + "/pdf",
+        "excel_url": base + "/excel",
+    })
+
+
+# ==============================
+# 🗂️ Batch FAIR reports (one ZIP for many forms)
+# ==============================
+@api.route("/api/batch-reports", methods=["POST"])
+def submit_batch_reports():
+    """
+    Body: {"items": [{"form": "form1", "name": optional, "formData": {...}, "rows": [...]}, ...]}.
+    Rendered in worker processes as a background job; progress via the usual
+    /api/jobs/<id> (and /events) routes, the ZIP from download_url once done.
+    """
+    payload = request.get_json(silent=True) or {}
+    items = payload.get("items")
+    error = batch_reports.validate(items)
+    if error:
+        return jsonify({"error": error}), 400
+
+    batch_reports.sweep()
+    batch_id = uuid.uuid4().hex
+    try:
+        job = ocr_jobs.jobs.submit("batch-reports", batch_reports.run_batch, batch_id, items,
+                                   name=f"{len(items)} forms")
+    except ocr_jobs.JobStoreFull:
+        return jsonify({"error": "Too many jobs pending, please retry"}), 503
+
+    return jsonify({
+        "job_id": job.id,
+        "status": job.status,
+        "forms": len(items),
+        "status_url": f"/api/jobs/{job.id}",
+        "events_url": f"/api/jobs/{job.id}/events",
+        "download_url": f"/api/batch-reports/{job.id}/download",
+    }), 202
+
+
+@api.route("/api/batch-reports/<job_id>/download", methods=["GET"])
+def download_batch_reports(job_id):
+    snap = ocr_jobs.jobs.status(job_id)
+    if snap is None or snap["kind"] != "batch-reports":
+        return jsonify({"error": "Unknown or expired batch"}), 404
+    stored = ocr_jobs.jobs.result(job_id)
+    if stored is None:
+        if snap["status"] == ocr_jobs.ERROR:
+            return jsonify({"error": snap["error"]}), 500
+        return jsonify(snap), 202
+
+    path = batch_reports.zip_path(stored[0].get("archive"))
+    if not path or not os.path.isfile(path):
+        return jsonify({"error": "Batch archive has expired"}), 404
+    return send_file(path, mimetype="application/zip", as_attachment=True,
+                     download_name=f"FAIR_reports_{job_id[:8]}.zip", conditional=True)
+
+
+@api.route("/api/file-store/stats", methods=["GET"])
+def file_store_stats():
+    return jsonify(file_store.store.stats())
+
+
 # ==============================
 # 🚀 START SERVER
 # ==============================
+# Development only (single process, reloader). Production: see wsgi.py.
 if __name__ == "__main__":
-    app.run(port=5000, debug=True)
+    create_app().run(port=5000, debug=os.environ.get("FLASK_DEBUG", "1") == "1")
@@ -0,0 +1,148 @@
+# -*- coding: utf-8 -*-
+"""
+Batch FAIR report generation (/api/batch-reports).
+
+- A batch is a list of form payloads; each one is rendered in a worker process
+  (BATCH_REPORT_WORKERS, spawned once per server process and reused; see
+  process_pools.py) with the same renderers as /api/form1/render
+- The submitting side runs as an ocr_jobs job: progress is one step per form,
+  so /api/jobs/<id> and /api/jobs/<id>/events report it like any other job
+- Results are appended to BATCH_REPORT_DIR/<batch_id>.zip as each form finishes;
+  rendered files go through temp files, the archive is never held in memory
+- A failing form is recorded in the archive's manifest.json and the rest of the
+  batch carries on
+"""
+
+import os
+import re
+import json
+import time
+import shutil
+import zipfile
+import tempfile
+from concurrent.futures import as_completed
+from concurrent.futures.process import BrokenProcessPool
+
+import process_pools
+
+BATCH_REPORT_WORKERS = int(os.environ.get("BATCH_REPORT_WORKERS", process_pools.share("batch_reports")))
+BATCH_REPORT_MAX = int(os.environ.get("BATCH_REPORT_MAX", "500"))        # forms per batch
+BATCH_REPORT_TTL = float(os.environ.get("BATCH_REPORT_TTL", "1800"))     # seconds a finished ZIP is kept
+BATCH_REPORT_DIR = os.environ.get("BATCH_REPORT_DIR", os.path.join(tempfile.gettempdir(), "iampl-batch-reports"))
+
+# form type -> [(renderer in form1_render, file suffix)]; Forms 2 and 3 are still
+# rendered in the browser only
+RENDERERS = {
+    "form1": [("render_pdf", "_Form1_FAI_Report.pdf"), ("render_xlsx", "_Form1_FAI_Report.xlsx")],
+}
+
+_NAME_RE = re.compile(r"[^A-Za-z0-9._-]+")
+
+
+def validate(items):
+    """Error message for a malformed batch, or None."""
+    if not isinstance(items, list) or not items:
+        return "items must be a non-empty list"
+    if len(items) > BATCH_REPORT_MAX:
+        return f"At most {BATCH_REPORT_MAX} forms per batch"
+    for i, item in enumerate(items):
+        if not isinstance(item, dict) or not isinstance(item.get("formData"), dict):
+            return f"items[{i}]: formData is required"
+        if not isinstance(item.get("rows", []), list):
+            return f"items[{i}]: rows must be a list"
+        if item.get("form", "form1") not in RENDERERS:
+            return f"items[{i}]: no server-side renderer for {item.get('form')!r} (supported: {', '.join(RENDERERS)})"
+    return None
+
+
+def _base_name(index, item):
+    name = item.get("name") or item["formData"].get("partNumber") or "form"
+    return f"{index + 1:03d}_" + (_NAME_RE.sub("_", str(name)).strip("._") or "form")[:80]
+
+
+def render_item(index, item, out_dir):
+    """Worker process: render one form into out_dir; returns (index, [(arcname, path)], ms)."""
+    import form1_render
+
+    t0 = time.perf_counter()
+    base = _base_name(index, item)
+    files = []
+    for fn_name, suffix in RENDERERS[item.get("form", "form1")]:
+        path = os.path.join(out_dir, f"{index}{suffix}")
+        with open(path, "wb") as out:
+            getattr(form1_render, fn_name)(item, out)
+        files.append((base + suffix, path))
+    return index, files, round((time.perf_counter() - t0) * 1000, 1)
+
+
+_pool = process_pools.SpawnPool(lambda: BATCH_REPORT_WORKERS)
+
+
+def zip_path(batch_id):
+    if not re.fullmatch(r"[0-9a-f]{32}", batch_id or ""):
+        return None
+    return os.path.join(BATCH_REPORT_DIR, f"{batch_id}.zip")
+
+
+def sweep(now=None):
+    """Remove archives older than BATCH_REPORT_TTL."""
+    now = now or time.time()
+    try:
+        names = os.listdir(BATCH_REPORT_DIR)
+    except OSError:
+        return
+    for fname in names:
+        path = os.path.join(BATCH_REPORT_DIR, fname)
+        try:
+            if now - os.path.getmtime(path) > BATCH_REPORT_TTL:
+                os.remove(path)
+        except OSError:
+            pass
+
+
+def run_batch(batch_id, items, progress=None):
+    """ocr_jobs job function: render every item and build the ZIP; returns (payload, status_code)."""
+    os.makedirs(BATCH_REPORT_DIR, exist_ok=True)
+    final = zip_path(batch_id)
+    partial = final + ".part"
+    work_dir = tempfile.mkdtemp(prefix="batch-", dir=BATCH_REPORT_DIR)
+    manifest = [None] * len(items)
+    t0 = time.perf_counter()
+    try:
+        # PDF streams and XLSX (itself a zip) are already compressed: store them as-is
+        with zipfile.ZipFile(partial, "w", compression=zipfile.ZIP_STORED) as zf:
+            pool = _pool.get()
+            futures = {pool.submit(render_item, i, item, work_dir): i for i, item in enumerate(items)}
+            for fut in as_completed(futures):
+                i = futures[fut]
+                try:
+                    _, files, ms = fut.result()
+                except Exception as e:
+                    if isinstance(e, BrokenProcessPool):
+                        _pool.reset(pool)  # a worker died; the next batch gets a fresh pool
+                    manifest[i] = {"index": i, "name": _base_name(i, items[i]), "error": f"{type(e).__name__}: {e}"}
+                    if progress:
+                        progress(i + 1, len(items), "error", None)
+                    continue
+                for arcname, path in files:
+                    zf.write(path, arcname)   # streamed from disk in blocks
+                    os.remove(path)
+                manifest[i] = {"index": i, "name": _base_name(i, items[i]), "files": [a for a, _ in files], "ms": ms}
+                if progress:
+                    progress(i + 1, len(items), "ok", ms)
+            zf.writestr("manifest.json", json.dumps(manifest, indent=2), compress_type=zipfile.ZIP_DEFLATED)
+        os.replace(partial, final)
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+        if os.path.exists(partial):
+            os.remove(partial)
+
+    errors = [m for m in manifest if "error" in m]
+    return {
+        "forms": len(items),
+        "rendered": len(items) - len(errors),
+        "errors": errors,
+        "zip_bytes": os.path.getsize(final),
+        "ms": round((time.perf_counter() - t0) * 1000, 1),
+        "archive": batch_id,
+    }, 200
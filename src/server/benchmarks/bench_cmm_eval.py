@@ -0,0 +1,111 @@
+# -*- coding: utf-8 -*-
+"""
+CMM tolerance evaluation (cmm_eval.evaluate) vs. a per-feature loop, the way
+Form 3 compares one row at a time.
+
+    python benchmarks/bench_cmm_eval.py [--rows 1000 5000 20000] [--repeat 5]
+
+Characteristics mix all Form 3 tolerance types with text values as typed in
+the screen; some features were measured several times (feature_range_map),
+some not at all. Both implementations must agree on every verdict.
+"""
+
+import os
+import sys
+import time
+import random
+import argparse
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+import cmm_eval  # noqa: E402
+import cmm_report  # noqa: E402
+
+
+def synthetic(rows, rnd):
+    characteristics, actuals, ranges = [], {}, {}
+    for i in range(rows):
+        feature = f"{i // 4 + 1}-{i % 4 + 1}"
+        nominal = round(rnd.uniform(1, 200), 3)
+        kind = rnd.choice(cmm_eval.TOLERANCE_TYPES)
+        c = {"feature_no": feature, "type": kind}
+        if kind == cmm_eval.SYMMETRICAL:
+            c.update(nominal=str(nominal), tol="0.05")
+        elif kind == cmm_eval.BILATERAL:
+            c.update(nominal=str(nominal), high="+0.1", low="-0.02")
+        elif kind == cmm_eval.UNILATERAL_UPPER:
+            c.update(upper=f"{nominal} MAX")
+        elif kind == cmm_eval.UNILATERAL_LOWER:
+            c.update(lower=f"{nominal} MIN")
+        elif kind == cmm_eval.RANGE:
+            c.update(lower=str(nominal - 0.1), upper=str(nominal + 0.1))
+        else:
+            c.update(basic=str(nominal))
+        characteristics.append(c)
+        if rnd.random() < 0.95:
+            reading = nominal + rnd.gauss(0, 0.04)
+            actuals[feature] = f"{reading:.4f}"
+            if rnd.random() < 0.2:
+                ranges[feature] = {"min": reading - 0.01, "max": reading + 0.03}
+    return characteristics, actuals, ranges
+
+
+def per_feature(characteristics, actuals, ranges):
+    """One row at a time, plain floats."""
+    out = []
+    for c in characteristics:
+        key = cmm_report.normalize_feature_no(c["feature_no"])
+        num = lambda name: cmm_report.to_float(c.get(name))  # noqa: E731
+        kind, lower, upper = c["type"], None, None
+        if kind == cmm_eval.SYMMETRICAL and None not in (num("nominal"), num("tol")):
+            lower, upper = num("nominal") - abs(num("tol")), num("nominal") + abs(num("tol"))
+        elif kind == cmm_eval.BILATERAL and None not in (num("nominal"), num("low"), num("high")):
+            lower, upper = num("nominal") - abs(num("low")), num("nominal") + abs(num("high"))
+        elif kind == cmm_eval.UNILATERAL_UPPER and num("upper") is not None:
+            lower, upper = float("-inf"), num("upper")
+        elif kind == cmm_eval.UNILATERAL_LOWER and num("lower") is not None:
+            lower, upper = num("lower"), float("inf")
+        elif kind == cmm_eval.RANGE and None not in (num("lower"), num("upper")):
+            lower, upper = num("lower"), num("upper")
+        actual = cmm_report.to_float(actuals.get(key))
+        if lower is None:
+            out.append("unchecked")
+        elif actual is None:
+            out.append("missing")
+        else:
+            rng = ranges.get(key) or {"min": actual, "max": actual}
+            ok = rng["min"] >= lower - cmm_eval.CMM_EVAL_EPS and rng["max"] <= upper + cmm_eval.CMM_EVAL_EPS
+            out.append("pass" if ok else "fail")
+    return out
+
+
+def best_ms(fn, args, repeat):
+    best = None
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        result = fn(*args)
+        ms = (time.perf_counter() - t0) * 1000
+        best = ms if best is None else min(best, ms)
+    return best, result
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--rows", type=int, nargs="+", default=[1000, 5000, 20000])
+    ap.add_argument("--repeat", type=int, default=5)
+    ap.add_argument("--seed", type=int, default=7)
+    args = ap.parse_args()
+
+    print(f"{'rows':>8}{'per feature':>14}{'vectorized':>14}   summary")
+    for rows in args.rows:
+        data = synthetic(rows, random.Random(args.seed))
+        loop_ms, verdicts = best_ms(per_feature, data, args.repeat)
+        characteristics, actuals, ranges = data
+        features = cmm_report.features_from_maps(actuals, ranges)
+        vec_ms, result = best_ms(cmm_eval.evaluate, (characteristics, features), args.repeat)
+        assert result["data"]["status"] == verdicts
+        print(f"{rows:>8}{loop_ms:>11.1f} ms{vec_ms:>11.1f} ms   {result['summary']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,205 @@
+# -*- coding: utf-8 -*-
+"""
+CMM header detection on wide exports: the old _find_header_row_and_cols
+(uncompiled synonym lists, a second sheet pass when no header row exists, then
+the data pass) vs. cmm_report.find_header (one pass over the head rows, which
+are replayed for the data pass), cold and with its template cache warm.
+
+    python benchmarks/bench_cmm_header.py [--cols 200] [--rows 2000] [--sheets 4] [--repeat 3]
+
+Sheets alternate between a header row a few rows down and no header row at
+all (columns inferred from their contents), both read with openpyxl read-only.
+"""
+
+import io
+import os
+import re
+import sys
+import time
+import random
+import argparse
+from itertools import chain, islice
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+import openpyxl  # noqa: E402
+import cmm_report  # noqa: E402
+
+
+def legacy_find_header(ws, max_scan_rows=50):
+    """_find_header_row_and_cols as it was in api.py."""
+    feature_syns = [r"feature.?number", r"\bfeature\s*n(?:o|c)\b", r"\bfeature\s*nu", r"\bfeature\b",
+                    r"\bballoon\b", r"\bbubble\b", r"char(?:\.|acteristic)?\s*no", r"\bchar\s*no\b",
+                    r"\bdim(?:\.|ension)?\s*no\b", r"\bfeat\s*no\b", r"\bid\b"]
+    actual_syns = [r"\bactual\b", r"\bactua\b", r"\bmeasured\b", r"\bresult\b", r"\bvalue\b",
+                   r"\bmeasurement\b", r"\bread\b"]
+    best_row, best_score, cand_feat_idx, cand_act_idx = None, -1, None, None
+    for i, row in enumerate(ws.iter_rows(values_only=True), start=1):
+        if i > max_scan_rows:
+            break
+        row_vals = [str(c).strip().lower() if c is not None else "" for c in row]
+        if not any(row_vals):
+            continue
+        feat_idx, act_idx, score = None, None, 0
+        for idx, cell in enumerate(row_vals):
+            if not cell:
+                continue
+            if any(re.search(p, cell) for p in feature_syns):
+                if feat_idx is None:
+                    feat_idx = idx
+                score += 2
+            if any(re.search(p, cell) for p in actual_syns):
+                if act_idx is None:
+                    act_idx = idx
+                score += 2
+            if feat_idx is None and (cell.startswith("feature n") or cell.startswith("feature nu") or cell == "feature"):
+                feat_idx = idx
+                score += 1
+            if act_idx is None and (cell.startswith("actua") or cell.startswith("meas")
+                                    or cell.startswith("resul") or cell == "value"):
+                act_idx = idx
+                score += 1
+        if feat_idx is not None and act_idx is not None and score > best_score:
+            best_row, best_score, cand_feat_idx, cand_act_idx = i, score, feat_idx, act_idx
+    if cand_feat_idx is not None and cand_act_idx is not None:
+        return best_row, cand_feat_idx, cand_act_idx
+
+    col_stats = {}
+    for i, row in enumerate(ws.iter_rows(values_only=True), start=1):
+        if i > max_scan_rows:
+            break
+        for idx, v in enumerate(row):
+            st = col_stats.setdefault(idx, {"feature_like": 0, "numeric_like": 0})
+            if v is not None and str(v).strip() != "":
+                st["feature_like"] += cmm_report.is_feature_like(v)
+                st["numeric_like"] += cmm_report.is_numeric_like(v)
+    feature_col, actual_col, best_feat, best_num = None, None, -1, -1
+    for idx, st in col_stats.items():
+        if st["feature_like"] > best_feat and st["feature_like"] >= 3:
+            best_feat, feature_col = st["feature_like"], idx
+        if st["numeric_like"] > best_num and st["numeric_like"] >= 3:
+            best_num, actual_col = st["numeric_like"], idx
+    if feature_col is not None and actual_col is not None and feature_col != actual_col:
+        return None, feature_col, actual_col
+    return None, None, None
+
+
+def synthetic_workbook(cols, rows, sheets, rnd):
+    # a regular workbook writes <dimension> like Excel does; without it every
+    # read-only iter_rows() call first parses the whole sheet to size it
+    wb = openpyxl.Workbook()
+    wb.remove(wb.active)
+    for s in range(sheets):
+        ws = wb.create_sheet(f"Sheet{s + 1}")
+        with_header = s % 2 == 0
+        header_at = rnd.randint(3, 12) if with_header else 0
+        for r in range(1, rows + 1):
+            if r < header_at:
+                ws.append([f"Report line {r}", "Program", "CMM-07", None, "Operator"] + [None] * (cols - 5))
+            elif r == header_at:
+                names = [f"Col {c} Nominal" if c % 3 else f"Col {c} Tol" for c in range(cols)]
+                names[1], names[4] = "Feature Number", "Actual"
+                ws.append(names)
+            else:
+                # no-header sheets: text comment columns first, so detection needs the stats
+                row = [f"{r}-{rnd.randint(1, 9)}", f"Note {r}", f"Op {r % 7}"]
+                row += [round(rnd.uniform(-5, 50), 4) for _ in range(cols - 3)]
+                ws.append(row)
+    buf = io.BytesIO()
+    wb.save(buf)
+    return buf.getvalue()
+
+
+def run_legacy(data):
+    wb = openpyxl.load_workbook(io.BytesIO(data), read_only=True, data_only=True)
+    out = []
+    for name in wb.sheetnames:
+        ws = wb[name]
+        found = legacy_find_header(ws)
+        out.append(found)
+        n = sum(1 for _ in ws.iter_rows(values_only=True))  # data pass
+        assert n
+    wb.close()
+    return out
+
+
+def run_single_pass(data):
+    wb = openpyxl.load_workbook(io.BytesIO(data), read_only=True, data_only=True)
+    out = []
+    for name in wb.sheetnames:
+        rows = wb[name].iter_rows(values_only=True)
+        head = list(islice(rows, cmm_report.CMM_HEADER_SCAN_ROWS))
+        found, _ = cmm_report.find_header(head)
+        out.append(found)
+        n = sum(1 for _ in chain(head, rows))
+        assert n
+    wb.close()
+    return out
+
+
+def best_ms(fn, data, repeat):
+    best = None
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        result = fn(data)
+        ms = (time.perf_counter() - t0) * 1000
+        best = ms if best is None else min(best, ms)
+    return best, result
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--cols", type=int, default=200)
+    ap.add_argument("--rows", type=int, default=2000)
+    ap.add_argument("--sheets", type=int, default=4)
+    ap.add_argument("--repeat", type=int, default=3)
+    ap.add_argument("--seed", type=int, default=7)
+    args = ap.parse_args()
+
+    data = synthetic_workbook(args.cols, args.rows, args.sheets, random.Random(args.seed))
+    print(f"workbook: {args.sheets} sheets x {args.rows} rows x {args.cols} cols, {len(data) / 2 ** 20:.1f} MB")
+
+    legacy_ms, legacy = best_ms(run_legacy, data, args.repeat)
+
+    def cold(d):
+        cmm_report._cache.clear()
+        cmm_report._text_points.cache_clear()
+        return run_single_pass(d)
+
+    cold_ms, single = best_ms(cold, data, args.repeat)
+    warm_ms, _ = best_ms(run_single_pass, data, args.repeat)
+    assert legacy == single, (legacy, single)
+
+    print(f"detected: {single}")
+    print(f"{'legacy (2 passes)':<26}{legacy_ms:>10.1f} ms")
+    print(f"{'single pass, cold cache':<26}{cold_ms:>10.1f} ms")
+    print(f"{'single pass, warm cache':<26}{warm_ms:>10.1f} ms")
+
+    # detection alone, head rows already in memory
+    wb = openpyxl.load_workbook(io.BytesIO(data), read_only=True, data_only=True)
+    heads = [list(islice(wb[n].iter_rows(values_only=True), cmm_report.CMM_HEADER_SCAN_ROWS)) for n in wb.sheetnames]
+    wb.close()
+
+    class InMemorySheet:
+        def __init__(self, rows):
+            self.rows = rows
+
+        def iter_rows(self, values_only=True):
+            return iter(self.rows)
+
+    t0 = time.perf_counter()
+    for _ in range(args.repeat):
+        for head in heads:
+            legacy_find_header(InMemorySheet(head))
+    legacy_detect = (time.perf_counter() - t0) * 1000 / args.repeat / len(heads)
+    t0 = time.perf_counter()
+    for _ in range(args.repeat):
+        cmm_report._text_points.cache_clear()
+        for head in heads:
+            cmm_report._detect(head)
+    single_detect = (time.perf_counter() - t0) * 1000 / args.repeat / len(heads)
+    print(f"detect only, per sheet:   legacy {legacy_detect:.2f} ms, single pass {single_detect:.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
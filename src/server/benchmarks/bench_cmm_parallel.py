@@ -0,0 +1,95 @@
+# -*- coding: utf-8 -*-
+"""
+Per-sheet CMM parsing in worker processes (cmm_report.parse_workbook) vs. the
+sheets parsed one after another in the request process.
+
+    python benchmarks/bench_cmm_parallel.py [--sheets 8] [--rows 3000] [--cols 40] [--workers 4] [--repeat 3]
+
+The workbook is written to a temp file, like a spooled upload. Features repeat
+across sheets (with blank actuals on some of them) so the merge is exercised;
+both runs must return identical results. The first parallel run includes
+spawning the pool and is reported separately.
+"""
+
+import os
+import sys
+import time
+import random
+import argparse
+import tempfile
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+import openpyxl  # noqa: E402
+import cmm_report  # noqa: E402
+
+
+def synthetic_workbook(path, sheets, rows, cols, rnd):
+    wb = openpyxl.Workbook()
+    wb.remove(wb.active)
+    for s in range(sheets):
+        ws = wb.create_sheet(f"OP{(s + 1) * 10}")
+        ws.append([f"CMM report, operation {(s + 1) * 10}"])
+        ws.append(["Feature Number", "Nominal", "Upper Tol", "Lower Tol", "Actual"] +
+                  [f"Extra {c}" for c in range(cols - 5)])
+        for r in range(rows):
+            feature = f"{r % 1500 + 1}-{r // 1500 + 1}" if r % 97 else f"{r + 1} REF ONLY"
+            actual = None if rnd.random() < 0.05 else round(rnd.uniform(-5, 50), 4)
+            ws.append([feature, 10.0, 0.05, -0.05, actual] + [round(rnd.random(), 3) for _ in range(cols - 5)])
+    wb.save(path)
+
+
+def sequential(path):
+    saved = cmm_report.CMM_PARSE_WORKERS
+    cmm_report.CMM_PARSE_WORKERS = 1
+    try:
+        return cmm_report.parse_workbook(path)
+    finally:
+        cmm_report.CMM_PARSE_WORKERS = saved
+
+
+def timed(fn, *args):
+    t0 = time.perf_counter()
+    result = fn(*args)
+    return (time.perf_counter() - t0) * 1000, result
+
+
+def without_cache_flags(result):
+    # the header cache lives per process, so "cached" differs between the two runs
+    features, refer, debug = result
+    return features.to_columns(), refer, [{k: v for k, v in d.items() if k != "cached"} for d in debug]
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--sheets", type=int, default=8)
+    ap.add_argument("--rows", type=int, default=3000)
+    ap.add_argument("--cols", type=int, default=40)
+    ap.add_argument("--workers", type=int, default=max(2, os.cpu_count() or 1))
+    ap.add_argument("--repeat", type=int, default=3)
+    ap.add_argument("--seed", type=int, default=7)
+    args = ap.parse_args()
+
+    cmm_report.CMM_PARSE_WORKERS = args.workers
+    fd, path = tempfile.mkstemp(suffix=".xlsx")
+    os.close(fd)
+    try:
+        synthetic_workbook(path, args.sheets, args.rows, args.cols, random.Random(args.seed))
+        print(f"workbook: {args.sheets} sheets x {args.rows} rows x {args.cols} cols, "
+              f"{os.path.getsize(path) / 2 ** 20:.1f} MB; {args.workers} workers on {os.cpu_count()} CPUs")
+
+        first_ms, parallel = timed(cmm_report.parse_workbook, path)
+        seq_ms = min(timed(sequential, path)[0] for _ in range(args.repeat))
+        par_ms = min(timed(cmm_report.parse_workbook, path)[0] for _ in range(args.repeat))
+        assert without_cache_flags(parallel) == without_cache_flags(sequential(path))
+
+        print(f"features: {len(parallel[0])}, refer-only: {len(parallel[1])}")
+        print(f"{'sequential':<28}{seq_ms:>10.1f} ms")
+        print(f"{'parallel (pool spawn)':<28}{first_ms:>10.1f} ms")
+        print(f"{'parallel (warm pool)':<28}{par_ms:>10.1f} ms")
+    finally:
+        os.remove(path)
+
+
+if __name__ == "__main__":
+    main()
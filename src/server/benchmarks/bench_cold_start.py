@@ -0,0 +1,71 @@
+# -*- coding: utf-8 -*-
+"""
+Backend cold start: time and memory to `create_app()`, lazy vs. warmed.
+
+    python benchmarks/bench_cold_start.py [--top 15] [--runs 3]
+
+Each measurement runs in a fresh interpreter with `python -X importtime`:
+- lazy:   import api + create_app()            (what a worker pays by default)
+- warmed: the same, then api.warm()            (everything loaded up front)
+Prints wall time, RSS and the slowest top-level imports of the warmed run.
+"""
+
+import os
+import re
+import sys
+import json
+import argparse
+import subprocess
+
+SERVER_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+
+SNIPPET = """
+import json, time, sys
+t0 = time.perf_counter()
+import api, startup_profile
+api.create_app()
+if {warm}:
+    api.warm()
+r = startup_profile.report()
+r["wall_ms"] = round((time.perf_counter() - t0) * 1000, 1)
+print(json.dumps(r))
+"""
+
+_LINE = re.compile(r"import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)")
+
+
+def run(warm):
+    proc = subprocess.run([sys.executable, "-X", "importtime", "-c", SNIPPET.format(warm=warm)],
+                          cwd=SERVER_DIR, capture_output=True, text=True, check=True)
+    report = json.loads(proc.stdout.strip().splitlines()[-1])
+    top_level = []
+    for line in proc.stderr.splitlines():
+        m = _LINE.match(line)
+        if m and len(m.group(3)) == 1:  # one space of indent = imported directly by the snippet/api
+            top_level.append((int(m.group(2)) / 1000, m.group(4)))
+    return report, top_level
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--top", type=int, default=15)
+    ap.add_argument("--runs", type=int, default=3)
+    args = ap.parse_args()
+
+    results = {}
+    for label, warm in (("lazy", False), ("warmed", True)):
+        runs = [run(warm) for _ in range(args.runs)]
+        best = min(runs, key=lambda r: r[0]["wall_ms"])
+        results[label] = best
+        rep = best[0]
+        print(f"{label:<8} {rep['wall_ms']:>8.1f} ms   RSS {rep['rss_mb']} MB   "
+              f"heavy loaded: {', '.join(rep['heavy_modules_loaded']) or '-'}")
+
+    print("\nstages (lazy):", results["lazy"][0]["stages_ms"])
+    print("\nslowest top-level imports (warmed run, cumulative ms):")
+    for ms, name in sorted(results["warmed"][1], reverse=True)[:args.top]:
+        print(f"  {ms:>8.1f}  {name}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,170 @@
+# -*- coding: utf-8 -*-
+"""
+Columnar tables (columnar.Table) vs. a dict per row, for the two parsers that
+build rows: IPS characteristics (/api/extract-text-stream) and CMM features
+(/api/parse-cmm).
+
+    python benchmarks/bench_columnar.py [--rows 100000] [--repeat 3]
+
+For each path: memory held by the built rows (tracemalloc), time to build
+them, and time to serialize them (JSON rows; for CMM the response maps).
+Both outputs must decode to the same JSON.
+"""
+
+import os
+import sys
+import json
+import time
+import random
+import argparse
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+import columnar  # noqa: E402
+import cmm_report  # noqa: E402
+
+IPS_SCHEMA = [("operation", columnar.STR), ("feature_no", columnar.TEXT),
+              ("drawing_ref", columnar.STR), ("description", columnar.STR)]
+
+
+IPS_HEADER = ["sr no", "operation", "feature\nnumber", "drawing ref", "description", "nominal", "upper tol",
+              "lower tol", "instrument", "frequency", "remarks", "revision"]
+
+
+def ips_source(rows, rnd):
+    # sheet rows as openpyxl yields them (values_only), 12 columns wide
+    ops = [f"OP{10 * i}" for i in range(30)]
+    refs = [f"Sheet {s} Zone {z}" for s in range(1, 6) for z in "ABCDEFGH"]
+    descs = ["Diameter", "Length", "Flatness", "Position", "Surface finish", "Thread", "Chamfer", "Radius"]
+    return [(i + 1, rnd.choice(ops), f"{i + 1}", rnd.choice(refs), rnd.choice(descs), round(rnd.uniform(1, 100), 3),
+             0.05, -0.05, "CMM", "100%", None, "A") for i in range(rows)]
+
+
+def cmm_source(rows, rnd):
+    # several readings per feature, some without a numeric actual
+    out = []
+    for i in range(rows):
+        key = f"{i % (rows // 3) + 1}-{i % 2 + 1}"
+        val = "" if rnd.random() < 0.05 else f"{rnd.uniform(-5, 50):.4f}"
+        out.append((key, val))
+    return out
+
+
+def ips_dicts(src):
+    """The former extract-text-stream loop: dict(zip(header, row)) per row."""
+    items = []
+    for r in src:
+        rd = dict(zip(IPS_HEADER, r))
+        items.append({
+            "operation": str(rd.get("operation")).strip(),
+            "feature_no": str(rd.get("feature\nnumber")).strip(),
+            "drawing_ref": str(rd.get("drawing ref") or "").strip(),
+            "description": str(rd.get("description") or "").strip(),
+        })
+    return items
+
+
+def ips_table(src):
+    """Column positions looked up once, rows appended to a columnar.Table."""
+    table = columnar.Table(IPS_SCHEMA)
+    op_i, feat_i, ref_i, desc_i = (IPS_HEADER.index(n) for n in ("operation", "feature\nnumber", "drawing ref", "description"))
+    for r in src:
+        table.append(str(r[op_i]).strip(), str(r[feat_i]).strip(), str(r[ref_i] or "").strip(), str(r[desc_i] or "").strip())
+    return table
+
+
+def ips_dicts_out(rows):
+    return "[" + ",".join(json.dumps(item) for item in rows) + "]"
+
+
+def ips_table_out(table):
+    return "[" + ",".join(table.json_rows()) + "]"
+
+
+def cmm_dicts(src):
+    feature_map, feature_range_map = {}, {}
+    for key, val in src:
+        if key not in feature_map or (not feature_map[key] and val):
+            feature_map[key] = val
+        fv = cmm_report.to_float(val)
+        if fv is not None:
+            rng = feature_range_map.get(key)
+            if rng is None:
+                feature_range_map[key] = {"min": fv, "max": fv}
+            else:
+                if fv < rng["min"]:
+                    rng["min"] = fv
+                if fv > rng["max"]:
+                    rng["max"] = fv
+    return feature_map, feature_range_map
+
+
+def cmm_table(src):
+    features = cmm_report.new_features()
+    actuals, mins, maxs = features.texts("actual"), features.floats("min"), features.floats("max")
+    for key, val in src:
+        fv = cmm_report.to_float(val)
+        cmm_report._add_reading(features, actuals, mins, maxs, key, val, fv, fv)
+    return features
+
+
+def cmm_dicts_out(maps):
+    feature_map, feature_range_map = maps
+    return json.dumps({"feature_actual_map": feature_map, "feature_range_map": feature_range_map,
+                       "refer_only_keys": [], "detector_debug": []}, sort_keys=True)
+
+
+def cmm_table_out(features):
+    return cmm_report.response_json(features, [], [])
+
+
+def held_bytes(build, src):
+    tracemalloc.start()
+    try:
+        before = tracemalloc.get_traced_memory()[0]
+        built = build(src)
+        return built, tracemalloc.get_traced_memory()[0] - before
+    finally:
+        tracemalloc.stop()
+
+
+def best_ms(fn, arg, repeat):
+    best, result = None, None
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        result = fn(arg)
+        ms = (time.perf_counter() - t0) * 1000
+        best = ms if best is None else min(best, ms)
+    return best, result
+
+
+def compare(label, src, paths, repeat):
+    outputs = []
+    print(f"\n{label}")
+    print(f"{'':<14}{'held MB':>10}{'build ms':>11}{'json ms':>10}")
+    for name, build, serialize in paths:
+        built, held = held_bytes(build, src)
+        build_ms, built = best_ms(build, src, repeat)
+        out_ms, out = best_ms(serialize, built, repeat)
+        outputs.append(json.loads(out))
+        print(f"{name:<14}{held / 2 ** 20:>10.1f}{build_ms:>11.1f}{out_ms:>10.1f}")
+    assert all(o == outputs[0] for o in outputs[1:]), f"{label}: outputs differ"
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--rows", type=int, default=100000)
+    ap.add_argument("--repeat", type=int, default=3)
+    ap.add_argument("--seed", type=int, default=7)
+    args = ap.parse_args()
+
+    rnd = random.Random(args.seed)
+    compare(f"IPS rows ({args.rows:,})", ips_source(args.rows, rnd),
+            [("dict per row", ips_dicts, ips_dicts_out), ("columnar", ips_table, ips_table_out)], args.repeat)
+    compare(f"CMM readings ({args.rows:,})", cmm_source(args.rows, rnd),
+            [("dict per key", cmm_dicts, cmm_dicts_out), ("columnar", cmm_table, cmm_table_out)], args.repeat)
+
+
+if __name__ == "__main__":
+    main()
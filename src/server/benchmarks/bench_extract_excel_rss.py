@@ -0,0 +1,148 @@
+# -*- coding: utf-8 -*-
+"""
+Peak RSS of the /api/extract-text Excel branch on large IPS workbooks:
+
+  legacy    the former path: load_workbook(keep_vba=True), list(ws.iter_rows()),
+            a dict per row, one json.dumps of the whole payload
+  list      the same without keep_vba (what the row list alone costs)
+  streamed  api._ips_items() through api._ips_json_stream(), as served now
+
+    python benchmarks/bench_extract_excel_rss.py [--rows 50000 100000] [--cols 12]
+
+Each variant runs in a fresh subprocess so its peak RSS is its own; "over base"
+subtracts a run that only imports the same modules.
+All variants must produce identical bytes.
+"""
+
+import os
+import sys
+import json
+import time
+import random
+import hashlib
+import argparse
+import resource
+import tempfile
+import subprocess
+
+SERVER_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+sys.path.insert(0, SERVER_DIR)
+
+
+def synthetic_workbook(path, rows, cols, rnd):
+    import openpyxl
+    wb = openpyxl.Workbook(write_only=True)
+    ws = wb.create_sheet("Sheet2")
+    ws.append(["INSPECTION PLAN SHEET"])
+    ws.append(["Sr No", "Operation", "Feature\nNumber", "Drawing Ref", "Description"] +
+              [f"Col {c}" for c in range(cols - 5)])
+    descs = ["Diameter", "Length", "Flatness", "Position", "Surface finish", "Thread", "Chamfer", "Radius"]
+    for i in range(rows):
+        ws.append([i + 1, f"OP{10 * (i % 30)}", f"{i + 1}", f"Sheet {i % 5 + 1} Zone {'ABCDEFGH'[i % 8]}",
+                   rnd.choice(descs)] + [round(rnd.uniform(1, 100), 3) for _ in range(cols - 5)])
+    wb.save(path)
+
+
+def legacy(path, keep_vba=True):
+    """The former Excel branch: every row, then every item, then the whole JSON text."""
+    import openpyxl
+    import api  # noqa: F401  (same imports as the streamed run)
+    with open(path, "rb") as fh:
+        wb = openpyxl.load_workbook(fh, data_only=True, keep_vba=keep_vba, read_only=True)
+        ws = wb["Sheet2"] if "Sheet2" in wb.sheetnames else wb.active
+        rows = list(ws.iter_rows(values_only=True))
+        wb.close()
+    header = [h.strip().lower() if isinstance(h, str) else None for h in rows[1]]
+    data = []
+    for r in rows[2:]:
+        rd = dict(zip(header, r))
+        op, feat, ref, desc = rd.get("operation"), rd.get("feature\nnumber"), rd.get("drawing ref"), rd.get("description")
+        if op:
+            data.append({"operation": str(op).strip(), "feature_no": str(feat).strip() if feat else "",
+                         "drawing_ref": str(ref).strip() if ref else "", "description": str(desc).strip() if desc else ""})
+    # as jsonify() encodes it
+    yield json.dumps({"extracted_data": data}, sort_keys=True, separators=(",", ":")) + "\n"
+
+
+def as_list(path):
+    return legacy(path, keep_vba=False)
+
+
+def streamed(path):
+    import api
+    items = api._ips_items(path)
+    # uploads.release() only deletes spooled uploads; the benchmark file is left alone
+    yield from api._ips_json_stream(items, path)
+
+
+def baseline(path):
+    import openpyxl  # noqa: F401
+    import api  # noqa: F401
+    with open(path, "rb") as fh:
+        fh.read(1)
+    return iter(())
+
+
+def peak_rss():
+    """Peak RSS of this process in bytes. VmHWM starts over at exec; ru_maxrss can carry the parent's peak."""
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    # ru_maxrss is KiB on Linux, bytes on macOS
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * (1 if sys.platform == "darwin" else 1024)
+
+
+def run_variant(name, path):
+    """Child process: write the response chunks to a hash, report peak RSS."""
+    fn = {"legacy": legacy, "list": as_list, "streamed": streamed, "baseline": baseline}[name]
+    h, size = hashlib.md5(), 0
+    t0 = time.perf_counter()
+    for chunk in fn(path):
+        data = chunk.encode("utf-8")
+        h.update(data)
+        size += len(data)
+    ms = (time.perf_counter() - t0) * 1000
+    rss = peak_rss()
+    print(json.dumps({"rss": rss, "ms": ms, "bytes": size, "md5": h.hexdigest()}))
+
+
+def measure(name, path):
+    out = subprocess.run([sys.executable, os.path.abspath(__file__), "--child", name, path],
+                         check=True, capture_output=True, text=True).stdout
+    return json.loads(out.strip().splitlines()[-1])
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--rows", type=int, nargs="+", default=[50000, 100000])
+    ap.add_argument("--cols", type=int, default=12)
+    ap.add_argument("--seed", type=int, default=7)
+    ap.add_argument("--child", nargs=2, help=argparse.SUPPRESS)
+    args = ap.parse_args()
+
+    if args.child:
+        return run_variant(*args.child)
+
+    print(f"{'rows':>8}{'file MB':>9}{'variant':>10}{'peak RSS MB':>13}{'over base':>11}{'ms':>9}{'JSON MB':>9}")
+    for rows in args.rows:
+        fd, path = tempfile.mkstemp(suffix=".xlsx")
+        os.close(fd)
+        try:
+            synthetic_workbook(path, rows, args.cols, random.Random(args.seed))
+            file_mb = os.path.getsize(path) / 2 ** 20
+            base = measure("baseline", path)
+            results = {name: measure(name, path) for name in ("legacy", "list", "streamed")}
+            assert len({r["md5"] for r in results.values()}) == 1, "outputs differ"
+            for name, r in results.items():
+                print(f"{rows:>8}{file_mb:>9.1f}{name:>10}{r['rss'] / 2 ** 20:>13.1f}"
+                      f"{(r['rss'] - base['rss']) / 2 ** 20:>11.1f}{r['ms']:>9.0f}{r['bytes'] / 2 ** 20:>9.1f}")
+        finally:
+            os.remove(path)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+# -*- coding: utf-8 -*-
+"""
+Server-side Form1 rendering (form1_render.py) for growing part-number indexes.
+
+    python benchmarks/bench_form1_render.py [--rows 100 1000 5000] [--repeat 3]
+
+Builds a synthetic Form1 payload (same shape the screen posts) and times the
+PDF and XLSX renderers into memory, reporting ms, output size and page count.
+"""
+
+import io
+import os
+import sys
+import time
+import random
+import argparse
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+import form1_render  # noqa: E402
+
+PART_TYPES = ["Detail", "Assembly", "Standard", "Raw Material", "Special Process"]
+SUPPLIERS = ["Acme Components", "Globex Engineering Pvt Ltd", "Initech Precision", "Umbrella Machining GmbH"]
+
+
+def synthetic_payload(n, rnd):
+    form = {
+        "partNumber": "IAM-7731-204", "customerPartNumber": "C-55120", "partName": "Bracket Assembly, Main",
+        "serialNumber": "SN-0001", "fairIdentifier": "FAIR-2024-018", "fullFAI": True, "detailFAI": True,
+        "faiReasonDropdown": "New part", "faiReasonCode": "R-01", "organizationName": "IAMPL",
+        "customer": "Globex", "program": "A320", "comments": "Synthetic benchmark payload. " * 10,
+    }
+    rows = []
+    for i in range(n):
+        form[f"indexPartNumber_{i}"] = f"IAM-{rnd.randint(1000, 9999)}-{i:04d}"
+        form[f"indexPartName_{i}"] = rnd.choice(["Bracket", "Bolt, hex head", "Washer", "Machined housing, left hand"])
+        form[f"indexPartType_{i}"] = rnd.choice(PART_TYPES)
+        form[f"indexSupplier_{i}"] = rnd.choice(SUPPLIERS)
+        form[f"indexFairIdentifier_{i}"] = f"FAIR-{i:05d}"
+        rows.append({"referenceFile": {"name": f"drawing_{i:05d}_rev_{rnd.choice('ABC')}.pdf"}})
+    return {"formData": form, "rows": rows}
+
+
+def best_of(fn, repeat):
+    best, out = None, None
+    for _ in range(repeat):
+        buf = io.BytesIO()
+        t0 = time.perf_counter()
+        fn(buf)
+        ms = (time.perf_counter() - t0) * 1000
+        if best is None or ms < best:
+            best, out = ms, buf.getvalue()
+    return best, out
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--rows", type=int, nargs="+", default=[100, 1000, 5000])
+    ap.add_argument("--repeat", type=int, default=3)
+    ap.add_argument("--seed", type=int, default=7)
+    args = ap.parse_args()
+
+    rnd = random.Random(args.seed)
+    print(f"{'rows':>6}  {'pdf ms':>9}  {'pdf KB':>8}  {'pages':>5}  {'xlsx ms':>9}  {'xlsx KB':>8}")
+    for n in args.rows:
+        payload = synthetic_payload(n, rnd)
+        pdf_ms, pdf = best_of(lambda out: form1_render.render_pdf(payload, out), args.repeat)
+        xlsx_ms, xlsx = best_of(lambda out: form1_render.render_xlsx(payload, out), args.repeat)
+        pages = pdf.count(b"/Type /Page\n") or pdf.count(b"/Type /Page ")
+        print(f"{n:>6}  {pdf_ms:>9.1f}  {len(pdf) / 1024:>8.1f}  {pages:>5}  {xlsx_ms:>9.1f}  {len(xlsx) / 1024:>8.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+# -*- coding: utf-8 -*-
+"""
+Per-call pytesseract subprocess vs. warm tesserocr handle pool.
+
+    python benchmarks/bench_ocr_engine.py [--calls 40] [--threads 4] [--image crop.png]
+
+Without --image a synthetic crop (a few lines of drawing-title-block text) is
+rendered, which is the typical size sent to /api/ocr-image. Needs the
+tesseract binary; the tesserocr column is skipped when tesserocr is missing.
+"""
+
+import os
+import sys
+import time
+import argparse
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from PIL import Image, ImageDraw  # noqa: E402
+
+import ocr_engine  # noqa: E402
+
+
+def synthetic_crop():
+    img = Image.new("RGB", (900, 160), "white")
+    draw = ImageDraw.Draw(img)
+    lines = ["PART NUMBER: 7A-1140-223 REV C", "SERIAL NO: SN004512", "DRAWING NO: DWG-99812 SHEET 2"]
+    for i, line in enumerate(lines):
+        draw.text((12, 12 + i * 45), line, fill="black")
+    return img.resize((1800, 320))
+
+
+def run(engine, img, calls, threads, psm):
+    gray = img.convert("L")
+    engine.recognize(gray, psm)  # warm-up (first handle / page cache)
+    t0 = time.perf_counter()
+    if threads <= 1:
+        for _ in range(calls):
+            engine.recognize(gray, psm)
+    else:
+        with ThreadPoolExecutor(max_workers=threads) as ex:
+            list(ex.map(lambda _: engine.recognize(gray, psm), range(calls)))
+    elapsed = time.perf_counter() - t0
+    return elapsed, 1000 * elapsed / calls
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--calls", type=int, default=40)
+    ap.add_argument("--threads", type=int, default=4)
+    ap.add_argument("--psm", type=int, default=6)
+    ap.add_argument("--image", help="crop to OCR instead of the synthetic one")
+    args = ap.parse_args()
+
+    img = Image.open(args.image) if args.image else synthetic_crop()
+    engines = [ocr_engine.SubprocessEngine()]
+    try:
+        engines.append(ocr_engine.TesserocrEngine(size=args.threads))
+    except ImportError:
+        print("tesserocr not installed: only the subprocess engine is measured")
+
+    print(f"{args.calls} calls, image {img.size[0]}x{img.size[1]}, psm {args.psm}")
+    print(f"{'engine':<12} {'threads':>7} {'total s':>9} {'ms/call':>9}")
+    for engine in engines:
+        for threads in (1, args.threads):
+            total, per_call = run(engine, img, args.calls, threads, args.psm)
+            print(f"{engine.name:<12} {threads:>7} {total:>9.2f} {per_call:>9.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+# -*- coding: utf-8 -*-
+"""
+Supplier autocomplete: linear scan (old /api/suppliers) vs. SupplierIndex.
+
+    python benchmarks/bench_supplier_index.py [--names 50000] [--queries 2000]
+
+Generates a synthetic vendor list and replays keystroke-style queries
+("a", "ac", "acm", ...), plus mid-word and misspelled queries for the index.
+"""
+
+import os
+import sys
+import time
+import random
+import argparse
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+import supplier_index  # noqa: E402
+
+WORDS = ["Acme", "Globex", "Initech", "Umbrella", "Precision", "Aero", "Machining", "Engineering",
+         "Components", "Castings", "Forge", "Tooling", "Systems", "Industries", "Metals", "Composites",
+         "Dynamics", "Fasteners", "Hydraulics", "Avionics", "Alloys", "Coatings", "Works", "Technik"]
+SUFFIX = ["Ltd", "Pvt Ltd", "Inc", "GmbH", "LLC", "Co", "SA", "AB"]
+
+
+def synthetic_names(n, rnd):
+    names = set()
+    while len(names) < n:
+        parts = rnd.sample(WORDS, rnd.randint(1, 3))
+        names.add(" ".join(parts) + f" {rnd.randint(1, 999)} " + rnd.choice(SUFFIX))
+    return sorted(names)
+
+
+def keystrokes(names, count, rnd):
+    out = []
+    while len(out) < count:
+        name = rnd.choice(names)
+        for i in range(1, min(len(name), 8) + 1):
+            out.append(name[:i])
+    return out[:count]
+
+
+def typo(word, rnd):
+    i = rnd.randrange(len(word) - 1)
+    return word[:i] + word[i + 1] + word[i] + word[i + 2:]
+
+
+def linear(names, p, limit):
+    p = p.lower()
+    return [s for s in names if s.lower().startswith(p)][:limit]
+
+
+def timed(fn, queries):
+    t0 = time.perf_counter()
+    for q in queries:
+        fn(q)
+    elapsed = time.perf_counter() - t0
+    return 1e6 * elapsed / len(queries)
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--names", type=int, default=50000)
+    ap.add_argument("--queries", type=int, default=2000)
+    ap.add_argument("--limit", type=int, default=10)
+    args = ap.parse_args()
+
+    rnd = random.Random(7)
+    names = synthetic_names(args.names, rnd)
+    prefixes = keystrokes(names, args.queries, rnd)
+    midword = [rnd.choice(WORDS)[:4].lower() for _ in range(args.queries)]
+    typos = [typo(rnd.choice(WORDS), rnd) for _ in range(args.queries)]
+
+    t0 = time.perf_counter()
+    index = supplier_index.SupplierIndex(names)
+    build_ms = 1000 * (time.perf_counter() - t0)
+
+    print(f"{len(names)} names, index built in {build_ms:.0f} ms\n")
+    print(f"{'queries':<22}{'linear scan':>14}{'index':>14}")
+    print(f"{'prefix (keystrokes)':<22}{timed(lambda q: linear(names, q, args.limit), prefixes):>11.1f} us"
+          f"{timed(lambda q: index.search(q, args.limit, fuzzy=False), prefixes):>11.1f} us")
+    print(f"{'prefix + fuzzy fill':<22}{'':>14}"
+          f"{timed(lambda q: index.search(q, args.limit), prefixes):>11.1f} us")
+    print(f"{'mid-word':<22}{'n/a':>14}{timed(lambda q: index.search(q, args.limit), midword):>11.1f} us")
+    print(f"{'typo (fuzzy)':<22}{'n/a':>14}{timed(lambda q: index.search(q, args.limit), typos):>11.1f} us")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,157 @@
+# -*- coding: utf-8 -*-
+"""
+xlsx_reader vs. openpyxl on macro-heavy .xlsm workbooks, reading one IPS
+sheet the way /api/extract-text does.
+
+    python benchmarks/bench_xlsx_reader.py [--rows 20000 100000] [--vba-mb 16] [--other-rows 50000]
+
+The workbook has the IPS sheet (Sheet2), a large sheet that is not read, a
+VBA project and embedded media of --vba-mb each. Variants, each in a fresh
+subprocess so peak RSS is its own:
+
+  keep_vba   openpyxl.load_workbook(read_only=True, keep_vba=True), the former path
+  openpyxl   openpyxl read-only without keep_vba
+  etree      xlsx_reader with xml.etree iterparse
+  lxml       xlsx_reader with lxml iterparse (skipped when lxml is missing)
+
+Reported: time to the first row, total time, peak RSS over an import-only
+baseline. All variants must yield the same rows.
+"""
+
+import os
+import sys
+import json
+import time
+import random
+import hashlib
+import zipfile
+import argparse
+import resource
+import tempfile
+import subprocess
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+MACRO_CONTENT_TYPE = "application/vnd.ms-excel.sheet.macroEnabled.main+xml"
+XLSX_CONTENT_TYPE = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"
+
+
+def synthetic_xlsm(path, rows, other_rows, vba_mb, rnd):
+    import openpyxl
+    wb = openpyxl.Workbook(write_only=True)
+    other = wb.create_sheet("Sheet1")   # lookup data the extractor never reads
+    for i in range(other_rows):
+        other.append([f"LK{i}", rnd.random(), rnd.random(), f"note {i % 977}"])
+    ws = wb.create_sheet("Sheet2")
+    ws.append(["INSPECTION PLAN SHEET"])
+    ws.append(["Sr No", "Operation", "Feature\nNumber", "Drawing Ref", "Description", "Nominal", "Upper Tol",
+               "Lower Tol", "Instrument", "Frequency", "Remarks", "Revision"])
+    descs = ["Diameter", "Length", "Flatness", "Position", "Surface finish", "Thread", "Chamfer", "Radius"]
+    for i in range(rows):
+        ws.append([i + 1, f"OP{10 * (i % 30)}", f"{i + 1}", f"Sheet {i % 5 + 1} Zone {'ABCDEFGH'[i % 8]}",
+                   rnd.choice(descs), round(rnd.uniform(1, 100), 3), 0.05, -0.05, "CMM", "100%", None, "A"])
+    tmp = path + ".tmp"
+    wb.save(tmp)
+
+    # repackage as .xlsm: macro content type, a VBA project and media, stored the way Excel stores them
+    blob = rnd.randbytes(vba_mb * 2 ** 20)
+    with zipfile.ZipFile(tmp) as src, zipfile.ZipFile(path, "w", zipfile.ZIP_DEFLATED) as dst:
+        for item in src.infolist():
+            data = src.read(item.filename)
+            if item.filename == "[Content_Types].xml":
+                data = data.replace(XLSX_CONTENT_TYPE.encode(), MACRO_CONTENT_TYPE.encode()).replace(
+                    b"</Types>", b'<Default Extension="bin" ContentType="application/vnd.ms-office.vbaProject"/>'
+                                 b'<Default Extension="png" ContentType="image/png"/></Types>')
+            dst.writestr(item, data)
+        dst.writestr("xl/vbaProject.bin", blob)
+        dst.writestr("xl/media/image1.png", blob[::-1])
+    os.remove(tmp)
+
+
+def read_rows(name, path):
+    """Open the workbook, read every row of Sheet2; (first row ms, rows digest, row count)."""
+    import openpyxl
+    import xlsx_reader
+    t0 = time.perf_counter()
+    if name in ("keep_vba", "openpyxl"):
+        wb = openpyxl.load_workbook(path, read_only=True, data_only=True, keep_vba=name == "keep_vba")
+    else:
+        xlsx_reader.XLSX_PARSER = name
+        wb = xlsx_reader.Workbook(path)
+    h, count, first_ms = hashlib.md5(), 0, None
+    try:
+        for row in wb["Sheet2"].iter_rows(values_only=True):
+            if first_ms is None:
+                first_ms = (time.perf_counter() - t0) * 1000
+            h.update(repr(tuple(row)).encode("utf-8"))
+            count += 1
+    finally:
+        wb.close()
+    return first_ms, h.hexdigest(), count
+
+
+def peak_rss():
+    """Peak RSS of this process in bytes. VmHWM starts over at exec; ru_maxrss can carry the parent's peak."""
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    # ru_maxrss is KiB on Linux, bytes on macOS
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * (1 if sys.platform == "darwin" else 1024)
+
+
+def run_variant(name, path):
+    if name == "baseline":
+        import openpyxl  # noqa: F401
+        import xlsx_reader  # noqa: F401
+        result = {}
+    else:
+        t0 = time.perf_counter()
+        first_ms, digest, count = read_rows(name, path)
+        result = {"first_ms": first_ms, "ms": (time.perf_counter() - t0) * 1000, "md5": digest, "rows": count}
+    result["rss"] = peak_rss()
+    print(json.dumps(result))
+
+
+def measure(name, path):
+    out = subprocess.run([sys.executable, os.path.abspath(__file__), "--child", name, path],
+                         check=True, capture_output=True, text=True).stdout
+    return json.loads(out.strip().splitlines()[-1])
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--rows", type=int, nargs="+", default=[20000, 100000])
+    ap.add_argument("--other-rows", type=int, default=50000)
+    ap.add_argument("--vba-mb", type=int, default=16)
+    ap.add_argument("--seed", type=int, default=7)
+    ap.add_argument("--child", nargs=2, help=argparse.SUPPRESS)
+    args = ap.parse_args()
+
+    if args.child:
+        return run_variant(*args.child)
+
+    import xlsx_reader
+    variants = ["keep_vba", "openpyxl", "etree"] + (["lxml"] if xlsx_reader._lxml_iterparse else [])
+    print(f"{'rows':>8}{'file MB':>9}{'variant':>10}{'first row ms':>14}{'total ms':>10}{'RSS over base MB':>18}")
+    for rows in args.rows:
+        fd, path = tempfile.mkstemp(suffix=".xlsm")
+        os.close(fd)
+        try:
+            synthetic_xlsm(path, rows, args.other_rows, args.vba_mb, random.Random(args.seed))
+            file_mb = os.path.getsize(path) / 2 ** 20
+            base = measure("baseline", path)
+            results = {name: measure(name, path) for name in variants}
+            assert len({(r["md5"], r["rows"]) for r in results.values()}) == 1, "rows differ"
+            for name, r in results.items():
+                print(f"{rows:>8}{file_mb:>9.1f}{name:>10}{r['first_ms']:>14.1f}{r['ms']:>10.0f}"
+                      f"{(r['rss'] - base['rss']) / 2 ** 20:>18.1f}")
+        finally:
+            os.remove(path)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,254 @@
+# -*- coding: utf-8 -*-
+"""
+Chunked, resumable uploads for files too large (or links too flaky) for one POST.
+
+Protocol:
+1. POST   /api/uploads                    {filename, size, sha256?}  -> upload_id
+2. PUT    /api/uploads/<id>?offset=N      raw bytes, written at offset N
+   GET    /api/uploads/<id>               -> {"offset": bytes received so far, ...}
+   After a dropped connection the client asks for the offset and resumes there.
+   Chunks are appended in order: an offset past the received bytes is rejected
+   (409 with the current offset); re-sending an earlier chunk is harmless.
+3. POST   /api/uploads/<id>/finalize      {sha256}  -> size and checksum verified
+4. The finalized file is attached to any upload route by sending the form field
+   `<field>_upload_id` instead of the file itself, e.g. `file_upload_id` for
+   /api/extract-text, `pdf_upload_id` / `excel_upload_id` for save-form1.
+   It is opened from disk like a spooled upload (see uploads.py), never read
+   into memory.
+
+State lives next to the data in CHUNK_UPLOAD_DIR (<id>.json + <id>.part / <id>.bin),
+so any gunicorn worker can serve any chunk. Uploads idle for CHUNK_UPLOAD_TTL
+seconds are removed.
+"""
+
+import os
+import re
+import json
+import time
+import uuid
+import tempfile
+import threading
+
+CHUNK_UPLOAD_DIR = os.environ.get("CHUNK_UPLOAD_DIR", os.path.join(tempfile.gettempdir(), "iampl-chunked"))
+CHUNK_UPLOAD_MAX_MB = int(os.environ.get("CHUNK_UPLOAD_MAX_MB", "2048"))
+CHUNK_UPLOAD_TTL = float(os.environ.get("CHUNK_UPLOAD_TTL", str(24 * 3600)))
+CHUNK_SIZE = int(os.environ.get("CHUNK_SIZE", str(8 * 1024 * 1024)))   # suggested to clients
+
+UPLOADING, COMPLETE = "uploading", "complete"
+
+_ID_RE = re.compile(r"^[0-9a-f]{32}$")
+_SHA256_RE = re.compile(r"^[0-9a-fA-F]{64}$")
+_COPY_BUF = 1024 * 1024
+
+
+class UploadError(Exception):
+    """Client-side problem with a chunked upload; carries the HTTP status to return."""
+
+    def __init__(self, message, status_code=400, **extra):
+        super().__init__(message)
+        self.status_code = status_code
+        self.extra = extra
+
+
+def _check_sha256(sha256):
+    """`sha256` lower-cased, or None; anything but 64 hex characters is rejected."""
+    if sha256 is None or sha256 == "":
+        return None
+    if not isinstance(sha256, str) or not _SHA256_RE.match(sha256):
+        raise UploadError("sha256 must be 64 hex characters")
+    return sha256.lower()
+
+
+class ChunkedUploadStore:
+    def __init__(self, root=CHUNK_UPLOAD_DIR, max_bytes=CHUNK_UPLOAD_MAX_MB * 1024 * 1024, ttl=CHUNK_UPLOAD_TTL):
+        self.root = root
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self._locks = {}
+        self._locks_guard = threading.Lock()
+        self._last_sweep = 0.0
+
+    # ---- paths / metadata
+    def _path(self, upload_id, ext):
+        if not isinstance(upload_id, str) or not _ID_RE.match(upload_id):
+            raise UploadError("Unknown upload", 404)
+        return os.path.join(self.root, f"{upload_id}.{ext}")
+
+    def _lock(self, upload_id):
+        with self._locks_guard:
+            return self._locks.setdefault(upload_id, threading.Lock())
+
+    def _read_meta(self, upload_id):
+        try:
+            with open(self._path(upload_id, "json"), "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            raise UploadError("Unknown upload", 404)
+
+    def _write_meta(self, meta):
+        path = self._path(meta["upload_id"], "json")
+        tmp = f"{path}.{os.getpid()}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(meta, f)
+        os.replace(tmp, path)
+
+    def _data_path(self, meta):
+        return self._path(meta["upload_id"], "bin" if meta["state"] == COMPLETE else "part")
+
+    def _status(self, meta):
+        try:
+            offset = os.path.getsize(self._data_path(meta))
+        except OSError:
+            offset = 0
+        return {**meta, "offset": offset}
+
+    # ---- protocol
+    def create(self, filename, size, sha256=None, content_type=None):
+        if not filename or not isinstance(filename, str):
+            raise UploadError("filename is required")
+        if content_type is not None and not isinstance(content_type, str):
+            raise UploadError("content_type must be a string")
+        sha256 = _check_sha256(sha256)
+        try:
+            size = int(size)
+        except (TypeError, ValueError):
+            raise UploadError("size must be an integer")
+        if size < 0 or size > self.max_bytes:
+            raise UploadError(f"size must be between 0 and {self.max_bytes} bytes", 413)
+
+        self.sweep()
+        os.makedirs(self.root, exist_ok=True)
+        meta = {
+            "upload_id": uuid.uuid4().hex,
+            "filename": os.path.basename(filename),
+            "content_type": content_type,
+            "size": size,
+            "sha256": sha256,
+            "state": UPLOADING,
+            "created_at": time.time(),
+            "chunk_size": CHUNK_SIZE,
+        }
+        open(self._path(meta["upload_id"], "part"), "wb").close()
+        self._write_meta(meta)
+        return self._status(meta)
+
+    def status(self, upload_id):
+        return self._status(self._read_meta(upload_id))
+
+    def write_chunk(self, upload_id, offset, stream, length=None):
+        """Copy `stream` into the upload at `offset`; returns the new status."""
+        with self._lock(upload_id):
+            meta = self._read_meta(upload_id)
+            if meta["state"] == COMPLETE:
+                raise UploadError("Upload already finalized", 409, offset=meta["size"])
+            path = self._data_path(meta)
+            received = os.path.getsize(path)
+            try:
+                offset = int(offset)
+            except (TypeError, ValueError):
+                raise UploadError("offset must be an integer")
+            if offset < 0 or offset > received:
+                raise UploadError("Chunk does not continue the upload", 409, offset=received)
+            if length is not None and offset + length > meta["size"]:
+                raise UploadError("Chunk runs past the declared size", 416, offset=received)
+
+            with open(path, "r+b") as f:
+                f.seek(offset)
+                written = 0
+                while True:
+                    buf = stream.read(_COPY_BUF)
+                    if not buf:
+                        break
+                    if offset + written + len(buf) > meta["size"]:
+                        raise UploadError("Chunk runs past the declared size", 416, offset=received)
+                    f.write(buf)
+                    written += len(buf)
+            os.utime(self._path(upload_id, "json"))  # idle timer for sweep()
+            return self._status(meta)
+
+    def finalize(self, upload_id, sha256=None, digest=None):
+        """
+        Verify size and SHA-256 and mark the upload complete.
+        `digest(path)` computes the checksum (uploads.digest_source).
+        """
+        with self._lock(upload_id):
+            meta = self._read_meta(upload_id)
+            if meta["state"] == COMPLETE:
+                return self._status(meta)
+            expected = _check_sha256(sha256) or meta.get("sha256")
+            if not expected:
+                raise UploadError("sha256 is required")
+            part = self._data_path(meta)
+            received = os.path.getsize(part)
+            if received != meta["size"]:
+                raise UploadError(f"Upload incomplete ({received} of {meta['size']} bytes)", 409, offset=received)
+            actual = digest(part)
+            if actual != expected:
+                raise UploadError("Checksum mismatch", 422, sha256=actual)
+
+            meta.update(state=COMPLETE, sha256=actual, completed_at=time.time())
+            os.replace(part, self._path(upload_id, "bin"))
+            self._write_meta(meta)
+            return self._status(meta)
+
+    def open_complete(self, upload_id):
+        """(path, meta) of a finalized upload."""
+        meta = self._read_meta(upload_id)
+        if meta["state"] != COMPLETE:
+            raise UploadError("Upload not finalized", 409, offset=self._status(meta)["offset"])
+        return self._data_path(meta), meta
+
+    def delete(self, upload_id):
+        self._read_meta(upload_id)
+        for ext in ("part", "bin", "json"):
+            try:
+                os.remove(self._path(upload_id, ext))
+            except OSError:
+                pass
+        with self._locks_guard:
+            self._locks.pop(upload_id, None)
+
+    def sweep(self):
+        """Remove uploads idle for longer than the TTL (at most once a minute)."""
+        now = time.time()
+        if now - self._last_sweep < 60:
+            return
+        self._last_sweep = now
+        try:
+            names = os.listdir(self.root)
+        except OSError:
+            return
+        for n in names:
+            upload_id, _, ext = n.partition(".")
+            if ext != "json":
+                continue
+            try:
+                if now - os.path.getmtime(os.path.join(self.root, n)) > self.ttl:
+                    self.delete(upload_id)
+            except (OSError, UploadError):
+                continue
+
+    def stats(self):
+        counts = {UPLOADING: 0, COMPLETE: 0}
+        total = 0
+        try:
+            names = os.listdir(self.root)
+        except OSError:
+            names = []
+        for n in names:
+            path = os.path.join(self.root, n)
+            if n.endswith(".part"):
+                counts[UPLOADING] += 1
+            elif n.endswith(".bin"):
+                counts[COMPLETE] += 1
+            else:
+                continue
+            try:
+                total += os.path.getsize(path)
+            except OSError:
+                pass
+        return {"dir": self.root, "uploading": counts[UPLOADING], "complete": counts[COMPLETE],
+                "bytes": total, "max_bytes": self.max_bytes, "chunk_size": CHUNK_SIZE, "ttl": self.ttl}
+
+
+store = ChunkedUploadStore()
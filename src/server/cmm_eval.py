@@ -0,0 +1,153 @@
+# -*- coding: utf-8 -*-
+"""
+CMM tolerance evaluation for Form 3 (/api/cmm/evaluate).
+
+- IPS characteristics (Form 3 rows: feature number, tolerance type and its
+  fields) are joined with CMM actuals by normalized feature number
+- Limits, deviations, margins and verdicts are computed for all rows at once
+  on NumPy arrays; only parsing the text fields and the join are per row
+- When a feature was measured several times (feature_range_map), its worst
+  reading decides: both min and max must lie inside the limits
+- The result is columnar: one list per column, so 5,000+ rows stay compact
+"""
+
+import numpy as np
+
+import cmm_report
+
+CMM_EVAL_EPS = 1e-9   # absolute slack on limit comparisons (float noise from text values)
+
+# Form 3 tolerance types (req-tol-<row>)
+SYMMETRICAL = "Symmetrical"
+BILATERAL = "Bilateral"
+UNILATERAL_UPPER = "Unilateral Upper"
+UNILATERAL_LOWER = "Unilateral Lower"
+BASIC = "Basic Dimension"
+RANGE = "Range Inclusive"
+TOLERANCE_TYPES = [SYMMETRICAL, BILATERAL, UNILATERAL_UPPER, UNILATERAL_LOWER, BASIC, RANGE]
+
+# status codes -> names in the result
+PASS, FAIL, MISSING, UNCHECKED, REFER_ONLY = range(5)
+STATUS_NAMES = np.array(["pass", "fail", "missing", "unchecked", "refer_only"], dtype=object)
+
+COLUMNS = ["feature_no", "type", "nominal", "lower", "upper", "actual", "min", "max",
+           "deviation", "margin", "status"]
+
+# characteristic fields, named after the Form 3 inputs they come from
+_NUMERIC_FIELDS = ["nominal", "tol", "high", "low", "upper", "lower", "basic"]
+
+
+def _float(v):
+    if isinstance(v, (int, float)):
+        return v
+    try:
+        return float(v)
+    except (TypeError, ValueError):
+        f = cmm_report.to_float(v)   # "12.5 MAX", "+0.1 mm"
+        return np.nan if f is None else f
+
+
+def _floats(values):
+    """Float array of text/number values; blanks are NaN and cost no parsing."""
+    out = np.full(len(values), np.nan)
+    idx = [i for i, v in enumerate(values) if v is not None and v != ""]
+    if idx:
+        out[idx] = np.fromiter((_float(values[i]) for i in idx), dtype=np.float64, count=len(idx))
+    return out
+
+
+def _json_column(a, digits=6):
+    # NaN is not JSON: missing values become null
+    a = np.round(a, digits)
+    return [None if x != x else x for x in a.tolist()]
+
+
+def evaluate(characteristics, features, refer_only_keys=()):
+    """
+    Evaluate characteristics ([{feature_no, type, nominal, tol, high, low, upper,
+    lower, basic}], values as entered) against a CMM feature table
+    (cmm_report.new_features()). Returns {"count", "columns", "data": {column:
+    [...]}, "summary": {status: count}}. Tolerances (tol, high, low) are
+    magnitudes, as in the Form 3 fields.
+    """
+    refer_only_keys = set(refer_only_keys)
+    n = len(characteristics)
+
+    keys = [cmm_report.normalize_feature_no(c.get("feature_no")) for c in characteristics]
+    types = np.array([c.get("type") or "" for c in characteristics], dtype=object)
+    f = {name: _floats([c.get(name) for c in characteristics]) for name in _NUMERIC_FIELDS}
+
+    # join: row of each characteristic in the feature table (-1: not measured)
+    rows = np.fromiter((-1 if r is None else r for r in map(features.find, keys)), dtype=np.intp, count=n)
+    found = rows >= 0
+    actual_col = features.column("actual")
+    actual = _floats([actual_col[r] if r >= 0 else None for r in rows.tolist()])
+    lo_read = np.full(n, np.nan)
+    hi_read = np.full(n, np.nan)
+    lo_read[found] = np.asarray(features.floats("min"))[rows[found]]
+    hi_read[found] = np.asarray(features.floats("max"))[rows[found]]
+    # readings without a numeric range count as the actual itself
+    lo_read = np.where(np.isnan(lo_read), actual, lo_read)
+    hi_read = np.where(np.isnan(hi_read), actual, hi_read)
+
+    nominal = np.full(n, np.nan)
+    lower = np.full(n, np.nan)
+    upper = np.full(n, np.nan)
+
+    m = types == SYMMETRICAL
+    tol = np.abs(f["tol"])
+    nominal[m], lower[m], upper[m] = f["nominal"][m], (f["nominal"] - tol)[m], (f["nominal"] + tol)[m]
+
+    m = types == BILATERAL
+    nominal[m] = f["nominal"][m]
+    lower[m] = (f["nominal"] - np.abs(f["low"]))[m]
+    upper[m] = (f["nominal"] + np.abs(f["high"]))[m]
+
+    m = types == UNILATERAL_UPPER
+    upper[m], lower[m] = f["upper"][m], -np.inf
+
+    m = types == UNILATERAL_LOWER
+    lower[m], upper[m] = f["lower"][m], np.inf
+
+    m = types == RANGE
+    lower[m], upper[m] = f["lower"][m], f["upper"][m]
+    nominal[m] = ((f["lower"] + f["upper"]) / 2)[m]
+
+    m = types == BASIC
+    nominal[m] = f["basic"][m]   # basic dimensions carry no tolerance of their own
+
+    # a missing limit on a two-sided type leaves the row unchecked
+    has_limits = ~np.isnan(lower) & ~np.isnan(upper)
+    measured = ~np.isnan(actual)
+    with np.errstate(invalid="ignore"):
+        margin = np.minimum(lo_read - lower, upper - hi_read)
+        margin[np.isinf(margin)] = np.nan
+        deviation = actual - nominal
+        inside = (lo_read >= lower - CMM_EVAL_EPS) & (hi_read <= upper + CMM_EVAL_EPS)
+
+    status = np.full(n, UNCHECKED, dtype=np.int8)
+    status[has_limits & measured] = FAIL
+    status[has_limits & measured & inside] = PASS
+    status[has_limits & ~measured] = MISSING
+    if refer_only_keys:
+        status[np.fromiter((k in refer_only_keys for k in keys), dtype=bool, count=n)] = REFER_ONLY
+
+    counts = np.bincount(status, minlength=len(STATUS_NAMES))
+    return {
+        "count": n,
+        "columns": COLUMNS,
+        "data": {
+            "feature_no": keys,
+            "type": types.tolist(),
+            "nominal": _json_column(nominal),
+            "lower": _json_column(np.where(np.isfinite(lower), lower, np.nan)),
+            "upper": _json_column(np.where(np.isfinite(upper), upper, np.nan)),
+            "actual": _json_column(actual),
+            "min": _json_column(lo_read),
+            "max": _json_column(hi_read),
+            "deviation": _json_column(deviation),
+            "margin": _json_column(margin),
+            "status": STATUS_NAMES[status].tolist(),
+        },
+        "summary": {name: int(c) for name, c in zip(STATUS_NAMES, counts)},
+    }
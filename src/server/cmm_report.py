@@ -0,0 +1,406 @@
+# -*- coding: utf-8 -*-
+"""
+CMM measurement report helpers for /api/parse-cmm.
+
+Header detection looks at the first CMM_HEADER_SCAN_ROWS rows of a sheet:
+- Feature / actual column synonyms are compiled once into one alternation
+  each, and the verdict per distinct cell text is memoised
+- Scoring and the per-column statistics used when no header row exists are
+  gathered in the same pass, so the rows are read once
+- The caller passes the rows it has already read and keeps iterating the same
+  reader for the data rows (no second parse of the sheet XML)
+- A found header row depends only on the text cells of the scanned rows, so
+  it is cached by a digest of those (row, column, text): repeated exports of
+  the same template skip detection whatever their measurements. Sheets
+  without a header row are inferred from their values and are not cached
+
+parse_workbook() fans the sheets of a spooled upload out to CMM_PARSE_WORKERS
+processes (spawned once, reused; see process_pools.py); each worker opens the
+same file read-only and parses one sheet. Per-sheet results are merged in sheet order, so the output is
+the same as a sequential parse. Features are kept in a columnar.Table (one
+row per feature, no dict per reading) and the response is written from its
+columns.
+"""
+
+import os
+import re
+import json
+import hashlib
+import functools
+import threading
+from itertools import chain, islice
+from collections import OrderedDict
+from concurrent.futures.process import BrokenProcessPool
+
+import columnar
+import process_pools
+import uploads
+
+CMM_HEADER_SCAN_ROWS = int(os.environ.get("CMM_HEADER_SCAN_ROWS", "50"))
+CMM_HEADER_CACHE = int(os.environ.get("CMM_HEADER_CACHE", "256"))   # template digests kept
+CMM_PARSE_WORKERS = int(os.environ.get("CMM_PARSE_WORKERS", process_pools.share("cmm_parse")))
+
+FEATURE_SYNONYMS = [
+    r"feature.?number",
+    r"\bfeature\s*n(?:o|c)\b",
+    r"\bfeature\s*nu",
+    r"\bfeature\b",
+    r"\bballoon\b",
+    r"\bbubble\b",
+    r"char(?:\.|acteristic)?\s*no",
+    r"\bchar\s*no\b",
+    r"\bdim(?:\.|ension)?\s*no\b",
+    r"\bfeat\s*no\b",
+    r"\bid\b",
+]
+ACTUAL_SYNONYMS = [
+    r"\bactual\b",
+    r"\bactua\b",
+    r"\bmeasured\b",
+    r"\bresult\b",
+    r"\bvalue\b",
+    r"\bmeasurement\b",
+    r"\bread\b",
+]
+
+_FEATURE_RE = re.compile("|".join(f"(?:{p})" for p in FEATURE_SYNONYMS))
+_ACTUAL_RE = re.compile("|".join(f"(?:{p})" for p in ACTUAL_SYNONYMS))
+_NUMBER_RE = re.compile(r"[+-]?\d+(?:\.\d+)?")
+_NOT_FEATURE_CHARS = re.compile(r"[^0-9\-]")
+_LIST_SPLIT = re.compile(r"[,;|\s/]+")
+_SPACES = re.compile(r"\s+")
+_PUNCT = re.compile(r"[.,;:()\[\]{}/_-]+")
+_REFER_ONLY = re.compile(r"\bref(?:er(?:ence)?)?\s*only\b")
+
+
+# ==============================
+# Cell helpers
+# ==============================
+def normalize_feature_no(s):
+    """Keep only digits and hyphens (e.g., '140-1'); trim spaces."""
+    if s is None:
+        return ""
+    return _NOT_FEATURE_CHARS.sub("", str(s)).strip()
+
+
+def pick_first_actual(v):
+    s = "" if v is None else str(v).strip()
+    if not s:
+        return ""
+    m = _NUMBER_RE.search(s)
+    if m:
+        return m.group(0)
+    return _LIST_SPLIT.split(s)[0].strip()
+
+
+def to_float(v):
+    if v is None:
+        return None
+    m = _NUMBER_RE.search(str(v))
+    if not m:
+        return None
+    try:
+        return float(m.group(0))
+    except Exception:
+        return None
+
+
+def is_numeric_like(v):
+    if v is None:
+        return False
+    if isinstance(v, (int, float)):
+        return True
+    try:
+        float(str(v).strip())
+        return True
+    except Exception:
+        return False
+
+
+def is_feature_like(v):
+    txt = normalize_feature_no(v)
+    return bool(txt) and (1 <= len(txt) <= 12)
+
+
+def is_refer_only(s) -> bool:
+    """Return True if the feature text is marked as 'Refer Only'."""
+    if s is None:
+        return False
+    t = str(s).replace("\u00A0", " ")
+    t = _SPACES.sub(" ", t).strip().lower()
+    t = _PUNCT.sub(" ", t)
+    return _REFER_ONLY.search(t) is not None
+
+
+# ==============================
+# Header detection
+# ==============================
+def _cell_points(cell):
+    """
+    (feature_like, numeric_like, is_feature, is_actual, feature_fallback,
+    actual_fallback) for a non-empty stripped cell text.
+    """
+    lower = cell.lower()
+    return (
+        is_feature_like(cell),
+        is_numeric_like(cell),
+        _FEATURE_RE.search(lower) is not None,
+        _ACTUAL_RE.search(lower) is not None,
+        lower.startswith("feature n") or lower.startswith("feature nu") or lower == "feature",
+        lower.startswith("actua") or lower.startswith("meas") or lower.startswith("resul") or lower == "value",
+    )
+
+
+# header texts and repeated values recur across rows, sheets and files
+_text_points = functools.lru_cache(maxsize=8192)(_cell_points)
+
+
+def _detect(rows):
+    best_row = None
+    best_score = -1
+    cand_feat_idx = None
+    cand_act_idx = None
+    col_stats = {}   # idx -> [feature_like, numeric_like], for sheets without a header row
+
+    for i, row in enumerate(rows, start=1):
+        feat_idx, act_idx = None, None
+        score = 0
+        nonempty = False
+        for idx, c in enumerate(row):
+            if c is None:
+                continue
+            cell = str(c).strip()
+            if not cell:
+                continue
+            nonempty = True
+            if isinstance(c, (int, float)):
+                # measurements: no header synonym can match a number
+                feature_like, numeric_like = is_feature_like(cell), True
+                is_feat = is_act = feat_fallback = act_fallback = False
+            else:
+                feature_like, numeric_like, is_feat, is_act, feat_fallback, act_fallback = _text_points(cell)
+
+            st = col_stats.get(idx)
+            if st is None:
+                st = col_stats[idx] = [0, 0]
+            st[0] += feature_like
+            st[1] += numeric_like
+
+            if is_feat:
+                if feat_idx is None:
+                    feat_idx = idx
+                score += 2
+            if is_act:
+                if act_idx is None:
+                    act_idx = idx
+                score += 2
+            if feat_idx is None and feat_fallback:
+                feat_idx = idx
+                score += 1
+            if act_idx is None and act_fallback:
+                act_idx = idx
+                score += 1
+
+        if nonempty and feat_idx is not None and act_idx is not None and score > best_score:
+            best_row, best_score = i, score
+            cand_feat_idx, cand_act_idx = feat_idx, act_idx
+
+    if cand_feat_idx is not None and cand_act_idx is not None:
+        return best_row, cand_feat_idx, cand_act_idx
+
+    feature_col = None
+    actual_col = None
+    best_feat = -1
+    best_num = -1
+    for idx in sorted(col_stats):
+        feature_like, numeric_like = col_stats[idx]
+        if feature_like > best_feat and feature_like >= 3:
+            best_feat = feature_like
+            feature_col = idx
+        if numeric_like > best_num and numeric_like >= 3:
+            best_num = numeric_like
+            actual_col = idx
+
+    if feature_col is not None and actual_col is not None and feature_col != actual_col:
+        return None, feature_col, actual_col
+
+    return None, None, None
+
+
+_cache = OrderedDict()
+_cache_lock = threading.Lock()
+cache_stats = {"hits": 0, "misses": 0}
+
+
+def _template_key(rows):
+    """Digest of the text cells of the scanned rows, with their positions; numbers are left out."""
+    h = hashlib.blake2b(digest_size=16)
+    for i, row in enumerate(rows):
+        for idx, c in enumerate(row):
+            if c is None or isinstance(c, (int, float)):
+                continue
+            cell = str(c).strip()
+            if cell:
+                h.update(f"{i}\x1f{idx}\x1f{cell}\x1e".encode("utf-8", "surrogatepass"))
+    return h.digest()
+
+
+def find_header(rows):
+    """
+    ((header_row, feature_col, actual_col), hit) from the first rows of a
+    sheet (a list of value tuples, at most CMM_HEADER_SCAN_ROWS long).
+    header_row is 1-based, or None when the columns were inferred from their
+    contents; the columns are None when nothing was found. hit tells whether
+    the result came from the cache.
+    """
+    key = _template_key(rows)
+    with _cache_lock:
+        hit = _cache.get(key)
+        if hit is not None:
+            _cache.move_to_end(key)
+            cache_stats["hits"] += 1
+            return hit, True
+    result = _detect(rows)
+    with _cache_lock:
+        cache_stats["misses"] += 1
+        if result[0] is not None:   # inferred columns depend on the numbers too
+            _cache[key] = result
+            while len(_cache) > CMM_HEADER_CACHE:
+                _cache.popitem(last=False)
+    return result, False
+
+
+# ==============================
+# Sheet parsing
+# ==============================
+FEATURE_SCHEMA = [("key", columnar.STR), ("actual", columnar.TEXT), ("min", columnar.FLOAT), ("max", columnar.FLOAT)]
+
+
+def new_features():
+    """Empty feature table: key -> actual (first non-empty) and min/max of the numeric readings."""
+    return columnar.Table(FEATURE_SCHEMA, key="key")
+
+
+def _add_reading(features, actuals, mins, maxs, key, val, lo, hi):
+    # actuals / mins / maxs: the table's column arrays, fetched once by the caller
+    r = features.find(key)
+    if r is None:
+        features.append(key, val, lo, hi)
+        return
+    if val and not actuals[r]:
+        actuals[r] = val
+    if lo is not None:
+        if mins[r] != mins[r] or lo < mins[r]:
+            mins[r] = lo
+        if maxs[r] != maxs[r] or hi > maxs[r]:
+            maxs[r] = hi
+
+
+def features_from_maps(feature_actual_map, feature_range_map=None):
+    """Feature table from the /api/parse-cmm JSON maps."""
+    features = new_features()
+    feature_range_map = feature_range_map or {}
+    for key, val in feature_actual_map.items():
+        rng = feature_range_map.get(key) or {}
+        features.append(str(key), None if val is None else str(val), to_float(rng.get("min")), to_float(rng.get("max")))
+    return features
+
+
+def _parse_ws(ws, sheet_name):
+    """(debug, features, refer_only_keys) of one worksheet."""
+    features = new_features()
+    actuals, mins, maxs = features.texts("actual"), features.floats("min"), features.floats("max")
+    refer_only_keys = []
+
+    # one reader per sheet: the scanned head rows are replayed for the data pass
+    rows = ws.iter_rows(values_only=True)
+    head = list(islice(rows, CMM_HEADER_SCAN_ROWS))
+    (header_row_idx, feat_col_idx, act_col_idx), cached = find_header(head)
+
+    debug = {
+        "sheet": sheet_name,
+        "header_row_idx": header_row_idx,
+        "feature_col_idx": feat_col_idx,
+        "actual_col_idx": act_col_idx,
+        "cached": cached,
+    }
+    if feat_col_idx is None or act_col_idx is None:
+        return debug, features, refer_only_keys
+
+    for r_idx, row in enumerate(chain(head, rows), start=1):
+        if header_row_idx is not None and r_idx <= header_row_idx:
+            continue
+
+        feat_raw = row[feat_col_idx] if feat_col_idx < len(row) else None
+        act_val = row[act_col_idx] if act_col_idx < len(row) else None
+        key = normalize_feature_no(feat_raw)
+
+        if key and is_refer_only(feat_raw):
+            refer_only_keys.append(key)
+        if not key:
+            continue
+
+        val = pick_first_actual(act_val)
+        fv = to_float(val)
+        _add_reading(features, actuals, mins, maxs, key, val, fv, fv)
+    return debug, features, refer_only_keys
+
+
+def parse_sheet(source, sheet_name):
+    """Worker process: open the workbook read-only and parse one sheet."""
+    with uploads.open_workbook(source) as wb:
+        return _parse_ws(wb[sheet_name], sheet_name)
+
+
+def merge_sheets(results):
+    """
+    Merge per-sheet results in sheet order: the first non-empty actual of a
+    feature wins, ranges widen, refer-only keys are unioned.
+    Returns (features, sorted refer_only_keys, detector_debug).
+    """
+    if len(results) == 1:
+        debug, features, refer = results[0]
+        return features, sorted(set(refer)), [debug]
+    features = new_features()
+    actuals, mins, maxs = features.texts("actual"), features.floats("min"), features.floats("max")
+    refer_only_keys, debug = set(), []
+    for sheet_debug, sheet, refer in results:
+        debug.append(sheet_debug)
+        refer_only_keys.update(refer)
+        for row in sheet:
+            _add_reading(features, actuals, mins, maxs, row["key"], row["actual"], row["min"], row["max"])
+    return features, sorted(refer_only_keys), debug
+
+
+def response_json(features, refer_only_keys, detector_debug):
+    """/api/parse-cmm response body, written from the feature table's columns."""
+    return "".join([
+        '{"detector_debug":', json.dumps(detector_debug, sort_keys=True),
+        ',"feature_actual_map":', features.json_map("key", "actual"),
+        ',"feature_range_map":', features.json_map("key", ("max", "min")),
+        ',"refer_only_keys":', json.dumps(refer_only_keys), "}",
+    ])
+
+
+_pool = process_pools.SpawnPool(lambda: CMM_PARSE_WORKERS)
+
+
+def parse_workbook(source):
+    """
+    (features, refer_only_keys, detector_debug) of a CMM workbook given as a
+    path or bytes; features is a columnar.Table (new_features()). Spooled files with several sheets are
+    parsed one sheet per worker; in-memory uploads are small and stay in-process.
+    """
+    with uploads.open_workbook(source) as wb:
+        names = list(wb.sheetnames)
+        if not (isinstance(source, str) and len(names) > 1 and CMM_PARSE_WORKERS > 1):
+            return merge_sheets([_parse_ws(wb[name], name) for name in names])
+
+    pool = _pool.get()
+    try:
+        # map() yields in submission order: the merge sees the sheets in workbook order
+        results = list(pool.map(parse_sheet, [source] * len(names), names))
+    except BrokenProcessPool:
+        _pool.reset(pool)  # a worker died; parse here and give the next request a fresh pool
+        results = [parse_sheet(source, name) for name in names]
+    return merge_sheets(results)
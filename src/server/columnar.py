@@ -0,0 +1,273 @@
+# -*- coding: utf-8 -*-
+"""
+Columnar tables for parsed rows (IPS characteristics, CMM features).
+
+- A table is a list of typed columns instead of a dict per row:
+  STR   repeated strings, dictionary-encoded: array('i') of codes (-1 = None)
+        into the column's own interned pool
+  TEXT  mostly unique strings (feature numbers, readings), kept in a plain list
+  FLOAT array('d'), NaN for None
+- t[i] and iteration give Row views (__slots__, two references each); a dict
+  is only built when a caller asks for row.as_dict()
+- A key column (STR, unique values) doubles as the row index: a key's code in
+  its pool is its row number, so find() costs no extra dict
+- Output is written from the columns: to_columns() (one list per column),
+  json_rows() / ndjson() (JSON object per row; column names and pooled
+  strings are encoded once), json_map() (a keyed JSON object) and
+  to_dict_encoded() (Arrow-style dictionary-encoded columns)
+"""
+
+import json
+from array import array
+from json.encoder import encode_basestring_ascii   # what json.dumps uses for str, without its call overhead
+
+STR, TEXT, FLOAT = "str", "text", "float"
+NAN = float("nan")
+
+
+class Row:
+    """View of one table row; column values by name."""
+
+    __slots__ = ("_table", "_i")
+
+    def __init__(self, table, i):
+        self._table = table
+        self._i = i
+
+    def __getitem__(self, name):
+        return self._table.get(self._i, name)
+
+    def get(self, name, default=None):
+        value = self._table.get(self._i, name)
+        return default if value is None else value
+
+    def as_dict(self):
+        return {name: self._table.get(self._i, name) for name in self._table.names}
+
+    def __repr__(self):
+        return f"Row({self._i}, {self.as_dict()!r})"
+
+
+class _Pool:
+    """Interned strings of one STR column; JSON text of each is encoded on first output."""
+
+    __slots__ = ("strings", "index", "encoded")
+
+    def __init__(self):
+        self.strings = []
+        self.index = {}
+        self.encoded = []
+
+    def code(self, s):
+        i = self.index.get(s)
+        if i is None:
+            i = self.index[s] = len(self.strings)
+            self.strings.append(s)
+        return i
+
+    def new_code(self, s):
+        if s in self.index:
+            raise ValueError(f"duplicate key {s!r}")
+        i = self.index[s] = len(self.strings)
+        self.strings.append(s)
+        return i
+
+    def json(self):
+        enc = self.encoded
+        if len(enc) < len(self.strings):
+            enc.extend(map(encode_basestring_ascii, self.strings[len(enc):]))
+        return enc
+
+
+def _new_column(kind):
+    if kind == STR:
+        return array("i")
+    if kind == FLOAT:
+        return array("d")
+    return []
+
+
+class Table:
+    __slots__ = ("names", "types", "key", "_pos", "_cols", "_pools", "_key_pos", "_plan")
+
+    def __init__(self, schema, key=None):
+        """schema: [(name, STR | TEXT | FLOAT)]; key: a STR column with unique values, for find()."""
+        self.names = [name for name, _ in schema]
+        self.types = [kind for _, kind in schema]
+        if any(kind not in (STR, TEXT, FLOAT) for kind in self.types):
+            raise ValueError(f"column types must be {STR!r}, {TEXT!r} or {FLOAT!r}")
+        self.key = key
+        self._pos = {name: i for i, name in enumerate(self.names)}
+        self._cols = [_new_column(kind) for kind in self.types]
+        self._pools = [_Pool() if kind == STR else None for kind in self.types]
+        self._key_pos = None
+        if key is not None:
+            self._key_pos = self._pos[key]
+            if self.types[self._key_pos] != STR:
+                raise ValueError("the key column must be STR")
+        self._plan = self._make_plan()
+
+    # ---- building ----
+    def _make_plan(self):
+        # per column: (append, intern or None, is_float), looked up once instead of per value;
+        # the key column only takes new strings (unique keys)
+        return [(col.append, (pool.new_code if pos == self._key_pos else pool.code) if pool else None, kind == FLOAT)
+                for pos, (col, kind, pool) in enumerate(zip(self._cols, self.types, self._pools))]
+
+    def append(self, *values):
+        """Add a row (values in schema order); returns its index."""
+        row = len(self._cols[0])
+        try:
+            for (add, code, is_float), v in zip(self._plan, values):
+                if v is None:
+                    add(-1 if code else NAN if is_float else None)
+                else:
+                    add(code(v) if code else v)
+        except ValueError:
+            for col in self._cols:   # duplicate key: drop the partial row
+                del col[row:]
+            raise
+        return row
+
+    def set(self, row, name, value):
+        pos = self._pos[name]
+        if pos == self._key_pos:
+            raise ValueError("the key column cannot be changed")
+        kind = self.types[pos]
+        if kind == STR:
+            value = -1 if value is None else self._pools[pos].code(value)
+        elif kind == FLOAT and value is None:
+            value = NAN
+        self._cols[pos][row] = value
+
+    def find(self, key):
+        """Row index of `key` in the key column, or None."""
+        return self._pools[self._key_pos].index.get(key)
+
+    def floats(self, name):
+        """The array('d') behind a FLOAT column, for hot loops and numpy.asarray()."""
+        return self._raw(name, FLOAT)
+
+    def texts(self, name):
+        """The list behind a TEXT column."""
+        return self._raw(name, TEXT)
+
+    def _raw(self, name, kind):
+        pos = self._pos[name]
+        if self.types[pos] != kind:
+            raise TypeError(f"{name} is not a {kind.upper()} column")
+        return self._cols[pos]
+
+    def clear(self):
+        """
+        Drop the rows and every STR pool with them, so a table reused per
+        streamed batch holds no more than one batch's strings.
+        """
+        for pos, col in enumerate(self._cols):
+            del col[:]
+            if self._pools[pos] is not None:
+                self._pools[pos] = _Pool()
+        self._plan = self._make_plan()
+
+    # ---- reading ----
+    def __len__(self):
+        return len(self._cols[0])
+
+    def __getitem__(self, row):
+        n = len(self)
+        if not -n <= row < n:
+            raise IndexError(row)
+        return Row(self, row + n if row < 0 else row)
+
+    def __iter__(self):
+        return (Row(self, i) for i in range(len(self)))
+
+    def get(self, row, name):
+        pos = self._pos[name]
+        v = self._cols[pos][row]
+        kind = self.types[pos]
+        if kind == STR:
+            return None if v < 0 else self._pools[pos].strings[v]
+        if kind == FLOAT:
+            return None if v != v else v
+        return v
+
+    def column(self, name):
+        """Values of one column as a list (None for missing)."""
+        pos = self._pos[name]
+        col, kind = self._cols[pos], self.types[pos]
+        if kind == STR:
+            strings = self._pools[pos].strings
+            return [None if i < 0 else strings[i] for i in col]
+        if kind == FLOAT:
+            return [None if v != v else v for v in col]
+        return list(col)
+
+    # ---- output ----
+    def _json_column(self, pos):
+        col, kind = self._cols[pos], self.types[pos]
+        if kind == STR:
+            enc = self._pools[pos].json()
+            return ["null" if i < 0 else enc[i] for i in col]
+        if kind == FLOAT:
+            # json.dumps writes floats with repr(); NaN is not JSON
+            return ["null" if v != v else repr(v) for v in col]
+        return ["null" if v is None else encode_basestring_ascii(v) for v in col]
+
+    def to_columns(self):
+        """{name: [values]}, e.g. for jsonify."""
+        return {name: self.column(name) for name in self.names}
+
+    def json_rows(self):
+        """JSON text of each row as an object, in order; row dicts are never built."""
+        template = "{" + ",".join(json.dumps(n).replace("%", "%%") + ":%s" for n in self.names) + "}"
+        cols = [self._json_column(pos) for pos in range(len(self.names))]
+        return (template % values for values in zip(*cols))
+
+    def ndjson(self):
+        """All rows as newline-delimited JSON."""
+        return "".join(line + "\n" for line in self.json_rows())
+
+    def json_map(self, key, value, sort=True):
+        """
+        JSON object text {key: value} over the rows. `value` is a column name, or
+        a tuple of names for a nested object; rows whose value columns are all
+        null are left out. Later rows win on duplicate keys, as in a dict.
+        """
+        single = isinstance(value, str)
+        names = (value,) if single else tuple(value)
+        cols = [self._json_column(self._pos[n]) for n in names]
+        if single:
+            values, null = cols[0], "null"
+        else:
+            template = "{" + ",".join(json.dumps(n).replace("%", "%%") + ":%s" for n in names) + "}"
+            values = [template % vs for vs in zip(*cols)]
+            null = template % (("null",) * len(names))
+        keys = self.column(key)
+        enc_keys = self._json_column(self._pos[key])
+        if self._key_pos == self._pos[key]:
+            rows = [i for i, v in enumerate(values) if v != null and keys[i] is not None]   # unique keys
+        else:
+            last = {k: i for i, k in enumerate(keys) if k is not None and values[i] != null}
+            rows = list(last.values())
+        if sort:
+            rows.sort(key=keys.__getitem__)   # like jsonify's sort_keys
+        return "{" + ",".join([enc_keys[i] + ":" + values[i] for i in rows]) + "}"
+
+    def to_dict_encoded(self):
+        """
+        Arrow-style layout: {"length", "schema", "columns"}. STR columns are
+        {"dictionary": [...], "indices": [...]} (-1 = null), TEXT and FLOAT
+        columns {"values": [...]} with null for missing.
+        """
+        columns = {}
+        for pos, (name, kind) in enumerate(zip(self.names, self.types)):
+            if kind == STR:
+                columns[name] = {"dictionary": list(self._pools[pos].strings), "indices": self._cols[pos].tolist()}
+            else:
+                columns[name] = {"values": self.column(name)}
+        return {
+            "length": len(self),
+            "schema": [{"name": n, "type": t} for n, t in zip(self.names, self.types)],
+            "columns": columns,
+        }
@@ -0,0 +1,228 @@
+# -*- coding: utf-8 -*-
+"""
+Thread-safe MySQL connection pool for the Flask backend.
+
+- Fixed-size pool (DB_POOL_SIZE), connections opened lazily on first checkout
+- Per-request checkout via get_cursor()/get_db(); returned on app-context teardown
+- Liveness ping before handing out a connection, reconnect if it went away
+- Saturation metrics (in use, waits, timeouts, reconnects) via stats()
+"""
+
+import os
+import time
+import queue
+import threading
+from contextlib import contextmanager
+
+from flask import g
+
+from startup_profile import lazy_import
+
+# imported on the first connect, not when the app starts
+mysql_connector = lazy_import("mysql.connector")
+
+DB_CONFIG = {
+    "host": os.environ.get("DB_HOST", "localhost"),
+    "port": int(os.environ.get("DB_PORT", "3306")),
+    "user": os.environ.get("DB_USER", "root"),
+    "password": os.environ.get("DB_PASSWORD", "areeb@123"),
+    "database": os.environ.get("DB_NAME", "innovascape"),
+}
+DB_POOL_SIZE = int(os.environ.get("DB_POOL_SIZE", "8"))
+DB_POOL_TIMEOUT = float(os.environ.get("DB_POOL_TIMEOUT", "10"))  # seconds to wait for a free connection
+DB_PING_INTERVAL = float(os.environ.get("DB_PING_INTERVAL", "30"))  # skip ping if used more recently
+
+
+class PoolTimeout(Exception):
+    """Raised when no connection becomes free within the checkout timeout."""
+
+
+class ConnectionPool:
+    def __init__(self, size=DB_POOL_SIZE, timeout=DB_POOL_TIMEOUT, ping_interval=DB_PING_INTERVAL, **config):
+        self.size = max(1, int(size))
+        self.timeout = timeout
+        self.ping_interval = ping_interval
+        self.config = config or dict(DB_CONFIG)
+
+        # slots hold either an open connection or None (not opened yet)
+        self._idle = queue.LifoQueue(maxsize=self.size)
+        for _ in range(self.size):
+            self._idle.put(None)
+        self._last_used = {}
+        self._lock = threading.Lock()
+        self._stats = {
+            "checkouts": 0,
+            "in_use": 0,
+            "peak_in_use": 0,
+            "waits": 0,
+            "wait_time_total": 0.0,
+            "timeouts": 0,
+            "connects": 0,
+            "reconnects": 0,
+            "broken": 0,
+        }
+
+    def _connect(self):
+        conn = mysql_connector.connect(**self.config)
+        with self._lock:
+            self._stats["connects"] += 1
+        return conn
+
+    def _ensure_alive(self, conn):
+        """Ping the connection if it has been idle for a while; reconnect if it dropped."""
+        if conn is None:
+            return self._connect()
+        last = self._last_used.get(id(conn), 0)
+        if time.monotonic() - last < self.ping_interval:
+            return conn
+        try:
+            conn.ping(reconnect=False)
+            return conn
+        except Exception:
+            pass
+        try:
+            conn.reconnect(attempts=2, delay=0.5)
+            with self._lock:
+                self._stats["reconnects"] += 1
+            return conn
+        except Exception:
+            self._discard(conn)
+            conn = self._connect()
+            with self._lock:
+                self._stats["reconnects"] += 1
+            return conn
+
+    def _discard(self, conn):
+        self._last_used.pop(id(conn), None)
+        try:
+            conn.close()
+        except Exception:
+            pass
+
+    def acquire(self, timeout=None):
+        timeout = self.timeout if timeout is None else timeout
+        started = time.monotonic()
+        try:
+            conn = self._idle.get_nowait()
+        except queue.Empty:
+            with self._lock:
+                self._stats["waits"] += 1
+            try:
+                conn = self._idle.get(timeout=timeout)
+            except queue.Empty:
+                with self._lock:
+                    self._stats["timeouts"] += 1
+                raise PoolTimeout(f"No MySQL connection free after {timeout}s (pool size {self.size})")
+            with self._lock:
+                self._stats["wait_time_total"] += time.monotonic() - started
+
+        try:
+            conn = self._ensure_alive(conn)
+        except Exception:
+            # give the slot back so a failed connect doesn't shrink the pool
+            self._idle.put(None)
+            raise
+
+        with self._lock:
+            self._stats["checkouts"] += 1
+            self._stats["in_use"] += 1
+            self._stats["peak_in_use"] = max(self._stats["peak_in_use"], self._stats["in_use"])
+        return conn
+
+    def release(self, conn, broken=False):
+        if conn is not None and not broken:
+            try:
+                # end any open transaction so the next borrower doesn't read a stale snapshot
+                conn.rollback()
+            except Exception:
+                broken = True
+        if broken and conn is not None:
+            self._discard(conn)
+            conn = None
+            with self._lock:
+                self._stats["broken"] += 1
+        if conn is not None:
+            self._last_used[id(conn)] = time.monotonic()
+        with self._lock:
+            self._stats["in_use"] -= 1
+        self._idle.put(conn)
+
+    @contextmanager
+    def connection(self):
+        conn = self.acquire()
+        broken = False
+        try:
+            yield conn
+        except mysql_connector.errors.OperationalError:
+            broken = True
+            raise
+        finally:
+            self.release(conn, broken=broken)
+
+    def stats(self):
+        with self._lock:
+            s = dict(self._stats)
+        s["size"] = self.size
+        s["idle"] = self.size - s["in_use"]
+        s["saturation"] = round(s["in_use"] / self.size, 3)
+        served = s["waits"] - s["timeouts"]
+        s["avg_wait_ms"] = round(1000 * s["wait_time_total"] / served, 2) if served else 0.0
+        s.pop("wait_time_total")
+        return s
+
+    def close_all(self):
+        while True:
+            try:
+                conn = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            if conn is not None:
+                self._discard(conn)
+
+
+pool = ConnectionPool()
+
+
+@contextmanager
+def db_cursor(dictionary=True):
+    """Checkout for code running outside a request (background jobs, scripts)."""
+    with pool.connection() as conn:
+        cur = conn.cursor(dictionary=dictionary)
+        try:
+            yield conn, cur
+        finally:
+            cur.close()
+
+
+# ==============================
+# Flask request integration
+# ==============================
+def get_db():
+    """Connection checked out for the current request (app context)."""
+    if "db_conn" not in g:
+        g.db_conn = pool.acquire()
+    return g.db_conn
+
+
+def get_cursor():
+    """Dictionary cursor on the current request's connection."""
+    if "db_cursor" not in g:
+        g.db_cursor = get_db().cursor(dictionary=True)
+    return g.db_cursor
+
+
+def _teardown(exc):
+    cur = g.pop("db_cursor", None)
+    conn = g.pop("db_conn", None)
+    if cur is not None:
+        try:
+            cur.close()
+        except Exception:
+            pass
+    if conn is not None:
+        broken = isinstance(exc, mysql_connector.errors.OperationalError)
+        pool.release(conn, broken=broken)
+
+
+def init_app(app):
+    app.teardown_appcontext(_teardown)
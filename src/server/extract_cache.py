@@ -0,0 +1,172 @@
+# -*- coding: utf-8 -*-
+"""
+Content-hash cache for extraction results (/api/extract-text, /api/ocr-image).
+
+- Key = SHA-256 of the uploaded bytes + the parameters that change the output
+  (route, branch taken, psm, dpi, OCR engine and language) + CACHE_VERSION
+- Memory tier: LRU bounded by entry count and approximate payload bytes
+- Disk tier (optional, EXTRACT_CACHE_DIR): one JSON file per key, survives restarts
+- Hit/miss counters via stats()
+"""
+
+import os
+import json
+import time
+import hashlib
+import threading
+from collections import OrderedDict
+
+# bump when extraction logic changes so stale results are not served
+CACHE_VERSION = 1
+
+EXTRACT_CACHE_ENTRIES = int(os.environ.get("EXTRACT_CACHE_ENTRIES", "256"))
+EXTRACT_CACHE_MEM_MB = int(os.environ.get("EXTRACT_CACHE_MEM_MB", "64"))
+EXTRACT_CACHE_DIR = os.environ.get("EXTRACT_CACHE_DIR", "")          # empty = memory only
+EXTRACT_CACHE_DISK_MB = int(os.environ.get("EXTRACT_CACHE_DISK_MB", "1024"))
+
+
+def make_key(digest, **params):
+    """Stable key from a content digest and the extraction parameters."""
+    parts = [f"v{CACHE_VERSION}", digest] + [f"{k}={params[k]}" for k in sorted(params)]
+    return hashlib.sha256("|".join(parts).encode("utf-8")).hexdigest()
+
+
+class ResultCache:
+    def __init__(self, max_entries=EXTRACT_CACHE_ENTRIES, max_mem_bytes=EXTRACT_CACHE_MEM_MB * 1024 * 1024,
+                 disk_dir=EXTRACT_CACHE_DIR, max_disk_bytes=EXTRACT_CACHE_DISK_MB * 1024 * 1024):
+        self.max_entries = max_entries
+        self.max_mem_bytes = max_mem_bytes
+        self.disk_dir = disk_dir or None
+        self.max_disk_bytes = max_disk_bytes
+        self._mem = OrderedDict()   # key -> (payload, size)
+        self._mem_bytes = 0
+        self._lock = threading.Lock()
+        self._puts_since_prune = 0
+        self._stats = {"memory_hits": 0, "disk_hits": 0, "misses": 0, "stores": 0, "evictions": 0}
+        if self.disk_dir:
+            os.makedirs(self.disk_dir, exist_ok=True)
+
+    # ---- memory tier
+    def _mem_put(self, key, payload, size):
+        # caller holds the lock
+        old = self._mem.pop(key, None)
+        if old is not None:
+            self._mem_bytes -= old[1]
+        if size > self.max_mem_bytes:
+            return
+        self._mem[key] = (payload, size)
+        self._mem_bytes += size
+        while len(self._mem) > self.max_entries or self._mem_bytes > self.max_mem_bytes:
+            _, (_, sz) = self._mem.popitem(last=False)
+            self._mem_bytes -= sz
+            self._stats["evictions"] += 1
+
+    # ---- disk tier
+    def _disk_path(self, key):
+        return os.path.join(self.disk_dir, key[:2], key + ".json")
+
+    def _disk_get(self, key):
+        path = self._disk_path(key)
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                raw = f.read()
+            os.utime(path)  # LRU order for pruning
+        except OSError:
+            return None, 0
+        try:
+            return json.loads(raw), len(raw)
+        except ValueError:
+            return None, 0
+
+    def _disk_put(self, key, encoded):
+        path = self._disk_path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            f.write(encoded)
+        os.replace(tmp, path)
+
+    def _disk_prune(self):
+        files = []
+        total = 0
+        for root, _, names in os.walk(self.disk_dir):
+            for n in names:
+                p = os.path.join(root, n)
+                try:
+                    st = os.stat(p)
+                except OSError:
+                    continue
+                files.append((st.st_mtime, st.st_size, p))
+                total += st.st_size
+        if total <= self.max_disk_bytes:
+            return
+        for _, size, p in sorted(files):
+            try:
+                os.remove(p)
+            except OSError:
+                continue
+            total -= size
+            if total <= self.max_disk_bytes:
+                break
+
+    # ---- public API
+    def get(self, key):
+        with self._lock:
+            hit = self._mem.get(key)
+            if hit is not None:
+                self._mem.move_to_end(key)
+                self._stats["memory_hits"] += 1
+                return hit[0]
+        if self.disk_dir:
+            payload, size = self._disk_get(key)
+            if payload is not None:
+                with self._lock:
+                    self._stats["disk_hits"] += 1
+                    self._mem_put(key, payload, size)
+                return payload
+        with self._lock:
+            self._stats["misses"] += 1
+        return None
+
+    def put(self, key, payload):
+        encoded = json.dumps(payload)
+        with self._lock:
+            self._mem_put(key, payload, len(encoded))
+            self._stats["stores"] += 1
+            self._puts_since_prune += 1
+            prune = self._puts_since_prune >= 50
+            if prune:
+                self._puts_since_prune = 0
+        if self.disk_dir:
+            try:
+                self._disk_put(key, encoded)
+                if prune:
+                    self._disk_prune()
+            except OSError as e:
+                print(f"⚠️ Extraction cache disk write failed: {e}")
+
+    def get_or_compute(self, key, compute):
+        """
+        Return (payload, status_code, hit). `compute()` returns (payload, status_code);
+        only successful results are stored.
+        """
+        payload = self.get(key)
+        if payload is not None:
+            return payload, 200, True
+        payload, status_code = compute()
+        if status_code == 200:
+            self.put(key, payload)
+        return payload, status_code, False
+
+    def stats(self):
+        with self._lock:
+            s = dict(self._stats)
+            s["entries"] = len(self._mem)
+            s["memory_bytes"] = self._mem_bytes
+        lookups = s["memory_hits"] + s["disk_hits"] + s["misses"]
+        s["hit_ratio"] = round((s["memory_hits"] + s["disk_hits"]) / lookups, 3) if lookups else 0.0
+        s["disk_dir"] = self.disk_dir
+        return s
+
+
+cache = ResultCache()
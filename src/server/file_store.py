@@ -0,0 +1,251 @@
+# -*- coding: utf-8 -*-
+"""
+Content-addressed file store for uploaded documents (Form1 PDF/Excel).
+
+- Each file is stored once under FILE_STORE_DIR/<sha[:2]>/<sha256>[.gz|.zst],
+  keyed by the SHA-256 of its original contents, so re-uploads are deduplicated
+- Optional compression (FILE_STORE_COMPRESSION=none|gzip|zstd); files that do
+  not shrink (PDF/XLSX usually don't) are kept uncompressed
+- Data is streamed through in blocks: hashing, compressing and writing never
+  hold the whole file in memory
+- Metadata lives in MySQL: `stored_files` (one row per blob) and
+  `form1_versions` (every save-form1 call adds a version per employee)
+"""
+
+import io
+import os
+import re
+import gzip
+import shutil
+import hashlib
+import tempfile
+import threading
+from collections import namedtuple
+
+try:
+    import zstandard
+except ImportError:  # optional
+    zstandard = None
+
+FILE_STORE_DIR = os.environ.get("FILE_STORE_DIR",
+                                os.path.join(os.path.dirname(os.path.abspath(__file__)), "file_store"))
+FILE_STORE_COMPRESSION = os.environ.get("FILE_STORE_COMPRESSION", "none").lower()
+FILE_STORE_MIN_SAVING = 0.05   # keep the compressed copy only if it is at least 5% smaller
+
+_BLOCK = 1024 * 1024
+_SHA_RE = re.compile(r"^[0-9a-f]{64}$")
+_EXT = {"none": "", "gzip": ".gz", "zstd": ".zst"}
+
+StoredFile = namedtuple("StoredFile", "sha256 size stored_size codec deduped")
+
+SCHEMA = (
+    """
+    CREATE TABLE IF NOT EXISTS stored_files (
+        sha256 CHAR(64) PRIMARY KEY,
+        size BIGINT NOT NULL,
+        stored_size BIGINT NOT NULL,
+        codec VARCHAR(10) NOT NULL,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS form1_versions (
+        id INT AUTO_INCREMENT PRIMARY KEY,
+        employee_id VARCHAR(50) NOT NULL,
+        version INT NOT NULL,
+        pdf_sha256 CHAR(64),
+        pdf_filename VARCHAR(255),
+        excel_sha256 CHAR(64),
+        excel_filename VARCHAR(255),
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        UNIQUE KEY uq_form1_version (employee_id, version),
+        FOREIGN KEY (pdf_sha256) REFERENCES stored_files (sha256),
+        FOREIGN KEY (excel_sha256) REFERENCES stored_files (sha256)
+    )
+    """,
+)
+
+
+def _resolve_codec(codec):
+    if codec not in _EXT:
+        print(f"⚠️ Unknown FILE_STORE_COMPRESSION={codec!r}, storing uncompressed")
+        return "none"
+    if codec == "zstd" and zstandard is None:
+        print("⚠️ zstandard not installed, using gzip for the file store")
+        return "gzip"
+    return codec
+
+
+def _open_source(source):
+    """A readable binary file over a path, bytes, or an already open file."""
+    if isinstance(source, str):
+        return open(source, "rb")
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        return io.BytesIO(source)
+    return source
+
+
+class FileStore:
+    def __init__(self, root=FILE_STORE_DIR, codec=FILE_STORE_COMPRESSION):
+        self.root = root
+        self.codec = _resolve_codec(codec)
+        self._lock = threading.Lock()
+        self._stats = {"puts": 0, "deduped": 0, "bytes_in": 0, "bytes_stored": 0}
+
+    def _blob_path(self, sha256, codec):
+        return os.path.join(self.root, sha256[:2], sha256 + _EXT[codec])
+
+    def locate(self, sha256):
+        """(path, codec) of a stored blob, or (None, None)."""
+        if not isinstance(sha256, str) or not _SHA_RE.match(sha256):
+            return None, None
+        for codec in _EXT:
+            path = self._blob_path(sha256, codec)
+            if os.path.isfile(path):
+                return path, codec
+        return None, None
+
+    def _write(self, source, codec):
+        """Copy `source` into a temp file in the store; returns (tmp_path, sha256, size)."""
+        os.makedirs(self.root, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=self.root, prefix=".incoming-")
+        h = hashlib.sha256()
+        size = 0
+        src = _open_source(source)
+        try:
+            src.seek(0)
+            with os.fdopen(fd, "wb") as raw:
+                if codec == "gzip":
+                    out = gzip.GzipFile(fileobj=raw, mode="wb", compresslevel=6, mtime=0)
+                elif codec == "zstd":
+                    out = zstandard.ZstdCompressor(level=6).stream_writer(raw, closefd=False)
+                else:
+                    out = raw
+                while True:
+                    buf = src.read(_BLOCK)
+                    if not buf:
+                        break
+                    h.update(buf)
+                    out.write(buf)
+                    size += len(buf)
+                if out is not raw:
+                    out.close()
+        except BaseException:
+            os.remove(tmp)
+            raise
+        finally:
+            if src is not source:
+                src.close()
+        return tmp, h.hexdigest(), size
+
+    def put(self, source):
+        """Store a path / bytes / binary file and return a StoredFile."""
+        codec = self.codec
+        tmp, sha256, size = self._write(source, codec)
+        stored_size = os.path.getsize(tmp)
+        if codec != "none" and stored_size > size * (1 - FILE_STORE_MIN_SAVING):
+            # not worth decompressing on every read
+            os.remove(tmp)
+            codec = "none"
+            tmp, sha256, size = self._write(source, codec)
+            stored_size = size
+
+        existing, existing_codec = self.locate(sha256)
+        if existing:
+            os.remove(tmp)
+            stored = StoredFile(sha256, size, os.path.getsize(existing), existing_codec, True)
+        else:
+            final = self._blob_path(sha256, codec)
+            os.makedirs(os.path.dirname(final), exist_ok=True)
+            os.replace(tmp, final)
+            stored = StoredFile(sha256, size, stored_size, codec, False)
+
+        with self._lock:
+            self._stats["puts"] += 1
+            self._stats["deduped"] += int(stored.deduped)
+            self._stats["bytes_in"] += size
+            self._stats["bytes_stored"] += 0 if stored.deduped else stored.stored_size
+        return stored
+
+    def open_blob(self, sha256):
+        """Readable binary file with the original (decompressed) contents."""
+        path, codec = self.locate(sha256)
+        if path is None:
+            raise FileNotFoundError(sha256)
+        if codec == "gzip":
+            return gzip.open(path, "rb")
+        if codec == "zstd":
+            return zstandard.ZstdDecompressor().stream_reader(open(path, "rb"), closefd=True)
+        return open(path, "rb")
+
+    def copy_to(self, sha256, dst):
+        with self.open_blob(sha256) as f:
+            shutil.copyfileobj(f, dst, _BLOCK)
+
+    def stats(self):
+        with self._lock:
+            s = dict(self._stats)
+        s["dir"] = self.root
+        s["codec"] = self.codec
+        return s
+
+
+store = FileStore()
+
+
+# ==============================
+# Metadata (MySQL, dictionary cursors)
+# ==============================
+def ensure_schema(cursor):
+    for ddl in SCHEMA:
+        cursor.execute(ddl)
+
+
+def record_file(cursor, stored):
+    cursor.execute(
+        "INSERT IGNORE INTO stored_files (sha256, size, stored_size, codec) VALUES (%s, %s, %s, %s)",
+        (stored.sha256, stored.size, stored.stored_size, stored.codec)
+    )
+
+
+def add_form1_version(cursor, employee_id, pdf=None, excel=None, pdf_filename=None, excel_filename=None):
+    """Insert the next Form1 version for `employee_id` (caller commits); returns the version number."""
+    for stored in (pdf, excel):
+        if stored is not None:
+            record_file(cursor, stored)
+    cursor.execute(
+        "SELECT COALESCE(MAX(version), 0) + 1 AS next_version FROM form1_versions WHERE employee_id=%s FOR UPDATE",
+        (employee_id,)
+    )
+    version = cursor.fetchone()["next_version"]
+    cursor.execute(
+        "INSERT INTO form1_versions (employee_id, version, pdf_sha256, pdf_filename, excel_sha256, excel_filename) "
+        "VALUES (%s, %s, %s, %s, %s, %s)",
+        (employee_id, version, pdf.sha256 if pdf else None, pdf_filename,
+         excel.sha256 if excel else None, excel_filename)
+    )
+    return version
+
+
+_FORM1_SELECT = (
+    "SELECT v.version, v.created_at, v.pdf_sha256, v.pdf_filename, p.size AS pdf_size, "
+    "v.excel_sha256, v.excel_filename, x.size AS excel_size "
+    "FROM form1_versions v "
+    "LEFT JOIN stored_files p ON p.sha256 = v.pdf_sha256 "
+    "LEFT JOIN stored_files x ON x.sha256 = v.excel_sha256 "
+    "WHERE v.employee_id=%s"
+)
+
+
+def form1_history(cursor, employee_id):
+    cursor.execute(_FORM1_SELECT + " ORDER BY v.version DESC", (employee_id,))
+    return cursor.fetchall()
+
+
+def form1_version(cursor, employee_id, version=None):
+    """One Form1 version (latest if `version` is None) with blob sizes, or None."""
+    if version is None:
+        cursor.execute(_FORM1_SELECT + " ORDER BY v.version DESC LIMIT 1", (employee_id,))
+    else:
+        cursor.execute(_FORM1_SELECT + " AND v.version=%s", (employee_id, version))
+    return cursor.fetchone()
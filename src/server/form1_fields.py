@@ -0,0 +1,210 @@
+# -*- coding: utf-8 -*-
+"""
+Form1 field extraction from OCR / PDF text (server side of Form1SetupScreen's
+parseExtractedText + mergeParsedData).
+
+- Every label is compiled once into one alternation; a document is scanned a
+  single time and the first occurrence of each label (with the value after it,
+  `label [:.] value`) is recorded. Labels that start inside a longer match
+  ("Part Number" in "15. Part Number") are credited from the same span.
+- Each field has labels in order of preference; the value's confidence is the
+  label's weight, lowered when the value occurs only once in the text (the
+  screen marks those fields as unverified)
+- merge() takes one result per file: strings go to a majority vote (ties: the
+  first file wins), booleans need more than half of the files
+"""
+
+import re
+from collections import Counter
+
+# field -> [(label pattern, weight)], first hit wins; patterns are the screen's label regexes
+FIELD_LABELS = {
+    "partNumber": [(r"Part Number", 1.0)],
+    "partName": [(r"Part Name", 1.0), (r"Part Description", 0.85)],
+    "customerPartNumber": [(r"Part Number", 0.8)],
+    "serialNumber": [(r"Serial Number", 1.0), (r"Finish Part Serial No", 0.85)],
+    "fairIdentifier": [(r"FAIR Identifier", 1.0)],
+    "partRevisionLevel": [(r"Part Revision Level", 1.0), (r"Revision Number", 0.85), (r"Rev No", 0.7)],
+    "drawingNumber": [(r"Part Number", 0.8)],
+    "drawingRevisionLevel": [(r"Drawing Revision Level", 1.0), (r"Part Revision Level", 0.85)],
+    "additionalChanges": [(r"Additional Changes", 1.0)],
+    "manufacturingProcessReference": [(r"Manufacturing Process Reference", 1.0), (r"Batch Card Number", 0.9),
+                                      (r"Batch Card No", 0.85), (r"Batch Card", 0.7)],
+    "organizationName": [(r"Organization Name", 1.0)],
+    "purchaseOrderNumber": [(r"P.O.no", 1.0), (r"Purchase order numver", 0.9), (r"Purchase order no", 0.9)],
+    "indexPartNumber": [(r"15\. Part Number", 1.0)],
+    "indexPartName": [(r"16\. Part Name", 1.0)],
+    "indexPartType": [(r"17\. Part Type", 1.0)],
+    "indexSupplier": [(r"Supplier", 0.8)],
+    "indexFairIdentifier": [(r"18\. FAIR Identifier", 1.0)],
+    "fairVerifiedBy": [(r"FAIR Verified By", 1.0)],
+    "fairVerifiedDate": [(r"Date\s+\d{2}/\d{2}/\d{4}", 0.8)],
+    "fairReviewedBy": [(r"FAIR Reviewed/Approved By", 1.0)],
+    "fairReviewedDate": [(r"23\. Date", 1.0)],
+    "customerApproval": [(r"Customer Approval", 1.0)],
+    "customerApprovalDate": [(r"25\. Date", 1.0)],
+    "_drawingIssue": [(r"Drawing Issue", 0.8)],
+    "_vendor": [(r"Vendor Code", 0.7), (r"Vendor", 0.6)],
+}
+
+STRING_FIELDS = [f for f in FIELD_LABELS if not f.startswith("_")] + ["supplierCode"]
+BOOL_FIELDS = ["fullFAI", "partialFAI", "nonconformanceYes", "nonconformanceNo"]
+SINGLE_OCCURRENCE_FACTOR = 0.75
+
+# one entry per distinct label, longest first so "Batch Card Number" beats "Batch Card"
+_LABELS = sorted({p for labels in FIELD_LABELS.values() for p, _ in labels}, key=len, reverse=True)
+_LABEL_RES = [re.compile(p, re.I) for p in _LABELS]
+_SCAN = re.compile("|".join(f"(?P<l{i}>{p})" for i, p in enumerate(_LABELS)), re.I)
+_VALUE = re.compile(r"\s*[:.]?\s*(\S[^\n\r]*)")
+
+
+def _first_word(pattern):
+    return re.match(r"[a-z0-9]*", pattern.lower()).group(0)
+
+
+# labels that can start inside another label's match: their first word occurs in it
+_OVERLAPS = [[j for j, q in enumerate(_LABELS) if j != i and _first_word(q) and _first_word(q) in p.lower()]
+             for i, p in enumerate(_LABELS)]
+
+# supplier code: "vendor | 249067", "Vendor Code: 249067", "Vendor ... 249067"
+_VENDOR_RES = [
+    (re.compile(r"vendor\s*\|\s*(\d{4,})", re.I), 1.0),
+    (re.compile(r"vendor(?:\s*code)?\s*[:.\-]?\s*(\d{4,})", re.I), 0.95),
+    (re.compile(r"vendor[\s|\-:.,]{1,20}(\d{4,})", re.I), 0.85),
+]
+_CONTACT = re.compile(r"contact", re.I)
+_DIGITS = re.compile(r"\d{4,}")
+_NON_DIGITS = re.compile(r"\D")
+_NONCONF_YES = re.compile(r"Does FAIR Contain a Documented Nonconformance.*Yes", re.I)
+_NONCONF_NO = re.compile(r"Does FAIR Contain a Documented Nonconformance.*No", re.I)
+
+
+def scan_labels(text):
+    """{label pattern: value after its first occurrence}, in one pass over `text`."""
+    found = {}
+    for m in _SCAN.finditer(text):
+        i = int(m.lastgroup[1:])
+        candidates = [(i, m.start())]
+        # shorter labels starting inside this span would be hidden by the alternation
+        for j in _OVERLAPS[i]:
+            if _LABELS[j] not in found:
+                rx = _LABEL_RES[j]
+                for p in range(m.start() + 1, m.end()):
+                    if rx.match(text, p):
+                        candidates.append((j, p))
+                        break
+        for j, p in candidates:
+            label = _LABELS[j]
+            if label in found:
+                continue
+            end = _LABEL_RES[j].match(text, p).end()
+            v = _VALUE.match(text, end)
+            if v:
+                found[label] = v.group(1).strip()
+        if len(found) == len(_LABELS):
+            break
+    return found
+
+
+def _occurs(text_lower, value):
+    return text_lower.count(value.lower()) if value else 0
+
+
+def extract(text):
+    """
+    Form1 fields of one document: {"fields": {name: value}, "confidence": {name: 0..1},
+    "label": {name: label used}}; booleans are in `fields` too.
+    """
+    text = text or ""
+    found = scan_labels(text)
+    lower = text.lower()
+    fields, confidence, used = {}, {}, {}
+
+    def pick(field, scaled=True):
+        for pattern, weight in FIELD_LABELS[field]:
+            value = found.get(pattern)
+            if value:
+                if scaled and _occurs(lower, value) < 2:
+                    weight *= SINGLE_OCCURRENCE_FACTOR
+                return value, round(weight, 3), pattern
+        return "", 0.0, None
+
+    for field in FIELD_LABELS:
+        if not field.startswith("_"):
+            fields[field], confidence[field], used[field] = pick(field)
+
+    if not fields["drawingRevisionLevel"] and fields["partRevisionLevel"]:
+        fields["drawingRevisionLevel"] = fields["partRevisionLevel"]
+        confidence["drawingRevisionLevel"] = round(confidence["partRevisionLevel"] * 0.8, 3)
+        used["drawingRevisionLevel"] = used["partRevisionLevel"]
+    if not fields["partRevisionLevel"] and not fields["drawingRevisionLevel"]:
+        issue, conf, label = pick("_drawingIssue")
+        if issue:
+            for field in ("partRevisionLevel", "drawingRevisionLevel"):
+                fields[field], confidence[field], used[field] = issue, conf, label
+
+    # supplier code: digits after "vendor", else the Vendor label unless it is a contact block
+    fields["supplierCode"], confidence["supplierCode"], used["supplierCode"] = "", 0.0, None
+    for rx, weight in _VENDOR_RES:
+        m = rx.search(text)
+        if m:
+            fields["supplierCode"], confidence["supplierCode"], used["supplierCode"] = m.group(1), weight, rx.pattern
+            break
+    else:
+        vendor, conf, label = pick("_vendor", scaled=False)
+        digits = _DIGITS.search(vendor) if vendor and not _CONTACT.search(vendor) else None
+        if digits:
+            fields["supplierCode"], confidence["supplierCode"], used["supplierCode"] = digits.group(0), conf, label
+
+    po = _NON_DIGITS.sub("", fields["purchaseOrderNumber"])
+    if po != fields["purchaseOrderNumber"]:
+        fields["purchaseOrderNumber"] = po
+        if not po:
+            confidence["purchaseOrderNumber"], used["purchaseOrderNumber"] = 0.0, None
+
+    if fields["partNumber"]:
+        fields["partNumberCount"] = len(re.findall(rf"\b{re.escape(fields['partNumber'])}\b", text, re.I))
+
+    fields["fullFAI"] = fields["partialFAI"] = False
+    fields["nonconformanceYes"] = bool(_NONCONF_YES.search(text))
+    fields["nonconformanceNo"] = bool(_NONCONF_NO.search(text))
+    return {"fields": fields, "confidence": confidence, "label": used}
+
+
+def merge(results):
+    """
+    Majority vote over extract() results of several files. Returns {"formData",
+    "confidence", "votes": {field: {value: files}}}; a field's confidence is the
+    mean confidence of the winning value scaled by the share of files that agree.
+    """
+    if not results:
+        return {"formData": {}, "confidence": {}, "votes": {}}
+    n = len(results)
+    form, confidence, votes = {}, {}, {}
+
+    for field in STRING_FIELDS:
+        values = [(r["fields"].get(field) or "").strip() for r in results]
+        counts = Counter(v for v in values if v)   # insertion order = first file wins ties
+        if not counts:
+            form[field], confidence[field] = "", 0.0
+            continue
+        winner = max(counts, key=counts.get)
+        confs = [r["confidence"].get(field, 0.0) for r, v in zip(results, values) if v == winner]
+        form[field] = winner
+        confidence[field] = round(sum(confs) / len(confs) * (0.5 + 0.5 * counts[winner] / n), 3)
+        votes[field] = dict(counts)
+
+    for field in BOOL_FIELDS:
+        form[field] = sum(1 for r in results if r["fields"].get(field)) > n / 2
+
+    counts = [r["fields"]["partNumberCount"] for r in results if r["fields"].get("partNumberCount")]
+    if counts:
+        form["partNumberCount"] = max(counts + [3])
+    return {"formData": form, "confidence": confidence, "votes": votes}
+
+
+def occurrences(texts, form, fields=("partNumber", "partName", "serialNumber", "partRevisionLevel",
+                                     "manufacturingProcessReference")):
+    """How often each merged value appears across all texts (the screen's verification count)."""
+    lowered = [t.lower() for t in texts]
+    return {f: sum(t.count(form[f].lower()) for t in lowered) if form.get(f) else 0 for f in fields}
@@ -0,0 +1,399 @@
+# -*- coding: utf-8 -*-
+"""
+Server-side rendering of the AS9102 FAIR Form 1 (PDF via reportlab, XLSX via
+openpyxl). Same layout as the jsPDF / SheetJS exports in Form1SetupScreen.js;
+input is the screen's own state: {"formData": {...}, "rows": [...]}.
+
+- Fonts are resolved and registered once per process (FORM1_FONT_PATH may
+  point to a TTF for non-Latin text; Helvetica otherwise)
+- The part-number table header is drawn once as a PDF form XObject and
+  reused on every page the index table spans; wrapped cell text is cached,
+  since index columns repeat the same suppliers / part types
+- The workbook is written in openpyxl write-only mode, so memory stays flat
+  for large part-number indexes
+- Both renderers write to a file object (a temp file when storing)
+"""
+
+import os
+import functools
+
+from reportlab import rl_config
+from reportlab.lib.pagesizes import A4
+from reportlab.lib.units import mm
+from reportlab.lib.utils import simpleSplit
+from reportlab.pdfgen import canvas as pdf_canvas
+from reportlab.pdfbase import pdfmetrics
+
+FORM1_FONT_PATH = os.environ.get("FORM1_FONT_PATH", "")
+
+# compressed page streams are written as binary; ASCII85 costs ~25% more bytes and time
+rl_config.useA85 = 0
+
+PAGE_W, PAGE_H = A4                       # points
+MARGIN_X = 10                             # all layout values below are mm, top-left origin like jsPDF
+START_Y = 30
+BOTTOM = PAGE_H / mm - 15
+BOX_W = PAGE_W / mm - 2 * MARGIN_X
+MIN_BOX_H = 10
+LINE_FACTOR = 1.15                        # jsPDF default line height
+
+TABLE_HEADERS = ["15. PART NUMBER", "16. PART NAME", "17. PART TYPE", "18. SUPPLIER",
+                 "19. FAIR IDENTIFIER", "REFERENCE DOCUMENT"]
+TABLE_COLS = [30, 30, 25, 25, 30, 50]
+TABLE_MIN_ROW_H = 7
+TABLE_LINE_H = 5
+TABLE_HEADER_H = 7
+INDEX_FIELDS = ("indexPartNumber", "indexPartName", "indexPartType", "indexSupplier", "indexFairIdentifier")
+
+
+@functools.lru_cache(maxsize=None)
+def fonts():
+    """(regular, bold) font names, registering FORM1_FONT_PATH once if set."""
+    if FORM1_FONT_PATH and os.path.isfile(FORM1_FONT_PATH):
+        from reportlab.pdfbase.ttfonts import TTFont
+
+        pdfmetrics.registerFont(TTFont("Form1", FORM1_FONT_PATH))
+        bold_path = os.environ.get("FORM1_FONT_BOLD_PATH", "")
+        if bold_path and os.path.isfile(bold_path):
+            pdfmetrics.registerFont(TTFont("Form1-Bold", bold_path))
+            return "Form1", "Form1-Bold"
+        return "Form1", "Form1"
+    return "Helvetica", "Helvetica-Bold"
+
+
+@functools.lru_cache(maxsize=8192)
+def _split(text, font, size, width):
+    # index columns repeat (suppliers, part types, ...): wrap each distinct cell once
+    return tuple(simpleSplit(text, font, size, width * mm)) or ("",)
+
+
+# ==============================
+# Input normalisation
+# ==============================
+def _s(v):
+    return "" if v is None else str(v)
+
+
+def _reference_name(row):
+    ref = row.get("referenceFile") if isinstance(row, dict) else None
+    if isinstance(ref, dict):
+        return _s(ref.get("name"))
+    return _s(ref)
+
+
+def index_rows(form, rows):
+    """Part-number index as lists of 6 strings (formData[`indexX_i`], falling back to the row itself)."""
+    out = []
+    for i, row in enumerate(rows or [{}]):
+        row = row if isinstance(row, dict) else {}
+        cells = [_s(form.get(f"{f}_{i}") or row.get(f)) for f in INDEX_FIELDS]
+        cells.append(_reference_name(row))
+        out.append(cells)
+    return out
+
+
+def part_number_text(form):
+    text = _s(form.get("partNumber"))
+    if form.get("customerPartNumber"):
+        text += "\nCustomer Part Number: " + _s(form["customerPartNumber"])
+    return text
+
+
+def reason_text(form):
+    parts = []
+    if form.get("faiReasonDropdown") and form["faiReasonDropdown"] != "Other":
+        parts.append(_s(form["faiReasonDropdown"]))
+    if form.get("faiReason") and _s(form["faiReason"]).strip():
+        parts.append(_s(form["faiReason"]))
+    if form.get("faiReasonCode"):
+        parts.append(_s(form["faiReasonCode"]))
+    return " - ".join(parts)
+
+
+def fai_types(form):
+    names = [("detailFAI", "Detail FAI"), ("assemblyFAI", "Assembly FAI"),
+             ("fullFAI", "Full FAI"), ("partialFAI", "Partial FAI")]
+    return ", ".join(label for key, label in names if form.get(key))
+
+
+# ==============================
+# PDF
+# ==============================
+class _Page:
+    """jsPDF-style drawing in mm from the top-left corner."""
+
+    def __init__(self, out):
+        # invariant: no timestamps/random ids, so an unchanged form renders to the same
+        # bytes and is deduplicated by the file store
+        self.c = pdf_canvas.Canvas(out, pagesize=A4, pageCompression=1, invariant=1)
+        self.regular, self.bold = fonts()
+        self.font = (self.regular, 10)
+        self._header_form = None
+
+    def set_font(self, bold=False, size=None):
+        self.font = (self.bold if bold else self.regular, size or self.font[1])
+        self.c.setFont(*self.font)
+
+    def split(self, text, width):
+        return _split(_s(text), self.font[0], self.font[1], width)
+
+    def text(self, lines, x, y, align="left"):
+        if isinstance(lines, str):
+            lines = (lines,)
+        leading = self.font[1] * LINE_FACTOR
+        for n, line in enumerate(lines):
+            ty = PAGE_H - y * mm - n * leading
+            if align == "center":
+                self.c.drawCentredString(x * mm, ty, line)
+            else:
+                self.c.drawString(x * mm, ty, line)
+
+    def rect(self, x, y, w, h):
+        self.c.rect(x * mm, PAGE_H - (y + h) * mm, w * mm, h * mm)
+
+    def add_page(self):
+        self.c.showPage()
+        self.c.setFont(*self.font)
+
+    def checkbox(self, x, y, checked):
+        self.rect(x, y, 3, 3)
+        if checked:
+            size = self.font[1]
+            self.set_font(size=6)
+            self.text("v", x + 1.5, y + 2.5, align="center")
+            self.set_font(size=size)
+
+    def table_header(self, y):
+        """Draw the index table header at y; the drawing is recorded once and reused."""
+        if self._header_form is None:
+            self._header_form = "form1_table_header"
+            self.c.beginForm(self._header_form)
+            font = self.font
+            self.set_font(bold=True, size=8)
+            x = MARGIN_X
+            for header, w in zip(TABLE_HEADERS, TABLE_COLS):
+                self.rect(x, START_Y, w, TABLE_HEADER_H)
+                self.text(header, x + 2, START_Y + 5)
+                x += w
+            self.c.endForm()
+            self.set_font(font[0] == self.bold, font[1])
+        self.c.saveState()
+        self.c.translate(0, -(y - START_Y) * mm)
+        self.c.doForm(self._header_form)
+        self.c.restoreState()
+
+
+def _box_height(page, value, width, min_h=MIN_BOX_H):
+    page.set_font(bold=True, size=10)
+    return max(min_h, len(page.split(value, width - 4)) * 4 + 6)
+
+
+def _draw_box(page, label, value, x, y, w, h):
+    page.set_font(size=8)
+    page.text(label, x + 2, y + 4)
+    page.set_font(bold=True, size=10)
+    page.rect(x, y, w, h)
+    page.text(page.split(value, w - 4), x + 2, y + 8)
+
+
+def _box_row(page, y, labels, values):
+    w = BOX_W / len(labels)
+    h = max(_box_height(page, v, w) for v in values)
+    if y + h > BOTTOM:
+        page.add_page()
+        y = START_Y
+    for i, (label, value) in enumerate(zip(labels, values)):
+        _draw_box(page, label, value, MARGIN_X + i * w, y, w, h)
+    return y + h
+
+
+def render_pdf(payload, out):
+    """Write the Form 1 PDF for `payload` ({"formData", "rows"}) to the file object `out`."""
+    form = payload.get("formData") or {}
+    page = _Page(out)
+    page.c.setTitle("FAIR Form 1")
+
+    page.set_font(bold=True, size=14)
+    page.text("FAIR Form 1", PAGE_W / mm / 2, 15, align="center")
+    page.set_font(size=10)
+    page.text("First Article Inspection Report - Part Number Accountability", PAGE_W / mm / 2, 20, align="center")
+
+    y = START_Y
+    y = _box_row(page, y, ["1. PART NUMBER", "2. PART NAME", "3. SERIAL NUMBER", "4. FAIR IDENTIFIER"],
+                 [part_number_text(form), _s(form.get("partName")), _s(form.get("serialNumber")),
+                  _s(form.get("fairIdentifier"))])
+    y = _box_row(page, y, ["5. PART REVISION LEVEL", "6. DRAWING NUMBER", "7. DRAWING REVISION LEVEL",
+                           "8. ADDITIONAL CHANGES"],
+                 [_s(form.get("partRevisionLevel")), _s(form.get("drawingNumber")),
+                  _s(form.get("drawingRevisionLevel")), _s(form.get("additionalChanges"))])
+    y = _box_row(page, y, ["9. MANUFACTURING PROCESS REFERENCE", "10. ORGANIZATION NAME"],
+                 [_s(form.get("manufacturingProcessReference")), _s(form.get("organizationName"))])
+    y = _box_row(page, y, ["11. SUPPLIER CODE", "12. PURCHASE ORDER NUMBER"],
+                 [_s(form.get("supplierCode")), _s(form.get("purchaseOrderNumber"))])
+
+    # 13 / 14: FAI type, reason, AOG / FAA
+    if y + 40 > BOTTOM:
+        page.add_page()
+        y = START_Y
+    half = MARGIN_X + BOX_W / 2
+    page.set_font(size=8)
+    page.text("13.", MARGIN_X, y + 4)
+    page.text("14. FAI Type:", half, y + 4)
+    for dx, key, label in ((5, "detailFAI", "Detail FAI"), (35, "assemblyFAI", "Assembly FAI")):
+        page.checkbox(MARGIN_X + dx, y + 1, form.get(key))
+        page.text(label, MARGIN_X + dx + 5, y + 4)
+    for dx, key, label in ((25, "fullFAI", "Full FAI"), (55, "partialFAI", "Partial FAI")):
+        page.checkbox(half + dx, y + 1, form.get(key))
+        page.text(label, half + dx + 5, y + 4)
+    reason_lines = page.split("Reason for Full/Partial FAI: " + reason_text(form), BOX_W / 2 - 5)
+    page.text(reason_lines, half, y + 12)
+    ry = y + 12 + len(reason_lines) * 4
+    page.text("AOG", half, ry + 4)
+    page.checkbox(half + 10, ry + 1, form.get("aog"))
+    page.text("FAA Approved", half + 25, ry + 4)
+    page.checkbox(half + 55, ry + 1, form.get("faaApproved"))
+    y = ry + 10
+
+    # 15-19: part number index, header repeated on every page
+    rows = index_rows(form, payload.get("rows"))
+    if y + TABLE_HEADER_H + TABLE_MIN_ROW_H > BOTTOM:
+        page.add_page()
+        y = START_Y
+    page.table_header(y)
+    y += TABLE_HEADER_H
+    page.set_font(size=8)
+    for cells in rows:
+        wrapped = [page.split(text, w - 4) for text, w in zip(cells, TABLE_COLS)]
+        row_h = max(TABLE_MIN_ROW_H, max(len(lines) for lines in wrapped) * TABLE_LINE_H)
+        if y + row_h > BOTTOM:
+            page.add_page()
+            y = START_Y
+            page.table_header(y)
+            y += TABLE_HEADER_H
+        x = MARGIN_X
+        for lines, w in zip(wrapped, TABLE_COLS):
+            page.rect(x, y, w, row_h)
+            page.text(lines, x + 2, y + 5)
+            x += w
+        y += row_h
+
+    y = _box_row(page, y + 5, ["CUSTOMER", "PROGRAM", "TO DIVISION"],
+                 [_s(form.get("customer")), _s(form.get("program")), _s(form.get("toDivision"))])
+
+    # 19: nonconformance
+    y += 5
+    if y + MIN_BOX_H > BOTTOM:
+        page.add_page()
+        y = START_Y
+    _draw_box(page, "19. DOES FAIR CONTAIN A DOCUMENTED NONCONFORMANCE?", "", MARGIN_X, y, BOX_W, MIN_BOX_H)
+    page.set_font(size=8)
+    cx = MARGIN_X + BOX_W - 30
+    page.checkbox(cx, y + 1, form.get("fairNonconformance") == "Yes")
+    page.text("Yes", cx + 5, y + 4)
+    page.checkbox(cx + 15, y + 1, form.get("fairNonconformance") == "No")
+    page.text("No", cx + 20, y + 4)
+    y += MIN_BOX_H
+
+    y = _box_row(page, y, ["20. FAIR VERIFIED BY", "21. DATE"],
+                 [_s(form.get("fairVerifiedBy")), _s(form.get("fairVerifiedDate"))])
+    y = _box_row(page, y, ["22. FAIR REVIEWED/APPROVED BY", "23. DATE"],
+                 [_s(form.get("fairReviewedBy")), _s(form.get("fairReviewedDate"))])
+    y = _box_row(page, y, ["24. CUSTOMER APPROVAL", "25. DATE"],
+                 [_s(form.get("customerApproval")), _s(form.get("customerApprovalDate"))])
+
+    # 26: comments
+    page.set_font(bold=True, size=10)
+    comment_lines = page.split(form.get("comments"), BOX_W - 4)
+    comments_h = max(20, len(comment_lines) * 4 + 6)
+    if y + comments_h + 10 > BOTTOM:
+        page.add_page()
+        y = START_Y
+    _draw_box(page, "26. COMMENTS", form.get("comments"), MARGIN_X, y, BOX_W, comments_h)
+
+    page.c.save()
+
+
+# ==============================
+# XLSX
+# ==============================
+@functools.lru_cache(maxsize=None)
+def _xlsx_styles():
+    from openpyxl.styles import Alignment, Font
+
+    return {"title": Font(bold=True, size=14), "label": Font(bold=True), "wrap": Alignment(wrap_text=True)}
+
+
+def render_xlsx(payload, out):
+    """Write the Form 1 workbook (same rows as the SheetJS export) to `out`."""
+    from openpyxl import Workbook
+    from openpyxl.cell import WriteOnlyCell
+
+    form = payload.get("formData") or {}
+    styles = _xlsx_styles()
+    wb = Workbook(write_only=True)
+    ws = wb.create_sheet("FAIR Form 1")
+    for col, width in zip("ABCDEFG", (28, 28, 22, 22, 30, 30, 16)):
+        ws.column_dimensions[col].width = width
+
+    def labels(*values):
+        row = []
+        for v in values:
+            cell = WriteOnlyCell(ws, value=v)
+            if v:
+                cell.font = styles["label"]
+            row.append(cell)
+        ws.append(row)
+
+    def values(*vals):
+        row = []
+        for v in vals:
+            cell = WriteOnlyCell(ws, value=v)
+            if "\n" in v:
+                cell.alignment = styles["wrap"]
+            row.append(cell)
+        ws.append(row)
+
+    title = WriteOnlyCell(ws, value="FAIR Form 1")
+    title.font = styles["title"]
+    ws.append(["", "", "", title])
+    ws.append(["", "", "", "First Article Inspection Report - Part Number Accountability"])
+    ws.append([])
+
+    labels("1. PART NUMBER", "2. PART NAME", "3. SERIAL NUMBER", "4. FAIR IDENTIFIER")
+    values(part_number_text(form), _s(form.get("partName")), _s(form.get("serialNumber")),
+           _s(form.get("fairIdentifier")))
+    ws.append([])
+    labels("5. PART REVISION LEVEL", "6. DRAWING NUMBER", "7. DRAWING REVISION LEVEL", "8. ADDITIONAL CHANGES")
+    values(_s(form.get("partRevisionLevel")), _s(form.get("drawingNumber")),
+           _s(form.get("drawingRevisionLevel")), _s(form.get("additionalChanges")))
+    ws.append([])
+    labels("9. MANUFACTURING PROCESS REFERENCE", "10. ORGANIZATION NAME")
+    values(_s(form.get("manufacturingProcessReference")), _s(form.get("organizationName")))
+    ws.append([])
+    labels("11. SUPPLIER CODE", "12. PURCHASE ORDER NUMBER")
+    values(_s(form.get("supplierCode")), _s(form.get("purchaseOrderNumber")))
+    ws.append([])
+
+    labels("13.", "14. FAI Type:", "", "", "Reason for Full/Partial FAI", "AOG", "FAA Approved")
+    values("", fai_types(form), "", "", reason_text(form),
+           "Yes" if form.get("aog") else "No", "Yes" if form.get("faaApproved") else "No")
+    ws.append([])
+
+    labels(*TABLE_HEADERS)
+    for cells in index_rows(form, payload.get("rows")):
+        ws.append(cells)
+    ws.append([])
+
+    for label_row, value_row in (
+        (("CUSTOMER", "PROGRAM", "TO DIVISION"), ("customer", "program", "toDivision")),
+        (("19. DOES FAIR CONTAIN A DOCUMENTED NONCONFORMANCE?",), ("fairNonconformance",)),
+        (("20. FAIR VERIFIED BY", "21. DATE"), ("fairVerifiedBy", "fairVerifiedDate")),
+        (("22. FAIR REVIEWED/APPROVED BY", "23. DATE"), ("fairReviewedBy", "fairReviewedDate")),
+        (("24. CUSTOMER APPROVAL", "25. DATE"), ("customerApproval", "customerApprovalDate")),
+        (("26. COMMENTS",), ("comments",)),
+    ):
+        labels(*label_row)
+        values(*[_s(form.get(k)) for k in value_row])
+        ws.append([])
+
+    wb.save(out)
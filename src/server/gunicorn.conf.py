@@ -0,0 +1,48 @@
+# -*- coding: utf-8 -*-
+"""
+gunicorn settings for wsgi:app. Pick a profile with SERVE_POOL (all|cpu|io);
+every value can be overridden through the environment. See wsgi.py for the
+concurrency model.
+"""
+
+import os
+import multiprocessing
+
+_cores = multiprocessing.cpu_count()
+_pool = os.environ.get("SERVE_POOL", "all").lower()
+
+# profile -> (workers, threads, timeout, max_requests, default port)
+_PROFILES = {
+    "all": (max(2, _cores // 2), 8, 300, 500, 5000),
+    "cpu": (_cores, 1, 300, 100, 5001),
+    "io": (2, 32, 30, 5000, 5002),
+}
+if _pool not in _PROFILES:
+    raise ValueError(f"SERVE_POOL must be one of {sorted(_PROFILES)}, got {_pool!r}")
+_workers, _threads, _timeout, _max_requests, _port = _PROFILES[_pool]
+
+bind = os.environ.get("SERVE_BIND", f"0.0.0.0:{_port}")
+workers = int(os.environ.get("SERVE_WORKERS", _workers))
+threads = int(os.environ.get("SERVE_THREADS", _threads))
+worker_class = "gthread" if threads > 1 else "sync"
+# process pools (PDF OCR, CMM sheets, batch reports) split the cores between the workers
+os.environ["SERVE_WORKERS"] = str(workers)
+
+# import api once in the master; workers fork with libraries already loaded
+preload_app = True
+# load the lazily imported extraction libraries in the master too (see wsgi.py)
+os.environ.setdefault("WARM_IMPORTS", "0" if _pool == "io" else "1")
+
+# graceful recycling: bounds RSS growth from PIL / PyMuPDF / tesseract buffers
+max_requests = int(os.environ.get("SERVE_MAX_REQUESTS", _max_requests))
+max_requests_jitter = max(1, max_requests // 10)
+timeout = int(os.environ.get("SERVE_TIMEOUT", _timeout))
+graceful_timeout = int(os.environ.get("SERVE_GRACEFUL_TIMEOUT", "30"))
+keepalive = 5
+
+# worker heartbeat files on a RAM-backed fs so a busy disk can't stall them
+worker_tmp_dir = "/dev/shm" if os.path.isdir("/dev/shm") else None
+
+accesslog = os.environ.get("SERVE_ACCESS_LOG", "-")
+errorlog = "-"
+loglevel = os.environ.get("SERVE_LOG_LEVEL", "info")
@@ -0,0 +1,67 @@
+# -*- coding: utf-8 -*-
+"""
+One-off migration: move employees.form1_pdf / form1_excel LONGBLOBs into the
+file store (file_store.py) as version 1 of each employee's Form1 history.
+
+Run from src/server (same DB_* env vars as the app):
+    python migrate_form1_blobs.py                 # migrate, then NULL the BLOB columns
+    python migrate_form1_blobs.py --drop-columns  # ...and drop the columns afterwards
+
+Safe to re-run: rows whose BLOBs are already NULL are skipped. Each employee
+is fetched and committed on its own, so only one pair of BLOBs is in memory.
+"""
+
+import sys
+
+import file_store
+from db_pool import db_cursor
+
+
+def _has_blob_columns(cur):
+    cur.execute("SHOW COLUMNS FROM employees LIKE 'form1\\_%'")
+    return {row["Field"] for row in cur.fetchall()} >= {"form1_pdf", "form1_excel"}
+
+
+def migrate(drop_columns=False):
+    with db_cursor() as (conn, cur):
+        file_store.ensure_schema(cur)
+        conn.commit()
+        if not _has_blob_columns(cur):
+            print("✅ employees has no form1_pdf/form1_excel columns, nothing to migrate")
+            return 0
+
+        cur.execute("SELECT employee_id FROM employees WHERE form1_pdf IS NOT NULL OR form1_excel IS NOT NULL")
+        employee_ids = [row["employee_id"] for row in cur.fetchall()]
+        print(f"📦 {len(employee_ids)} employee(s) with Form1 BLOBs")
+
+        migrated = 0
+        for employee_id in employee_ids:
+            cur.execute("SELECT form1_pdf, form1_excel FROM employees WHERE employee_id=%s", (employee_id,))
+            row = cur.fetchone()
+            pdf = file_store.store.put(row["form1_pdf"]) if row["form1_pdf"] else None
+            excel = file_store.store.put(row["form1_excel"]) if row["form1_excel"] else None
+            row = None
+            try:
+                version = file_store.add_form1_version(cur, employee_id, pdf, excel)
+                cur.execute("UPDATE employees SET form1_pdf=NULL, form1_excel=NULL WHERE employee_id=%s",
+                            (employee_id,))
+                conn.commit()
+            except Exception as e:
+                conn.rollback()
+                print(f"❌ {employee_id}: {e}")
+                continue
+            migrated += 1
+            print(f"✅ {employee_id}: version {version} "
+                  f"(pdf {pdf.sha256[:12] if pdf else '-'}, excel {excel.sha256[:12] if excel else '-'})")
+
+        if drop_columns and migrated == len(employee_ids):
+            cur.execute("ALTER TABLE employees DROP COLUMN form1_pdf, DROP COLUMN form1_excel")
+            conn.commit()
+            print("🧹 Dropped employees.form1_pdf / form1_excel")
+        elif drop_columns:
+            print("⚠️ Some rows failed; BLOB columns kept")
+        return len(employee_ids) - migrated
+
+
+if __name__ == "__main__":
+    sys.exit(1 if migrate(drop_columns="--drop-columns" in sys.argv[1:]) else 0)
@@ -0,0 +1,204 @@
+# -*- coding: utf-8 -*-
+"""
+OCR helpers shared by the Flask routes and the PDF page workers.
+
+Kept free of Flask / DB imports so worker processes can import it cheaply.
+
+Engines (OCR_ENGINE=auto|tesserocr|subprocess):
+- tesserocr: a pool of warm PyTessBaseAPI handles. Language data is loaded
+  once per handle; each call only sets the image and page segmentation mode.
+  Handles are checked out from a queue, so concurrent callers wait for a free
+  one instead of oversubscribing the CPU. A handle that errors is rebuilt.
+- subprocess: pytesseract, one `tesseract` process per call (the old path).
+  Used when tesserocr is not installed.
+"""
+
+import os
+import time
+import queue
+import threading
+
+import pytesseract
+from PIL import ImageEnhance
+
+import process_pools
+
+OCR_ENGINE = os.environ.get("OCR_ENGINE", "auto").lower()
+# warm handles per server process: its core budget (see process_pools.py)
+OCR_ENGINE_WORKERS = int(os.environ.get("OCR_ENGINE_WORKERS", process_pools.POOL_CORES))
+OCR_ENGINE_TIMEOUT = float(os.environ.get("OCR_ENGINE_TIMEOUT", "120"))  # seconds to wait for a handle
+OCR_LANG = os.environ.get("OCR_LANG", "eng")
+OCR_OEM = 3  # default: LSTM if available, else legacy
+
+
+class OcrEngineBusy(Exception):
+    """No warm OCR handle became free within OCR_ENGINE_TIMEOUT."""
+
+
+class _EngineStats:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.calls = 0
+        self.errors = 0
+        self.restarts = 0
+        self.waits = 0
+        self.total_ms = 0.0
+
+    def record(self, ms, waited, error=False):
+        with self._lock:
+            self.calls += 1
+            self.total_ms += ms
+            self.waits += int(waited)
+            self.errors += int(error)
+
+    def record_restart(self):
+        with self._lock:
+            self.restarts += 1
+
+    def as_dict(self):
+        with self._lock:
+            return {
+                "calls": self.calls,
+                "errors": self.errors,
+                "restarts": self.restarts,
+                "waits": self.waits,
+                "avg_ms": round(self.total_ms / self.calls, 1) if self.calls else 0.0,
+            }
+
+
+class SubprocessEngine:
+    """pytesseract: forks `tesseract` and reloads language data on every call."""
+
+    name = "subprocess"
+
+    def __init__(self):
+        self.stats = _EngineStats()
+
+    def recognize(self, gray, psm):
+        t0 = time.perf_counter()
+        try:
+            text = pytesseract.image_to_string(gray, lang=OCR_LANG, config=f'--oem {OCR_OEM} --psm {psm}')
+        except Exception:
+            self.stats.record((time.perf_counter() - t0) * 1000, False, error=True)
+            raise
+        self.stats.record((time.perf_counter() - t0) * 1000, False)
+        return text
+
+    def health(self):
+        try:
+            return {"ok": True, "version": str(pytesseract.get_tesseract_version())}
+        except Exception as e:
+            return {"ok": False, "error": str(e)}
+
+    def info(self):
+        return {"engine": self.name, "workers": None, **self.stats.as_dict()}
+
+
+class TesserocrEngine:
+    """Pool of resident tesserocr handles, created lazily up to `size`."""
+
+    name = "tesserocr"
+
+    def __init__(self, size=OCR_ENGINE_WORKERS, timeout=OCR_ENGINE_TIMEOUT):
+        import tesserocr  # noqa: F401  (fail fast if missing)
+
+        self.size = max(1, size)
+        self.timeout = timeout
+        self.stats = _EngineStats()
+        self._handles = queue.LifoQueue(maxsize=self.size)
+        for _ in range(self.size):
+            self._handles.put(None)  # slot, handle created on first use
+
+    @staticmethod
+    def _new_handle():
+        import tesserocr
+
+        return tesserocr.PyTessBaseAPI(lang=OCR_LANG, oem=tesserocr.OEM.DEFAULT)
+
+    def _checkout(self):
+        try:
+            return self._handles.get_nowait(), False
+        except queue.Empty:
+            pass
+        try:
+            return self._handles.get(timeout=self.timeout), True
+        except queue.Empty:
+            raise OcrEngineBusy(f"No OCR handle free after {self.timeout}s ({self.size} handles)")
+
+    def _discard(self, api):
+        try:
+            api.End()
+        except Exception:
+            pass
+        self.stats.record_restart()
+
+    def recognize(self, gray, psm):
+        api, waited = self._checkout()
+        t0 = time.perf_counter()
+        try:
+            if api is None:
+                api = self._new_handle()
+            api.SetPageSegMode(psm)
+            api.SetImage(gray)
+            text = api.GetUTF8Text()
+            api.Clear()
+        except Exception:
+            # a handle in an unknown state is rebuilt on next checkout
+            if api is not None:
+                self._discard(api)
+            self._handles.put(None)
+            self.stats.record((time.perf_counter() - t0) * 1000, waited, error=True)
+            raise
+        self._handles.put(api)
+        self.stats.record((time.perf_counter() - t0) * 1000, waited)
+        return text
+
+    def health(self):
+        from PIL import Image
+
+        try:
+            self.recognize(Image.new("L", (32, 32), 255), 10)
+            import tesserocr
+
+            return {"ok": True, "version": tesserocr.tesseract_version().splitlines()[0]}
+        except Exception as e:
+            return {"ok": False, "error": str(e)}
+
+    def info(self):
+        return {
+            "engine": self.name,
+            "workers": self.size,
+            "idle": self._handles.qsize(),
+            **self.stats.as_dict(),
+        }
+
+
+_engine = None
+_engine_lock = threading.Lock()
+
+
+def _create_engine():
+    if OCR_ENGINE in ("auto", "tesserocr"):
+        try:
+            return TesserocrEngine()
+        except ImportError:
+            if OCR_ENGINE == "tesserocr":
+                raise
+    return SubprocessEngine()
+
+
+def get_engine():
+    """Process-wide engine, created on first use (after fork in preloaded workers)."""
+    global _engine
+    if _engine is None:
+        with _engine_lock:
+            if _engine is None:
+                _engine = _create_engine()
+    return _engine
+
+
+def ocr_image(img, psm=4):
+    """Performs OCR on a PIL image with a given Page Segmentation Mode."""
+    gray = img.convert('L')
+    gray = ImageEnhance.Contrast(gray).enhance(2)
+    return get_engine().recognize(gray, psm).strip()
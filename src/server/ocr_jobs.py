@@ -0,0 +1,321 @@
+# -*- coding: utf-8 -*-
+"""
+In-process background job queue for long-running extraction work.
+
+- submit() returns a Job immediately; a local thread pool runs it
+- Jobs report per-page progress through the `progress` callback they receive
+- Finished jobs stay in a bounded store and are evicted after OCR_JOB_TTL seconds
+- Job.wait_for_change() lets the SSE endpoint push updates instead of polling
+- Status snapshots and results are mirrored to OCR_JOB_DIR so a poll that lands
+  on a different gunicorn worker process still finds the job
+"""
+
+import os
+import re
+import json
+import time
+import tempfile
+import uuid
+import threading
+import traceback
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+OCR_JOB_WORKERS = int(os.environ.get("OCR_JOB_WORKERS", max(1, (os.cpu_count() or 2) // 2)))
+OCR_JOB_MAX = int(os.environ.get("OCR_JOB_MAX", "200"))      # jobs kept in the store
+OCR_JOB_TTL = float(os.environ.get("OCR_JOB_TTL", "1800"))   # seconds a finished job is kept
+OCR_JOB_DIR = os.environ.get("OCR_JOB_DIR", os.path.join(tempfile.gettempdir(), "iampl-jobs"))
+
+QUEUED, RUNNING, DONE, ERROR = "queued", "running", "done", "error"
+
+
+class JobStoreFull(Exception):
+    """Raised when every slot in the store is taken by an unfinished job."""
+
+
+def _write_json(path, payload):
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(payload, f)
+    os.replace(tmp, path)
+
+
+def _read_json(path):
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+class Job:
+    def __init__(self, kind, name="", spool_dir=None):
+        self.id = uuid.uuid4().hex
+        self.kind = kind
+        self.name = name
+        self.status = QUEUED
+        self.created_at = time.time()
+        self.started_at = None
+        self.finished_at = None
+        self.pages_done = 0
+        self.pages_total = None
+        self.pages = []          # [{"page": n, "source": "text"|"ocr", "ms": t}]
+        self.result = None
+        self.status_code = None
+        self.error = None
+        self.version = 0
+        self.spool_dir = spool_dir
+        self._cond = threading.Condition()
+
+    @property
+    def finished(self):
+        return self.status in (DONE, ERROR)
+
+    def _touch(self):
+        # caller holds self._cond
+        self.version += 1
+        if self.spool_dir:
+            try:
+                _write_json(os.path.join(self.spool_dir, f"{self.id}.json"), self._snapshot())
+            except OSError as e:
+                print(f"⚠️ Could not persist job {self.id}: {e}")
+        self._cond.notify_all()
+
+    def mark_running(self):
+        with self._cond:
+            self.status = RUNNING
+            self.started_at = time.time()
+            self._touch()
+
+    def progress(self, page, total, source=None, ms=None):
+        """Callback handed to the job function; called once per finished page (any order)."""
+        with self._cond:
+            self.pages_total = total
+            self.pages_done += 1
+            self.pages.append({"page": page, "source": source, "ms": ms})
+            self._touch()
+
+    def finish(self, result, status_code=200):
+        with self._cond:
+            self.result = result
+            if self.spool_dir:
+                try:
+                    _write_json(os.path.join(self.spool_dir, f"{self.id}.result.json"),
+                                {"payload": result, "status_code": status_code})
+                except OSError as e:
+                    print(f"⚠️ Could not persist result of job {self.id}: {e}")
+            self.status_code = status_code
+            self.status = DONE if status_code < 400 else ERROR
+            if self.status == ERROR:
+                self.error = (result or {}).get("error")
+            self.finished_at = time.time()
+            self._touch()
+
+    def fail(self, message):
+        with self._cond:
+            self.status = ERROR
+            self.status_code = 500
+            self.error = message
+            self.finished_at = time.time()
+            self._touch()
+
+    def wait_for_change(self, version, timeout=15.0):
+        """Block until the job changes past `version` (or timeout); return the new version."""
+        with self._cond:
+            self._cond.wait_for(lambda: self.version != version or self.finished, timeout=timeout)
+            return self.version
+
+    def to_dict(self):
+        with self._cond:
+            return self._snapshot()
+
+    def _snapshot(self):
+        return {
+            "job_id": self.id,
+            "kind": self.kind,
+            "name": self.name,
+            "status": self.status,
+            "created_at": self.created_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+            "progress": {
+                "pages_done": self.pages_done,
+                "pages_total": self.pages_total,
+                "pages": list(self.pages),
+            },
+            "error": self.error,
+            "version": self.version,
+        }
+
+
+class JobStore:
+    """
+    Bounded id -> Job map. Finished jobs expire after `ttl`; oldest finished go
+    first when full. Jobs owned by other worker processes are read from `spool_dir`.
+    """
+
+    def __init__(self, max_jobs=OCR_JOB_MAX, ttl=OCR_JOB_TTL, spool_dir=OCR_JOB_DIR):
+        self.max_jobs = max_jobs
+        self.ttl = ttl
+        self.spool_dir = spool_dir
+        self._jobs = OrderedDict()
+        self._lock = threading.Lock()
+        self._last_sweep = 0.0
+        self.evicted = 0
+        if spool_dir:
+            os.makedirs(spool_dir, exist_ok=True)
+
+    def _drop(self, job_id):
+        self._jobs.pop(job_id, None)
+        self.evicted += 1
+        if self.spool_dir:
+            for suffix in (".json", ".result.json"):
+                try:
+                    os.remove(os.path.join(self.spool_dir, job_id + suffix))
+                except OSError:
+                    pass
+
+    def _sweep_disk(self, now):
+        # snapshots left behind by recycled workers
+        if not self.spool_dir or now - self._last_sweep < 60:
+            return
+        self._last_sweep = now
+        try:
+            names = os.listdir(self.spool_dir)
+        except OSError:
+            return
+        for fname in names:
+            path = os.path.join(self.spool_dir, fname)
+            try:
+                if now - os.path.getmtime(path) > self.ttl:
+                    os.remove(path)
+            except OSError:
+                pass
+
+    def _evict(self):
+        now = time.time()
+        self._sweep_disk(now)
+        for jid in [j.id for j in self._jobs.values() if j.finished and now - j.finished_at > self.ttl]:
+            self._drop(jid)
+        if len(self._jobs) < self.max_jobs:
+            return
+        for jid in [j.id for j in self._jobs.values() if j.finished]:
+            self._drop(jid)
+            if len(self._jobs) < self.max_jobs:
+                return
+        raise JobStoreFull(f"{len(self._jobs)} jobs still pending")
+
+    def add(self, job):
+        with self._lock:
+            self._evict()
+            job.spool_dir = self.spool_dir
+            self._jobs[job.id] = job
+        with job._cond:
+            job._touch()  # first snapshot on disk, visible to the other workers
+
+    def get(self, job_id):
+        """Local Job object, or None if unknown here / expired."""
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is not None and job.finished and time.time() - job.finished_at > self.ttl:
+                self._drop(job_id)
+                return None
+            return job
+
+    def _disk_path(self, job_id, suffix):
+        if not self.spool_dir or not re.fullmatch(r"[0-9a-f]{32}", job_id or ""):
+            return None
+        return os.path.join(self.spool_dir, job_id + suffix)
+
+    def snapshot(self, job_id):
+        job = self.get(job_id)
+        if job is not None:
+            return job.to_dict()
+        path = self._disk_path(job_id, ".json")
+        snap = _read_json(path) if path else None
+        if snap and snap.get("finished_at") and time.time() - snap["finished_at"] > self.ttl:
+            return None
+        return snap
+
+    def result(self, job_id):
+        """(payload, status_code) of a finished job, else None."""
+        job = self.get(job_id)
+        if job is not None:
+            return (job.result, job.status_code) if job.finished else None
+        path = self._disk_path(job_id, ".result.json")
+        stored = _read_json(path) if path else None
+        if stored is None:
+            return None
+        return stored["payload"], stored["status_code"]
+
+    def stats(self):
+        with self._lock:
+            counts = {QUEUED: 0, RUNNING: 0, DONE: 0, ERROR: 0}
+            for j in self._jobs.values():
+                counts[j.status] += 1
+            return {"jobs": len(self._jobs), "max_jobs": self.max_jobs, "evicted": self.evicted, **counts}
+
+
+class JobQueue:
+    def __init__(self, workers=OCR_JOB_WORKERS, store=None):
+        self.workers = workers
+        self.store = store or JobStore()
+        self._executor = None
+        self._lock = threading.Lock()
+
+    def _get_executor(self):
+        # created on first submit so preloaded gunicorn workers each get their own threads
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="ocr-job")
+            return self._executor
+
+    def submit(self, kind, fn, *args, name=""):
+        """
+        Queue fn(*args, progress=job.progress). fn returns (payload, status_code),
+        the same shape the synchronous route sends back.
+        """
+        job = Job(kind, name=name)
+        self.store.add(job)
+        self._get_executor().submit(self._run, job, fn, args)
+        return job
+
+    @staticmethod
+    def _run(job, fn, args):
+        job.mark_running()
+        try:
+            payload, status_code = fn(*args, progress=job.progress)
+            job.finish(payload, status_code)
+        except Exception as e:
+            print(f"ERROR in job {job.id} ({job.kind}): {e}")
+            traceback.print_exc()
+            job.fail("Failed to process the file. Check server logs for details.")
+
+    def status(self, job_id):
+        return self.store.snapshot(job_id)
+
+    def result(self, job_id):
+        return self.store.result(job_id)
+
+    def wait(self, job_id, version, timeout=15.0):
+        """Snapshot once the job has moved past `version`, the job finished, or timeout."""
+        job = self.store.get(job_id)
+        if job is not None:
+            job.wait_for_change(version, timeout=timeout)
+            return job.to_dict()
+        # owned by another process: poll its snapshot file
+        deadline = time.monotonic() + timeout
+        snap = self.store.snapshot(job_id)
+        while snap and snap["version"] == version and snap["status"] not in (DONE, ERROR) \
+                and time.monotonic() < deadline:
+            time.sleep(0.5)
+            snap = self.store.snapshot(job_id)
+        return snap
+
+    def stats(self):
+        s = self.store.stats()
+        s["workers"] = self.workers
+        return s
+
+
+jobs = JobQueue()
@@ -0,0 +1,129 @@
+# -*- coding: utf-8 -*-
+"""
+Page-parallel text extraction for PDFs.
+
+Pages with a usable text layer are read inline. Pages below the text
+threshold are rasterized and OCR'd in a process pool (PDF_OCR_WORKERS) and
+the text is put back in page order. Each worker opens the PDF from a file
+path, so the document bytes cross the process boundary only once, as a file.
+"""
+
+import os
+import time
+import tempfile
+from collections import deque
+from concurrent.futures.process import BrokenProcessPool
+
+import fitz  # PyMuPDF
+from PIL import Image
+
+import process_pools
+from ocr_engine import ocr_image
+
+# 0 disables the pool (pages are OCR'd inline, one after another)
+PDF_OCR_WORKERS = int(os.environ.get("PDF_OCR_WORKERS", process_pools.share("pdf_ocr")))
+
+_pool = process_pools.SpawnPool(lambda: PDF_OCR_WORKERS)
+
+
+def rasterize_and_ocr(page, dpi, psm):
+    pix = page.get_pixmap(dpi=dpi)
+    img = Image.frombytes("RGB", [pix.width, pix.height], pix.samples)
+    return ocr_image(img, psm=psm)
+
+
+def _ocr_page_worker(pdf_path, index, dpi, psm):
+    """Runs in a pool process: open the PDF, OCR one page."""
+    t0 = time.perf_counter()
+    try:
+        with fitz.open(pdf_path) as doc:
+            text = rasterize_and_ocr(doc[index], dpi, psm)
+    except Exception as e:
+        # some pytesseract errors can't be unpickled in the parent and would break the pool
+        raise RuntimeError(f"OCR failed on page {index + 1}: {e}") from None
+    return index, text, round((time.perf_counter() - t0) * 1000, 1)
+
+
+def _ms(t0):
+    return round((time.perf_counter() - t0) * 1000, 1)
+
+
+def iter_page_texts(pdf_doc, pdf_content, ocr_below, dpi, psm, workers=None, window=None):
+    """
+    Yield (page_no, raw_text, ocr_text_or_None, source, ms) in page order.
+
+    Pages whose stripped text layer is shorter than `ocr_below` chars are OCR'd.
+    `pdf_content` is the document bytes (or a path to it) for the worker processes.
+    `workers=0` forces inline OCR; otherwise the shared pool (PDF_OCR_WORKERS) is used.
+    At most `window` pages (default 2 x pool size) are in flight or waiting to be
+    yielded, so memory stays bounded however long the document is.
+    """
+    workers = PDF_OCR_WORKERS if workers is None else workers
+    window = window or max(2, 2 * max(1, workers))
+    use_pool = workers > 0
+    tmp_path = None
+    pending = deque()   # (index, raw, future_or_None, pool, t0)
+
+    def resolve(entry):
+        i, raw, fut, pool, t0 = entry
+        if fut is None:
+            if len(raw) >= ocr_below:
+                return i + 1, raw, None, "text", _ms(t0)
+            return i + 1, raw, rasterize_and_ocr(pdf_doc[i], dpi, psm), "ocr", _ms(t0)
+        try:
+            _, text, ms = fut.result()
+        except BrokenProcessPool as e:
+            print(f"⚠️ PDF OCR pool broke ({e}); OCR'ing page {i + 1} inline")
+            _pool.reset(pool)
+            t1 = time.perf_counter()
+            text, ms = rasterize_and_ocr(pdf_doc[i], dpi, psm), _ms(t1)
+        return i + 1, raw, text, "ocr", ms
+
+    try:
+        for i, page in enumerate(pdf_doc):
+            t0 = time.perf_counter()
+            raw = page.get_text("text").strip()
+            fut = pool = None
+            if len(raw) < ocr_below and use_pool:
+                if tmp_path is None and isinstance(pdf_content, (bytes, bytearray)):
+                    fd, tmp_path = tempfile.mkstemp(suffix=".pdf")
+                    with os.fdopen(fd, "wb") as f:
+                        f.write(pdf_content)
+                pool = _pool.get()
+                try:
+                    fut = pool.submit(_ocr_page_worker, tmp_path or pdf_content, i, dpi, psm)
+                except BrokenProcessPool:
+                    _pool.reset(pool)
+                    pool = _pool.get()
+                    fut = pool.submit(_ocr_page_worker, tmp_path or pdf_content, i, dpi, psm)
+            pending.append((i, raw, fut, pool, t0))
+
+            # emit whatever is ready at the head; block only when the window is full
+            while pending and (len(pending) >= window or pending[0][2] is None or pending[0][2].done()):
+                yield resolve(pending.popleft())
+        while pending:
+            yield resolve(pending.popleft())
+    finally:
+        for _, _, fut, _, _ in pending:
+            if fut is not None:
+                fut.cancel()
+        if tmp_path:
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass
+
+
+def page_texts(pdf_doc, pdf_content, ocr_below, dpi, psm, progress=None, workers=None):
+    """
+    Return [(raw_text, ocr_text_or_None)] for every page of `pdf_doc`
+    (see iter_page_texts). progress(page, total, source, ms) is called per page.
+    """
+    total = pdf_doc.page_count
+    results = []
+    for page_no, raw, ocr, source, ms in iter_page_texts(pdf_doc, pdf_content, ocr_below, dpi, psm,
+                                                         workers=workers, window=total or None):
+        results.append((raw, ocr))
+        if progress:
+            progress(page_no, total, source, ms)
+    return results
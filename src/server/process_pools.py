@@ -0,0 +1,52 @@
+# -*- coding: utf-8 -*-
+"""
+Process pools for the CPU-heavy work that runs outside the WSGI threads: PDF
+OCR (pdf_pages), CMM sheets (cmm_report) and batch reports (batch_reports).
+
+- Each server process creates a pool on first use, with the spawn start
+  method: forking a threaded WSGI worker can deadlock the child
+- A broken pool (a worker died) is shut down and dropped; the next caller gets
+  a fresh one. A replacement another request already made is kept
+- Core budget: POOL_CORES per server process, cpu_count // SERVE_WORKERS by
+  default (gunicorn.conf.py exports SERVE_WORKERS). POOL_SHARES splits it
+  between the pools, so with all of them busy a host runs about one pool
+  process per core. Each module's *_WORKERS variable still overrides its share
+"""
+
+import os
+import threading
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+
+POOL_CORES = int(os.environ.get("POOL_CORES",
+                                max(1, (os.cpu_count() or 1) // int(os.environ.get("SERVE_WORKERS", "1")))))
+# fraction of POOL_CORES per pool; OCR is the busiest
+POOL_SHARES = {"pdf_ocr": 0.5, "cmm_parse": 0.25, "batch_reports": 0.25}
+
+
+def share(name):
+    """Default worker count of pool `name`: its share of POOL_CORES, at least 1."""
+    return max(1, int(POOL_CORES * POOL_SHARES[name]))
+
+
+class SpawnPool:
+    """A ProcessPoolExecutor created on first use; `size()` gives its max_workers then."""
+
+    def __init__(self, size):
+        self._size = size
+        self._pool = None
+        self._lock = threading.Lock()
+
+    def get(self):
+        with self._lock:
+            if self._pool is None:
+                self._pool = ProcessPoolExecutor(max_workers=self._size(),
+                                                 mp_context=multiprocessing.get_context("spawn"))
+            return self._pool
+
+    def reset(self, pool):
+        """Drop a broken pool; a replacement another request already made is kept."""
+        with self._lock:
+            if self._pool is pool:
+                self._pool = None
+        pool.shutdown(wait=False, cancel_futures=True)
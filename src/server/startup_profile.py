@@ -0,0 +1,119 @@
+# -*- coding: utf-8 -*-
+"""
+Cold-start bookkeeping and lazy imports for the backend.
+
+- lazy_import("fitz") returns a stand-in that imports the real module on first
+  attribute access, so PyMuPDF / PIL / openpyxl / docx / pytesseract /
+  mysql.connector are only loaded by the first route that needs them
+- stage("name") times a block of startup work (imports, create_app steps)
+- report() returns the breakdown plus which heavy modules are loaded and the
+  process RSS; exposed at /api/startup
+- warm() imports every lazy module up front (gunicorn master with
+  preload_app, so forked workers share the pages)
+
+Full per-module breakdown: benchmarks/bench_cold_start.py (python -X importtime).
+"""
+
+import os
+import sys
+import time
+import importlib
+import threading
+from contextlib import contextmanager
+
+_T0 = time.perf_counter()
+_stages = []          # [(name, ms)]
+_lazy = {}            # name -> _LazyModule
+_lock = threading.RLock()  # a lazy import may trigger another
+
+HEAVY_MODULES = ("fitz", "PIL.Image", "pytesseract", "openpyxl", "docx", "mysql.connector", "tesserocr", "reportlab", "numpy", "lxml")
+
+
+@contextmanager
+def stage(name):
+    t0 = time.perf_counter()
+    try:
+        yield
+    finally:
+        _stages.append((name, round((time.perf_counter() - t0) * 1000, 1)))
+
+
+class _LazyModule:
+    """Module stand-in; the real module is imported on first attribute access."""
+
+    def __init__(self, name):
+        self.__dict__["_name"] = name
+        self.__dict__["_module"] = None
+        self.__dict__["_import_ms"] = None
+        self.__dict__["_loaded_at_ms"] = None
+
+    def _load(self):
+        module = self.__dict__["_module"]
+        if module is None:
+            with _lock:
+                module = self.__dict__["_module"]
+                if module is None:
+                    t0 = time.perf_counter()
+                    module = importlib.import_module(self.__dict__["_name"])
+                    self.__dict__["_import_ms"] = round((time.perf_counter() - t0) * 1000, 1)
+                    self.__dict__["_loaded_at_ms"] = round((t0 - _T0) * 1000, 1)
+                    self.__dict__["_module"] = module
+        return module
+
+    def __getattr__(self, attr):
+        return getattr(self._load(), attr)
+
+    def __setattr__(self, attr, value):
+        setattr(self._load(), attr, value)
+
+    def __repr__(self):
+        state = "loaded" if self.__dict__["_module"] is not None else "not loaded"
+        return f"<lazy module {self.__dict__['_name']!r} ({state})>"
+
+
+def lazy_import(name):
+    with _lock:
+        mod = _lazy.get(name)
+        if mod is None:
+            mod = _lazy[name] = _LazyModule(name)
+    return mod
+
+
+def warm():
+    """Import every lazy module now (returns total ms)."""
+    t0 = time.perf_counter()
+    for mod in list(_lazy.values()):
+        mod._load()
+    return round((time.perf_counter() - t0) * 1000, 1)
+
+
+def rss_mb():
+    """Current resident set size in MB (None where unavailable, e.g. Windows)."""
+    try:
+        with open("/proc/self/statm") as f:
+            return round(int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 2 ** 20, 1)
+    except (OSError, ValueError, AttributeError):
+        pass
+    try:
+        import resource
+
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return round(peak / (2 ** 20 if sys.platform == "darwin" else 2 ** 10), 1)  # peak, not current
+    except ImportError:
+        return None
+
+
+def report():
+    return {
+        "pid": os.getpid(),
+        "uptime_s": round(time.perf_counter() - _T0, 1),
+        "rss_mb": rss_mb(),
+        "stages_ms": dict(_stages),
+        "lazy_imports": {
+            name: {"loaded": mod.__dict__["_module"] is not None,
+                   "import_ms": mod.__dict__["_import_ms"],
+                   "first_use_ms": mod.__dict__["_loaded_at_ms"]}
+            for name, mod in sorted(_lazy.items())
+        },
+        "heavy_modules_loaded": [m for m in HEAVY_MODULES if m in sys.modules],
+    }
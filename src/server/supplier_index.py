@@ -0,0 +1,115 @@
+# -*- coding: utf-8 -*-
+"""
+Prebuilt search index for supplier autocomplete (/api/suppliers).
+
+Built once per dataset; each lookup is a binary search plus a short walk,
+instead of lowercasing and scanning every name on every keystroke.
+
+Ranking for a query q (each name appears once, at its best rank):
+1. exact       - the whole name equals q (case-insensitive)
+2. prefix      - the name starts with q           (sorted lowercase array + bisect)
+3. word        - a later word starts with q, e.g. "eng" -> "Globex Engineering"
+4. fuzzy       - trigram similarity >= SUPPLIER_FUZZY_MIN, best first; catches
+                 typos and transpositions ("globx", "engeneering")
+"""
+
+import os
+import re
+import heapq
+from bisect import bisect_left
+from itertools import chain
+from collections import Counter, defaultdict
+
+SUPPLIER_FUZZY_MIN = float(os.environ.get("SUPPLIER_FUZZY_MIN", "0.3"))   # Dice coefficient on trigrams
+
+_WORD_START = re.compile(r"(?<=[\s\-/&.,(])\w")
+
+
+def _trigrams(s):
+    padded = f"  {s} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class SupplierIndex:
+    def __init__(self, names):
+        self.names = list(names)
+        lowered = [n.lower() for n in self.names]
+
+        # whole-name prefixes
+        pairs = sorted((k, i) for i, k in enumerate(lowered))
+        self._keys = [k for k, _ in pairs]
+        self._ids = [i for _, i in pairs]
+
+        # prefixes of every later word ("precision" in "initech precision")
+        words = sorted((k[m.start():], i) for i, k in enumerate(lowered) for m in _WORD_START.finditer(k))
+        self._word_keys = [k for k, _ in words]
+        self._word_ids = [i for _, i in words]
+
+        # trigram postings for fuzzy matches
+        self._gram_counts = []
+        postings = defaultdict(list)
+        for i, k in enumerate(lowered):
+            grams = _trigrams(k)
+            self._gram_counts.append(len(grams))
+            for g in grams:
+                postings[g].append(i)
+        self._postings = dict(postings)
+        self._lowered = lowered
+
+    def __len__(self):
+        return len(self.names)
+
+    @staticmethod
+    def _walk(keys, ids, p):
+        i = bisect_left(keys, p)
+        while i < len(keys) and keys[i].startswith(p):
+            yield ids[i]
+            i += 1
+
+    def _fuzzy(self, p, exclude, limit):
+        grams = _trigrams(p)
+        shared = Counter(chain.from_iterable(self._postings.get(g, ()) for g in grams))
+        # Dice >= min needs at least this many shared trigrams, whatever the name length
+        need = SUPPLIER_FUZZY_MIN * len(grams) / 2
+        nq = len(grams)
+        counts = self._gram_counts
+        scored = [(2.0 * n / (nq + counts[i]), i) for i, n in shared.items() if n >= need and i not in exclude]
+        scored = [(score, i) for score, i in scored if score >= SUPPLIER_FUZZY_MIN]
+        lowered = self._lowered
+        key = lambda e: (-e[0], lowered[e[1]])  # noqa: E731
+        best = sorted(scored, key=key) if limit is None else heapq.nsmallest(limit, scored, key=key)
+        return [(i, score) for score, i in best]
+
+    def search(self, query, limit=10, fuzzy=True):
+        """
+        Ranked matches as [(name, kind, score)]; `query` is already normalized.
+        limit < 0 or None means no limit. An empty query lists names alphabetically.
+        """
+        p = query.lower()
+        unlimited = limit is None or limit < 0
+        if limit == 0:
+            return []
+        if not p:
+            ids = self._ids if unlimited else self._ids[:limit]
+            return [(self.names[i], "prefix", 1.0) for i in ids]
+
+        out, seen = [], set()
+
+        def full():
+            return not unlimited and len(out) >= limit
+
+        for kind, keys, ids in (("prefix", self._keys, self._ids), ("word", self._word_keys, self._word_ids)):
+            for i in self._walk(keys, ids, p):
+                if i in seen:
+                    continue
+                seen.add(i)
+                # an exact match sorts first in the prefix walk
+                exact = kind == "prefix" and self._lowered[i] == p
+                out.append((self.names[i], "exact" if exact else kind, 1.0))
+                if full():
+                    return out
+
+        if fuzzy and len(p) >= 3:
+            for i, score in self._fuzzy(p, seen, None if unlimited else limit - len(out)):
+                out.append((self.names[i], "fuzzy", round(score, 3)))
+        return out
@@ -0,0 +1,234 @@
+# -*- coding: utf-8 -*-
+"""
+Hot-reloadable supplier dataset for /api/suppliers.
+
+- Names come from data/suppliers.json, else suppliers.xlsx/.xlsm/.xls, else
+  suppliers.csv (first one that yields names), else a small built-in list
+- A daemon thread polls the files' mtime/size every SUPPLIER_POLL_INTERVAL
+  seconds; on a change it loads the names and builds a new SupplierIndex in the
+  background, then swaps it in with a single reference assignment. Requests
+  keep using the old index until the new one is complete.
+- A reload that fails, or yields nothing while a supplier file exists (e.g. a
+  half-written file), keeps the current dataset and is retried on the next poll
+- The watcher starts on first use, so every gunicorn worker (forked after
+  preload) runs its own; load() fills the dataset without it, for the master
+"""
+
+import os
+import csv
+import json
+import time
+import hashlib
+import threading
+from typing import List
+from collections import namedtuple
+
+from supplier_index import SupplierIndex
+
+DATA_DIR = os.environ.get("SUPPLIER_DATA_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), "data"))
+SUPPLIER_POLL_INTERVAL = float(os.environ.get("SUPPLIER_POLL_INTERVAL", "5"))   # 0 disables the watcher
+
+SUPPLIER_FILES = ("suppliers.json", "suppliers.xlsx", "suppliers.xlsm", "suppliers.xls", "suppliers.csv")
+BUILTIN = "builtin"
+
+Dataset = namedtuple("Dataset", "index version source loaded_at load_ms signature")
+
+
+def normalize_name(s: str) -> str:
+    return " ".join(str(s).split()).strip() if s is not None else ""
+
+
+_norm = normalize_name
+
+
+def load_supplier_names(data_dir=DATA_DIR):
+    """Return (sorted unique names, source file name or "builtin")."""
+    names: List[str] = []
+    source = BUILTIN
+
+    # 1) JSON
+    json_path = os.path.join(data_dir, "suppliers.json")
+    if os.path.isfile(json_path):
+        try:
+            with open(json_path, "r", encoding="utf-8") as f:
+                payload = json.load(f)
+            if isinstance(payload, dict):
+                if "suppliers" in payload and isinstance(payload["suppliers"], list):
+                    names.extend([_norm(x) for x in payload["suppliers"]])
+                elif "names" in payload and isinstance(payload["names"], list):
+                    names.extend([_norm(x) for x in payload["names"]])
+            elif isinstance(payload, list):
+                names.extend([_norm(x) for x in payload])
+            source = "suppliers.json"
+        except Exception:
+            pass
+
+    # 2) Excel
+    if not names:
+        try:
+            for fname in ("suppliers.xlsx", "suppliers.xlsm", "suppliers.xls"):
+                x_path = os.path.join(data_dir, fname)
+                if os.path.isfile(x_path):
+                    import xlsx_reader  # only when the dataset is a workbook
+
+                    wb = xlsx_reader.load(x_path)
+                    ws = wb.active
+                    rows = list(ws.iter_rows(values_only=True))
+                    wb.close()
+                    if not rows:
+                        continue
+                    header = [(_norm(h).lower() if h is not None else "") for h in rows[0]]
+                    choices = ("supplier name", "supplier", "vendor", "vendor name", "name")
+                    col_idx = 0
+                    for i, h in enumerate(header):
+                        if any(h.startswith(c) for c in choices):
+                            col_idx = i
+                            break
+                    for r in rows[1:]:
+                        if r and col_idx < len(r) and r[col_idx]:
+                            names.append(_norm(r[col_idx]))
+                    if names:
+                        source = fname
+                        break
+        except Exception:
+            pass
+
+    # 3) CSV
+    if not names:
+        c_path = os.path.join(data_dir, "suppliers.csv")
+        if os.path.isfile(c_path):
+            try:
+                with open(c_path, "r", encoding="utf-8", errors="ignore", newline="") as f:
+                    rdr = csv.DictReader(f)
+                    if rdr.fieldnames:
+                        fn = [(_norm(h).lower() if h else "") for h in rdr.fieldnames]
+                        choices = ("supplier name", "supplier", "vendor", "vendor name", "name")
+                        col = None
+                        for i, h in enumerate(fn):
+                            if any(h.startswith(c) for c in choices):
+                                col = rdr.fieldnames[i]
+                                break
+                        if col is None:
+                            col = rdr.fieldnames[0]
+                        for row in rdr:
+                            val = row.get(col)
+                            if val:
+                                names.append(_norm(val))
+                source = "suppliers.csv"
+            except Exception:
+                pass
+
+    names = sorted({n for n in names if n})
+    if not names:
+        source = BUILTIN
+        names = [
+            _norm("Acme Components"),
+            _norm("Globex Engineering"),
+            _norm("Initech Precision"),
+            _norm("Umbrella Machining"),
+        ]
+    return names, source
+
+
+class SupplierRegistry:
+    def __init__(self, data_dir=DATA_DIR, poll_interval=SUPPLIER_POLL_INTERVAL):
+        self.data_dir = data_dir
+        self.poll_interval = poll_interval
+        self._dataset = None
+        self._reload_lock = threading.Lock()
+        self._watcher_pid = None
+        self._start_lock = threading.Lock()
+        self.reloads = 0
+        self.last_error = None
+        self.last_check = None
+
+    def _signature(self):
+        sig = []
+        for fname in SUPPLIER_FILES:
+            try:
+                st = os.stat(os.path.join(self.data_dir, fname))
+            except OSError:
+                continue
+            sig.append((fname, st.st_mtime_ns, st.st_size))
+        return tuple(sig)
+
+    def reload(self, force=False):
+        """Rebuild the index if the files changed (or `force`); returns True if swapped in."""
+        with self._reload_lock:
+            self.last_check = time.time()
+            signature = self._signature()
+            current = self._dataset
+            if current is not None and not force and signature == current.signature:
+                return False
+
+            t0 = time.perf_counter()
+            try:
+                names, source = load_supplier_names(self.data_dir)
+                if source == BUILTIN and signature and current is not None:
+                    raise ValueError("supplier file present but no names could be read")
+                index = SupplierIndex(names)
+            except Exception as e:
+                error = f"{type(e).__name__}: {e}"
+                if error != self.last_error:  # retried every poll; log once
+                    print(f"⚠️ Supplier reload failed, keeping version {current.version if current else None}: {e}")
+                self.last_error = error
+                return False
+
+            version = hashlib.sha256("\n".join(names).encode("utf-8")).hexdigest()[:12]
+            self._dataset = Dataset(index, version, source, time.time(),
+                                    round((time.perf_counter() - t0) * 1000, 1), signature)
+            self.reloads += 1
+            self.last_error = None
+            if current is not None:
+                print(f"🔄 Suppliers reloaded from {source}: {len(names)} names, version {version}")
+            return True
+
+    def _watch(self):
+        while True:
+            time.sleep(self.poll_interval)
+            try:
+                self.reload()
+            except Exception as e:  # never let the watcher die
+                self.last_error = f"{type(e).__name__}: {e}"
+
+    def _ensure_watcher(self):
+        if self.poll_interval <= 0 or self._watcher_pid == os.getpid():
+            return
+        with self._start_lock:
+            if self._watcher_pid != os.getpid():
+                threading.Thread(target=self._watch, name="supplier-watcher", daemon=True).start()
+                self._watcher_pid = os.getpid()
+
+    def load(self):
+        """Load the Dataset if needed, without starting the watcher (e.g. in a preforking master)."""
+        if self._dataset is None:
+            self.reload()
+        return self._dataset
+
+    def current(self):
+        """The live Dataset (loaded on first call)."""
+        self.load()
+        self._ensure_watcher()
+        return self._dataset
+
+    def search(self, query, limit=10, fuzzy=True):
+        return self.current().index.search(normalize_name(query), limit=limit, fuzzy=fuzzy)
+
+    def info(self):
+        ds = self.current()
+        return {
+            "version": ds.version,
+            "source": ds.source,
+            "count": len(ds.index),
+            "loaded_at": time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(ds.loaded_at)),
+            "load_ms": ds.load_ms,
+            "reloads": self.reloads,
+            "last_check": time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(self.last_check))
+            if self.last_check else None,
+            "last_error": self.last_error,
+            "poll_interval": self.poll_interval,
+            "data_dir": self.data_dir,
+        }
+
+
+registry = SupplierRegistry()
@@ -0,0 +1,29 @@
+# -*- coding: utf-8 -*-
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+import uploads  # noqa: E402
+
+
+@pytest.fixture
+def spool_dir(tmp_path, monkeypatch):
+    """Spool every upload larger than 1000 bytes into a fresh directory."""
+    path = tmp_path / "spool"
+    monkeypatch.setattr(uploads, "UPLOAD_SPOOL_DIR", str(path))
+    monkeypatch.setattr(uploads, "UPLOAD_SPOOL_THRESHOLD", 1000)
+    return path
+
+
+@pytest.fixture
+def app():
+    import api
+    return api.create_app()
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
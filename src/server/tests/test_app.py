@@ -0,0 +1,45 @@
+# -*- coding: utf-8 -*-
+import api
+import supplier_registry
+
+
+def test_create_app_twice_with_frontend(tmp_path, monkeypatch):
+    (tmp_path / "index.html").write_text("<html>spa</html>")
+    (tmp_path / "app.js").write_text("console.log(1)")
+    monkeypatch.setenv("FRONTEND_BUILD_PATH", str(tmp_path))
+
+    first = api.create_app()
+    second = api.create_app()
+
+    for app in (first, second):
+        client = app.test_client()
+        resp = client.get("/app.js")
+        assert resp.get_data(as_text=True) == "console.log(1)"
+        resp.close()
+        resp = client.get("/some/route")
+        assert resp.get_data(as_text=True) == "<html>spa</html>"
+        resp.close()
+
+
+def test_registry_load_does_not_start_watcher(tmp_path):
+    (tmp_path / "suppliers.csv").write_text("Supplier Name\nAcme\nGlobex\n")
+    registry = supplier_registry.SupplierRegistry(data_dir=str(tmp_path), poll_interval=60)
+
+    dataset = registry.load()
+
+    assert len(dataset.index) == 2
+    assert registry._watcher_pid is None
+
+    registry.current()
+    assert registry._watcher_pid is not None
+
+
+def test_warm_loads_suppliers_without_watcher(monkeypatch):
+    registry = supplier_registry.SupplierRegistry(poll_interval=60)
+    monkeypatch.setattr(supplier_registry, "registry", registry)
+    monkeypatch.setattr(api.startup_profile, "warm", lambda: None)
+
+    api.warm()
+
+    assert registry._dataset is not None
+    assert registry._watcher_pid is None
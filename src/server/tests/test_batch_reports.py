@@ -0,0 +1,49 @@
+import json
+import zipfile
+from concurrent.futures import Future
+from concurrent.futures.process import BrokenProcessPool
+
+import batch_reports
+import process_pools
+
+
+class BrokenPool:
+    """Every submitted form fails the way a dead worker makes it fail."""
+
+    def __init__(self):
+        self.shutdowns = []
+
+    def submit(self, fn, *args):
+        fut = Future()
+        fut.set_exception(BrokenProcessPool("worker died"))
+        return fut
+
+    def shutdown(self, **kwargs):
+        self.shutdowns.append(kwargs)
+
+
+def test_validate():
+    assert batch_reports.validate([]) == "items must be a non-empty list"
+    assert batch_reports.validate([{"formData": {}}]) is None
+    assert "no server-side renderer" in batch_reports.validate([{"formData": {}, "form": "form2"}])
+
+
+def test_broken_pool_is_shut_down_and_recorded(tmp_path, monkeypatch):
+    pool = BrokenPool()
+    monkeypatch.setattr(batch_reports, "BATCH_REPORT_DIR", str(tmp_path))
+    shared = process_pools.SpawnPool(lambda: 1)
+    shared._pool = pool
+    monkeypatch.setattr(batch_reports, "_pool", shared)
+    items = [{"formData": {"partNumber": "P-1"}}, {"formData": {}, "name": "second"}]
+
+    payload, status = batch_reports.run_batch("a" * 32, items)
+
+    assert status == 200
+    assert (payload["forms"], payload["rendered"]) == (2, 0)
+    assert shared._pool is None
+    assert pool.shutdowns and all(s == {"wait": False, "cancel_futures": True} for s in pool.shutdowns)
+    with zipfile.ZipFile(batch_reports.zip_path("a" * 32)) as zf:
+        manifest = json.loads(zf.read("manifest.json"))
+    assert [m["name"] for m in manifest] == ["001_P-1", "002_second"]
+    assert all(m["error"].startswith("BrokenProcessPool") for m in manifest)
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["a" * 32 + ".zip"]
@@ -0,0 +1,132 @@
+import hashlib
+import io
+import os
+
+import pytest
+
+import chunked_uploads
+import uploads
+from chunked_uploads import ChunkedUploadStore, UploadError
+
+DATA = bytes(range(256)) * 40
+SHA = hashlib.sha256(DATA).hexdigest()
+
+
+@pytest.fixture
+def store(tmp_path, monkeypatch):
+    s = ChunkedUploadStore(root=str(tmp_path / "chunks"), max_bytes=1 << 20, ttl=60)
+    monkeypatch.setattr(chunked_uploads, "store", s)
+    return s
+
+
+def test_resume_and_finalize(store):
+    upload_id = store.create("dir/report.pdf", len(DATA), sha256=SHA.upper())["upload_id"]
+    assert store.status(upload_id)["filename"] == "report.pdf"
+    store.write_chunk(upload_id, 0, io.BytesIO(DATA[:4000]))
+    # a resent earlier chunk is harmless; a gap is refused with the current offset
+    store.write_chunk(upload_id, 1000, io.BytesIO(DATA[1000:4000]))
+    with pytest.raises(UploadError) as e:
+        store.write_chunk(upload_id, 5000, io.BytesIO(DATA[5000:]))
+    assert (e.value.status_code, e.value.extra) == (409, {"offset": 4000})
+    with pytest.raises(UploadError) as e:
+        store.finalize(upload_id, digest=uploads.digest_source)
+    assert e.value.status_code == 409
+    assert store.write_chunk(upload_id, 4000, io.BytesIO(DATA[4000:]))["offset"] == len(DATA)
+
+    status = store.finalize(upload_id, digest=uploads.digest_source)
+    assert (status["state"], status["sha256"]) == (chunked_uploads.COMPLETE, SHA)
+    path, meta = store.open_complete(upload_id)
+    with open(path, "rb") as f:
+        assert f.read() == DATA
+    with pytest.raises(UploadError):
+        store.write_chunk(upload_id, 0, io.BytesIO(b"x"))
+
+
+def test_rejects(store):
+    with pytest.raises(UploadError):
+        store.create("", 10)
+    with pytest.raises(UploadError) as e:
+        store.create("big.bin", (1 << 20) + 1)
+    assert e.value.status_code == 413
+    with pytest.raises(UploadError) as e:
+        store.status("../../etc/passwd")
+    assert e.value.status_code == 404
+
+    upload_id = store.create("a.bin", 4)["upload_id"]
+    with pytest.raises(UploadError) as e:
+        store.write_chunk(upload_id, 0, io.BytesIO(b"12345"))
+    assert e.value.status_code == 416
+    store.write_chunk(upload_id, 0, io.BytesIO(b"1234"))
+    with pytest.raises(UploadError) as e:
+        store.finalize(upload_id, sha256="0" * 64, digest=uploads.digest_source)
+    assert e.value.status_code == 422
+    with pytest.raises(UploadError):
+        store.open_complete(upload_id)
+
+
+def test_sweep_removes_idle_uploads(store):
+    upload_id = store.create("a.bin", 4)["upload_id"]
+    old = os.path.getmtime(os.path.join(store.root, f"{upload_id}.json")) - 120
+    os.utime(os.path.join(store.root, f"{upload_id}.json"), (old, old))
+    store._last_sweep = 0
+    store.sweep()
+    assert os.listdir(store.root) == []
+
+
+def test_routes(client, store):
+    resp = client.post("/api/uploads", json={"filename": "r.bin", "size": len(DATA)})
+    assert resp.status_code == 201
+    upload_id = resp.get_json()["upload_id"]
+    assert client.put(f"/api/uploads/{upload_id}?offset=0", data=DATA[:100]).get_json()["offset"] == 100
+    resp = client.put(f"/api/uploads/{upload_id}?offset=200", data=DATA[200:])
+    assert resp.status_code == 409 and resp.get_json()["offset"] == 100
+    client.put(f"/api/uploads/{upload_id}", data=DATA[100:], headers={"Upload-Offset": "100"})
+    resp = client.post(f"/api/uploads/{upload_id}/finalize", json={"sha256": SHA})
+    assert resp.get_json()["state"] == "complete"
+    assert client.get("/api/uploads/stats").get_json()["complete"] == 1
+    assert client.delete(f"/api/uploads/{upload_id}").status_code == 200
+    assert client.get(f"/api/uploads/{upload_id}").status_code == 404
+
+
+def test_finalized_upload_attaches_as_file(client, store, tmp_path):
+    import openpyxl
+    path = tmp_path / "cmm.xlsx"
+    wb = openpyxl.Workbook()
+    for row in [("Feature Number", "Actual"), ("1", 10.2)]:
+        wb.active.append(row)
+    wb.save(path)
+    data = path.read_bytes()
+    upload_id = store.create("cmm.xlsx", len(data))["upload_id"]
+    store.write_chunk(upload_id, 0, io.BytesIO(data))
+    store.finalize(upload_id, sha256=hashlib.sha256(data).hexdigest(), digest=uploads.digest_source)
+
+    chars = '[{"feature_no": "1", "type": "Symmetrical", "nominal": "10", "tol": "0.1"}]'
+    resp = client.post("/api/cmm/evaluate", data={"file_upload_id": upload_id, "characteristics": chars})
+    assert resp.status_code == 200
+    assert resp.get_json()["data"]["actual"] == [10.2]
+    # the upload stays available for other routes
+    assert os.path.exists(store.open_complete(upload_id)[0])
+
+
+@pytest.mark.parametrize("body", [
+    [1, 2],
+    {"filename": 123, "size": 4},
+    {"filename": "a.bin", "size": 4, "sha256": 123},
+    {"filename": "a.bin", "size": 4, "sha256": "abc"},
+    {"filename": "a.bin", "size": 4, "content_type": ["text/plain"]},
+    {"filename": "a.bin", "size": [4]},
+])
+def test_create_rejects_malformed_bodies(client, store, body):
+    resp = client.post("/api/uploads", json=body)
+    assert resp.status_code == 400
+    assert "error" in resp.get_json()
+
+
+@pytest.mark.parametrize("body", [["sha"], {"sha256": 123}, {"sha256": "z" * 64}])
+def test_finalize_rejects_malformed_bodies(client, store, body):
+    upload_id = store.create("a.bin", 4)["upload_id"]
+    store.write_chunk(upload_id, 0, io.BytesIO(b"1234"))
+    resp = client.post(f"/api/uploads/{upload_id}/finalize", json=body)
+    assert resp.status_code == 400
+    assert "error" in resp.get_json()
+    assert store.status(upload_id)["state"] == chunked_uploads.UPLOADING
@@ -0,0 +1,67 @@
+import math
+
+import cmm_eval
+import cmm_report
+
+
+def features(actuals, ranges=None):
+    return cmm_report.features_from_maps(actuals, ranges)
+
+
+def test_tolerance_types():
+    chars = [
+        {"feature_no": "1", "type": "Symmetrical", "nominal": "10", "tol": "0.1"},
+        {"feature_no": "2", "type": "Bilateral", "nominal": "5", "high": "0.2", "low": "0.1"},
+        {"feature_no": "3", "type": "Unilateral Upper", "upper": "12.5 MAX"},
+        {"feature_no": "4", "type": "Unilateral Lower", "lower": "3"},
+        {"feature_no": "5", "type": "Range Inclusive", "lower": "1", "upper": "2"},
+        {"feature_no": "6", "type": "Basic Dimension", "basic": "7"},
+    ]
+    out = cmm_eval.evaluate(chars, features({"1": "10.05", "2": "4.85", "3": "12.6", "4": "3", "5": "1.5", "6": "7.2"}))
+    data = out["data"]
+    assert data["status"] == ["pass", "fail", "fail", "pass", "pass", "unchecked"]
+    assert data["lower"][:2] == [9.9, 4.9]
+    assert data["upper"][2] == 12.5 and data["lower"][2] is None
+    assert data["nominal"][4] == 1.5 and data["nominal"][5] == 7.0
+    assert math.isclose(data["deviation"][0], 0.05)
+    assert out["summary"] == {"pass": 3, "fail": 2, "missing": 0, "unchecked": 1, "refer_only": 0}
+
+
+def test_worst_reading_decides():
+    chars = [{"feature_no": "1", "type": "Symmetrical", "nominal": "10", "tol": "0.1"}]
+    out = cmm_eval.evaluate(chars, features({"1": "10.0"}, {"1": {"min": 9.95, "max": 10.2}}))
+    assert out["data"]["status"] == ["fail"]
+    assert (out["data"]["min"], out["data"]["max"]) == ([9.95], [10.2])
+
+
+def test_missing_unchecked_and_refer_only():
+    chars = [
+        {"feature_no": "1", "type": "Symmetrical", "nominal": "10", "tol": "0.1"},
+        {"feature_no": "2", "type": "Symmetrical", "nominal": "10"},
+        {"feature_no": "3", "type": "Symmetrical", "nominal": "10", "tol": "0.1"},
+    ]
+    out = cmm_eval.evaluate(chars, features({"2": "10", "3": "50"}), refer_only_keys=["3"])
+    assert out["data"]["status"] == ["missing", "unchecked", "refer_only"]
+    assert out["data"]["actual"] == [None, 10.0, 50.0]
+
+
+def test_feature_numbers_are_normalized():
+    chars = [{"feature_no": " 1 ", "type": "Range Inclusive", "lower": "0", "upper": "1"}]
+    out = cmm_eval.evaluate(chars, features({"1": "0.5"}))
+    assert out["data"]["feature_no"] == ["1"]
+    assert out["data"]["status"] == ["pass"]
+
+
+def test_evaluate_route(client):
+    body = {
+        "characteristics": [{"feature_no": "1", "type": "Symmetrical", "nominal": "10", "tol": "0.1"}],
+        "feature_actual_map": {"1": "10.2"},
+    }
+    resp = client.post("/api/cmm/evaluate", json=body)
+    assert resp.status_code == 200
+    assert resp.get_json()["data"]["status"] == ["fail"]
+
+    body["characteristics"][0]["type"] = "Diagonal"
+    resp = client.post("/api/cmm/evaluate", json=body)
+    assert resp.status_code == 400
+    assert "Diagonal" in resp.get_json()["error"]
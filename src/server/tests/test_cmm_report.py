@@ -0,0 +1,90 @@
+from concurrent.futures.process import BrokenProcessPool
+
+import pytest
+
+import cmm_report
+import process_pools
+
+
+@pytest.fixture(autouse=True)
+def empty_cache(monkeypatch):
+    monkeypatch.setattr(cmm_report, "_cache", type(cmm_report._cache)())
+    monkeypatch.setattr(cmm_report, "cache_stats", {"hits": 0, "misses": 0})
+
+
+def template(values):
+    return [("CMM REPORT", None, None), (None, None, None),
+            ("Feature Number", "Nominal", "Actual")] + [(f"{i + 1}", 10.0, v) for i, v in enumerate(values)]
+
+
+def test_header_row_found():
+    found, hit = cmm_report.find_header(template([10.01, 9.98]))
+    assert found == (3, 0, 2)
+    assert not hit
+
+
+def test_same_template_other_measurements_hits_cache():
+    cmm_report.find_header(template([10.01, 9.98, 10.02]))
+    found, hit = cmm_report.find_header(template([11.5, 8.25, 10.0]))
+    assert (found, hit) == ((3, 0, 2), True)
+    assert cmm_report.cache_stats == {"hits": 1, "misses": 1}
+
+
+def test_other_header_misses_cache():
+    cmm_report.find_header(template([10.01]))
+    rows = template([10.01])
+    rows[2] = ("Feature Number", "Actual", "Nominal")
+    found, hit = cmm_report.find_header(rows)
+    assert (found, hit) == ((3, 0, 1), False)
+
+
+def test_inferred_columns_not_cached():
+    rows = [(f"{i}-1", round(1.5 * i, 2)) for i in range(1, 6)]
+    assert cmm_report.find_header(rows) == ((None, 0, 1), False)
+    # same text cells, but the second column no longer holds numbers
+    other = [(f"{i}-1", None) for i in range(1, 6)]
+    assert cmm_report.find_header(other) == ((None, None, None), False)
+    assert len(cmm_report._cache) == 0
+
+
+def test_cache_bounded(monkeypatch):
+    monkeypatch.setattr(cmm_report, "CMM_HEADER_CACHE", 2)
+    for n in range(4):
+        rows = template([1.0])
+        rows[0] = (f"CMM REPORT {n}", None, None)
+        cmm_report.find_header(rows)
+    assert len(cmm_report._cache) == 2
+
+
+class BrokenPool:
+    def __init__(self):
+        self.shutdowns = []
+
+    def map(self, fn, *iterables):
+        raise BrokenProcessPool("worker died")
+
+    def shutdown(self, **kwargs):
+        self.shutdowns.append(kwargs)
+
+
+def test_broken_pool_falls_back_and_is_shut_down(tmp_path, monkeypatch):
+    import openpyxl
+    path = str(tmp_path / "report.xlsx")
+    wb = openpyxl.Workbook()
+    wb.active.title = "Part A"
+    for ws, values in ((wb.active, [10.01, 9.98]), (wb.create_sheet("Part B"), [5.5])):
+        for row in template(values):
+            ws.append(row)
+    wb.save(path)
+    pool = BrokenPool()
+    monkeypatch.setattr(cmm_report, "CMM_PARSE_WORKERS", 2)
+    shared = process_pools.SpawnPool(lambda: 2)
+    shared._pool = pool
+    monkeypatch.setattr(cmm_report, "_pool", shared)
+
+    features, refer, debug = cmm_report.parse_workbook(path)
+
+    assert [d["sheet"] for d in debug] == ["Part A", "Part B"]
+    assert features.find("1") is not None and features.find("2") is not None
+    assert shared._pool is None
+    assert pool.shutdowns == [{"wait": False, "cancel_futures": True}]
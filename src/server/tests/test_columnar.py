@@ -0,0 +1,86 @@
+# -*- coding: utf-8 -*-
+import json
+import math
+import pickle
+
+import pytest
+
+import columnar
+
+SCHEMA = [("key", columnar.STR), ("note", columnar.TEXT), ("value", columnar.FLOAT), ("kind", columnar.STR)]
+
+
+def _table():
+    t = columnar.Table(SCHEMA, key="key")
+    t.append("b", "second", 2.5, "x")
+    t.append("a", None, None, "x")
+    t.append("c", 'quote " and \\u00e9', 1.0, None)
+    return t
+
+
+def test_rows_and_columns():
+    t = _table()
+    assert len(t) == 3
+    assert t[0].as_dict() == {"key": "b", "note": "second", "value": 2.5, "kind": "x"}
+    assert t[-1]["kind"] is None
+    assert t.get(1, "value") is None and math.isnan(t.floats("value")[1])
+    assert t.column("kind") == ["x", "x", None]
+    assert t.find("a") == 1 and t.find("zz") is None
+    with pytest.raises(IndexError):
+        t[3]
+
+
+def test_duplicate_key_rolls_back_row():
+    t = _table()
+    with pytest.raises(ValueError):
+        t.append("a", "dup", 9.0, "y")
+    assert len(t) == 3
+    assert all(len(t.column(name)) == 3 for name in t.names)
+
+
+def test_json_output_matches_json_dumps():
+    t = _table()
+    rows = [r.as_dict() for r in t]
+    assert [json.loads(line) for line in t.json_rows()] == rows
+    assert [json.loads(line) for line in t.ndjson().splitlines()] == rows
+    assert json.loads(t.json_map("key", "value")) == {"b": 2.5, "c": 1.0}
+    assert json.loads(t.json_map("key", ("value", "note"))) == {
+        "b": {"value": 2.5, "note": "second"}, "c": {"value": 1.0, "note": 'quote " and \\u00e9'}}
+    assert list(json.loads(t.json_map("key", "kind"))) == ["a", "b"]   # sorted, nulls left out
+
+
+def test_set_and_key_is_read_only():
+    t = _table()
+    t.set(1, "value", 4.0)
+    t.set(1, "kind", "z")
+    assert t[1].as_dict() == {"key": "a", "note": None, "value": 4.0, "kind": "z"}
+    with pytest.raises(ValueError):
+        t.set(0, "key", "q")
+
+
+def test_to_dict_encoded_and_pickle():
+    t = _table()
+    enc = t.to_dict_encoded()
+    assert enc["length"] == 3
+    assert enc["columns"]["kind"] == {"dictionary": ["x"], "indices": [0, 0, -1]}
+    assert enc["columns"]["note"] == {"values": ["second", None, 'quote " and \\u00e9']}
+    assert pickle.loads(pickle.dumps(t)).to_columns() == t.to_columns()
+
+
+def test_clear_drops_string_pools():
+    t = columnar.Table([("op", columnar.STR), ("desc", columnar.STR)])
+    for batch in range(5):
+        for i in range(100):
+            t.append("OP10", f"description {batch}-{i}")
+        assert [len(p.strings) for p in t._pools] == [1, 100]   # one batch's strings, not all so far
+        assert json.loads("[" + ",".join(t.json_rows()) + "]")[-1] == {"op": "OP10", "desc": f"description {batch}-99"}
+        t.clear()
+    assert len(t) == 0
+
+
+def test_clear_resets_key_index():
+    t = _table()
+    t.clear()
+    assert t.find("a") is None
+    t.append("a", None, 1.0, None)
+    assert t.find("a") == 0
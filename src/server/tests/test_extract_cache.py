@@ -0,0 +1,26 @@
+import api
+import extract_cache
+import ocr_engine
+
+
+class Engine:
+    def __init__(self, name):
+        self.name = name
+
+
+def test_ocr_results_are_keyed_by_engine(monkeypatch):
+    monkeypatch.setattr(extract_cache, "cache", extract_cache.ResultCache(disk_dir=""))
+    calls = []
+    monkeypatch.setattr(api, "_extract_file", lambda filename, source, progress=None:
+                        (calls.append(filename) or {"extracted_text": filename}, 200))
+
+    monkeypatch.setattr(ocr_engine, "_engine", Engine("subprocess"))
+    assert api._extract_file_cached("scan.png", b"image bytes")[2] is False
+    assert api._extract_file_cached("scan.png", b"image bytes")[2] is True
+    api._extract_file_cached("plan.xlsx", b"workbook bytes")
+
+    monkeypatch.setattr(ocr_engine, "_engine", Engine("tesserocr"))
+    assert api._extract_file_cached("scan.png", b"image bytes")[2] is False
+    # Excel results do not depend on the OCR engine
+    assert api._extract_file_cached("plan.xlsx", b"workbook bytes")[2] is True
+    assert calls == ["scan.png", "plan.xlsx", "scan.png"]
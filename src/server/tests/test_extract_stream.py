@@ -0,0 +1,106 @@
+# -*- coding: utf-8 -*-
+import io
+import json
+
+import fitz
+
+
+def _text_pdf(pages=2):
+    doc = fitz.open()
+    for i in range(pages):
+        page = doc.new_page()
+        page.insert_text((72, 72), f"Page {i + 1}: inspection planning sheet, feature list and tolerances " * 2)
+    data = doc.tobytes()
+    doc.close()
+    return data
+
+
+def test_ndjson_pdf_stream_releases_spooled_upload(client, spool_dir):
+    data = _text_pdf()
+    assert len(data) > 1000   # spooled, not kept in memory
+    resp = client.post("/api/extract-text?stream=ndjson", data={"file": (io.BytesIO(data), "plan.pdf")},
+                       content_type="multipart/form-data")
+    records = [json.loads(line) for line in resp.get_data(as_text=True).splitlines()]
+    resp.close()
+
+    assert [r["type"] for r in records] == ["start", "page", "page", "end"]
+    assert all(r["source"] == "text" for r in records if r["type"] == "page")
+    assert list(spool_dir.iterdir()) == []
+
+
+def _ips_workbook(rows):
+    import openpyxl
+    wb = openpyxl.Workbook()
+    ws = wb.active
+    ws.title = "Sheet2"
+    ws.append(["INSPECTION PLAN SHEET"])
+    ws.append(["Sr No", "Operation", "Feature\nNumber", "Drawing Ref", "Description"])
+    for i in range(rows):
+        ws.append([i + 1, f"OP{10 * (i % 3)}", str(i + 1), f"Zone {i}", f'Dia "{i}" }}, {{ 5%'])
+    ws.append([rows + 1, "OP10", "12A", "Zone", "letters in the feature number: skipped"])
+    buf = io.BytesIO()
+    wb.save(buf)
+    return buf.getvalue()
+
+
+def test_ips_stream_frames(client, spool_dir):
+    resp = client.post("/api/extract-text-stream?batch=40", data={"file": (io.BytesIO(_ips_workbook(100)), "ips.xlsx")},
+                       content_type="multipart/form-data")
+    assert resp.mimetype == "application/x-ndjson"
+    frames = [json.loads(line) for line in resp.get_data(as_text=True).splitlines()]
+    resp.close()
+
+    assert frames[0]["type"] == "start" and frames[0]["sheet"] == "Sheet2"
+    assert frames[0]["columns"] == {"operation": 1, "feature_no": 2, "drawing_ref": 3, "description": 4}
+    batches = [f for f in frames if f["type"] == "rows"]
+    assert [(f["offset"], len(f["rows"])) for f in batches] == [(0, 40), (40, 40), (80, 20)]
+    assert frames[-1]["type"] == "end" and frames[-1]["rows"] == 100
+    rows = [r for f in batches for r in f["rows"]]
+    assert rows[7] == {"operation": "OP10", "feature_no": "8", "drawing_ref": "Zone 7", "description": 'Dia "7" }, { 5%'}
+    assert list(spool_dir.iterdir()) == []
+
+
+def test_ips_stream_memory_bounded_per_batch(monkeypatch):
+    """The row table holds one batch: free-text columns are not pooled across batches."""
+    import api
+    import columnar
+
+    peak = []
+    real_clear = columnar.Table.clear
+
+    def clear(table):
+        peak.append(sum(len(p.strings) for p in table._pools if p is not None))
+        real_clear(table)
+
+    monkeypatch.setattr(columnar.Table, "clear", clear)
+    frames = list(api._ips_rows_ndjson("ips.xlsx", _ips_workbook(500), 50))
+    assert json.loads(frames[-1])["rows"] == 500
+    assert len(peak) == 10 and max(peak) <= 50
+
+
+def test_ips_stream_ignores_cells_past_the_header():
+    """Without <dimension> the header row can be shorter than the data rows; unnamed cells are not read."""
+    import re
+    import zipfile
+    import openpyxl
+    import api
+
+    wb = openpyxl.Workbook()
+    ws = wb.active
+    ws.title = "Sheet2"
+    ws.append(["INSPECTION PLAN SHEET"])
+    ws.append(["Operation", "Feature\nNumber", "Drawing Ref"])
+    ws.append(["OP10", 12, "A1", "STRAY NOTE"])
+    buf = io.BytesIO()
+    wb.save(buf)
+    out = io.BytesIO()
+    with zipfile.ZipFile(buf) as src, zipfile.ZipFile(out, "w") as dst:
+        for item in src.infolist():
+            data = src.read(item.filename)
+            if item.filename.startswith("xl/worksheets/"):
+                data = re.sub(rb"<dimension[^>]*/>", b"", data)
+            dst.writestr(item, data)
+
+    frames = [json.loads(f) for f in api._ips_rows_ndjson("ips.xlsx", out.getvalue(), 10)]
+    assert frames[0]["columns"]["description"] is None
+    assert frames[1]["rows"] == [{"operation": "OP10", "feature_no": "12", "drawing_ref": "A1", "description": ""}]
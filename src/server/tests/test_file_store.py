@@ -0,0 +1,76 @@
+import hashlib
+import io
+import os
+
+import pytest
+
+import file_store
+from file_store import FileStore
+
+TEXT = b"FAIR Form 1 " * 5000
+NOISE = os.urandom(64 * 1024)
+
+
+def read(store, sha256):
+    with store.open_blob(sha256) as f:
+        return f.read()
+
+
+def test_put_dedups_across_source_kinds(tmp_path):
+    store = FileStore(root=str(tmp_path / "store"), codec="none")
+    src = tmp_path / "a.pdf"
+    src.write_bytes(TEXT)
+    first = store.put(str(src))
+    assert first == (hashlib.sha256(TEXT).hexdigest(), len(TEXT), len(TEXT), "none", False)
+    assert store.put(TEXT).deduped
+    assert store.put(io.BytesIO(TEXT)).deduped
+    assert read(store, first.sha256) == TEXT
+    assert store.stats()["puts"] == 3 and store.stats()["deduped"] == 2
+    assert store.stats()["bytes_stored"] == len(TEXT)
+    assert [n for n in os.listdir(store.root) if n.startswith(".incoming-")] == []
+
+
+def test_gzip_kept_only_when_it_saves(tmp_path):
+    store = FileStore(root=str(tmp_path / "store"), codec="gzip")
+    text = store.put(TEXT)
+    assert text.codec == "gzip" and text.stored_size < text.size
+    assert store.locate(text.sha256)[0].endswith(".gz")
+    noise = store.put(NOISE)
+    assert (noise.codec, noise.stored_size) == ("none", len(NOISE))
+    assert read(store, text.sha256) == TEXT
+    assert read(store, noise.sha256) == NOISE
+    out = io.BytesIO()
+    store.copy_to(text.sha256, out)
+    assert out.getvalue() == TEXT
+
+
+def test_missing_and_malformed_hashes(tmp_path):
+    store = FileStore(root=str(tmp_path / "store"), codec="bogus")
+    assert store.codec == "none"
+    assert store.locate("../../etc/passwd") == (None, None)
+    with pytest.raises(FileNotFoundError):
+        store.open_blob("0" * 64)
+
+
+class FakeCursor:
+    def __init__(self, next_version):
+        self.next_version = next_version
+        self.executed = []
+
+    def execute(self, sql, params=()):
+        self.executed.append((" ".join(sql.split()), params))
+
+    def fetchone(self):
+        return {"next_version": self.next_version}
+
+
+def test_add_form1_version(tmp_path):
+    store = FileStore(root=str(tmp_path / "store"), codec="none")
+    pdf, excel = store.put(TEXT), store.put(NOISE)
+    cursor = FakeCursor(3)
+    assert file_store.add_form1_version(cursor, "E1", pdf, excel, "a.pdf", "a.xlsx") == 3
+    inserts = [params for sql, params in cursor.executed if sql.startswith("INSERT IGNORE INTO stored_files")]
+    assert inserts == [(pdf.sha256, pdf.size, pdf.stored_size, "none"), (excel.sha256, excel.size, excel.stored_size, "none")]
+    sql, params = cursor.executed[-1]
+    assert sql.startswith("INSERT INTO form1_versions")
+    assert params == ("E1", 3, pdf.sha256, "a.pdf", excel.sha256, "a.xlsx")
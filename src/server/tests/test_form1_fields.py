@@ -0,0 +1,60 @@
+import form1_fields
+
+TEXT = """FIRST ARTICLE INSPECTION REPORT
+1. Part Number: ABC-123
+2. Part Name: Bracket
+3. Serial Number: SN-77
+4. FAIR Identifier: FAIR-9
+5. Part Revision Level: C
+P.O.no: 45-00 12
+vendor | 249067
+15. Part Number: IDX-1
+Does FAIR Contain a Documented Nonconformance? Yes
+Part ABC-123 inspected, Bracket ok
+"""
+
+
+def test_scan_labels_credits_overlapping_labels():
+    found = form1_fields.scan_labels("15. Part Number: IDX-1\n")
+    assert found["15\\. Part Number"] == "IDX-1"
+    assert found["Part Number"] == "IDX-1"
+
+
+def test_extract():
+    out = form1_fields.extract(TEXT)
+    f, conf = out["fields"], out["confidence"]
+    assert (f["partNumber"], f["partName"], f["serialNumber"]) == ("ABC-123", "Bracket", "SN-77")
+    assert f["drawingRevisionLevel"] == "C"              # falls back to the part revision
+    assert f["purchaseOrderNumber"] == "450012"          # digits only
+    assert f["supplierCode"] == "249067" and conf["supplierCode"] == 1.0
+    assert f["indexPartNumber"] == "IDX-1"
+    assert f["nonconformanceYes"] and not f["nonconformanceNo"]
+    assert f["partNumberCount"] == 2
+    # found twice in the text: full weight; found once: scaled down
+    assert conf["partNumber"] == 1.0
+    assert conf["serialNumber"] == form1_fields.SINGLE_OCCURRENCE_FACTOR
+    assert f["customerApproval"] == "" and conf["customerApproval"] == 0.0
+
+
+def test_extract_empty_text():
+    out = form1_fields.extract(None)
+    assert all(v in ("", False) for v in out["fields"].values())
+
+
+def test_merge_majority_vote():
+    a = form1_fields.extract("Part Number: P1\nPart Name: Gear\n")
+    b = form1_fields.extract("Part Number: P1\nPart Name: Shaft\n")
+    c = form1_fields.extract("Part Number: P2\n")
+    merged = form1_fields.merge([a, b, c])
+    form = merged["formData"]
+    assert form["partNumber"] == "P1"
+    assert merged["votes"]["partNumber"] == {"P1": 2, "P2": 1}
+    assert form["partName"] == "Gear"                    # a tie: the first file wins
+    assert merged["confidence"]["partNumber"] == round(0.75 * (0.5 + 0.5 * 2 / 3), 3)
+    assert form["partNumberCount"] == 3
+    assert form1_fields.merge([]) == {"formData": {}, "confidence": {}, "votes": {}}
+
+
+def test_occurrences():
+    counts = form1_fields.occurrences(["ab P1 p1", "P1"], {"partNumber": "P1", "partName": ""})
+    assert counts["partNumber"] == 3 and counts["partName"] == 0
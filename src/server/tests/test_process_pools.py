@@ -0,0 +1,46 @@
+import process_pools
+
+
+class FakePool:
+    def __init__(self):
+        self.shutdowns = []
+
+    def shutdown(self, **kwargs):
+        self.shutdowns.append(kwargs)
+
+
+def test_reset_shuts_down_broken_pool():
+    shared, broken = process_pools.SpawnPool(lambda: 1), FakePool()
+    shared._pool = broken
+    shared.reset(broken)
+    assert shared._pool is None
+    assert broken.shutdowns == [{"wait": False, "cancel_futures": True}]
+
+
+def test_reset_keeps_replacement():
+    shared, broken, fresh = process_pools.SpawnPool(lambda: 1), FakePool(), FakePool()
+    shared._pool = fresh
+    shared.reset(broken)
+    assert shared._pool is fresh
+    assert fresh.shutdowns == []
+    assert broken.shutdowns == [{"wait": False, "cancel_futures": True}]
+
+
+def test_get_creates_one_pool_of_the_current_size():
+    size = [3]
+    shared = process_pools.SpawnPool(lambda: size[0])
+    pool = shared.get()
+    try:
+        assert shared.get() is pool
+        assert pool._max_workers == 3
+    finally:
+        shared.reset(pool)
+
+
+def test_shares_split_the_budget(monkeypatch):
+    monkeypatch.setattr(process_pools, "POOL_CORES", 8)
+    sizes = {name: process_pools.share(name) for name in process_pools.POOL_SHARES}
+    assert sizes == {"pdf_ocr": 4, "cmm_parse": 2, "batch_reports": 2}
+    assert sum(sizes.values()) == 8
+    monkeypatch.setattr(process_pools, "POOL_CORES", 1)
+    assert all(process_pools.share(name) == 1 for name in process_pools.POOL_SHARES)
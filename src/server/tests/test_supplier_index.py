@@ -0,0 +1,31 @@
+from supplier_index import SupplierIndex
+
+NAMES = ["Globex Engineering", "Globex", "Initech Precision", "Acme Corp", "Engine Works", "Gl/Engraving Co"]
+
+
+def test_ranking():
+    index = SupplierIndex(NAMES)
+    assert len(index) == len(NAMES)
+    assert index.search("globex") == [("Globex", "exact", 1.0), ("Globex Engineering", "prefix", 1.0)]
+    # whole-name prefixes first, then later words (alphabetical by the word on); each name once
+    assert [(n, k) for n, k, _ in index.search("eng", fuzzy=False)] == [
+        ("Engine Works", "prefix"), ("Globex Engineering", "word"), ("Gl/Engraving Co", "word")]
+
+
+def test_fuzzy_catches_typos():
+    index = SupplierIndex(NAMES)
+    name, kind, score = index.search("globx")[0]
+    assert (name, kind) == ("Globex", "fuzzy")
+    assert 0.3 <= score < 1
+    assert index.search("precison")[0][:2] == ("Initech Precision", "fuzzy")
+    assert index.search("zzzz") == []
+    assert index.search("gl", fuzzy=True) == index.search("gl", fuzzy=False)   # too short for trigrams
+
+
+def test_limits():
+    index = SupplierIndex(NAMES)
+    assert index.search("", limit=2) == [("Acme Corp", "prefix", 1.0), ("Engine Works", "prefix", 1.0)]
+    assert len(index.search("", limit=None)) == len(NAMES)
+    assert index.search("g", limit=0) == []
+    assert len(index.search("g", limit=2)) == 2
+    assert len(index.search("g", limit=-1)) == 3
@@ -0,0 +1,90 @@
+import datetime
+import zipfile
+
+import openpyxl
+import pytest
+
+import xlsx_reader
+
+
+@pytest.fixture
+def workbook(tmp_path):
+    path = str(tmp_path / "book.xlsx")
+    wb = openpyxl.Workbook()
+    ws = wb.active
+    ws.title = "Lookup"
+    ws.append(["not", "read"])
+    ips = wb.create_sheet("Sheet2")
+    ips.append(["Sr No", "Operation", "Feature\nNumber", "Measured", "Checked", "Date"])
+    ips.append([1, "OP10", "1-1", 10.25, True, datetime.datetime(2024, 3, 1, 8, 30)])
+    ips.append([2, "OP20", None, -3, False, None])
+    ips["B6"] = "after a gap"            # rows 4-5 are missing from the XML
+    ips["H6"] = 1e-7                     # widens the sheet
+    wb.active = 1
+    wb.save(path)
+    return path
+
+
+def openpyxl_rows(path, name):
+    wb = openpyxl.load_workbook(path, read_only=True, data_only=True)
+    try:
+        return list(wb[name].iter_rows(values_only=True))
+    finally:
+        wb.close()
+
+
+@pytest.mark.parametrize("parser", ["etree", "lxml"])
+def test_rows_match_openpyxl(workbook, parser, monkeypatch):
+    if parser == "lxml" and xlsx_reader._lxml_iterparse is None:
+        pytest.skip("lxml is not installed")
+    monkeypatch.setattr(xlsx_reader, "XLSX_PARSER", parser)
+    with xlsx_reader.Workbook(workbook) as wb:
+        assert wb.sheetnames == ["Lookup", "Sheet2"]
+        assert wb.active.title == "Sheet2"
+        rows = list(wb["Sheet2"].iter_rows(values_only=True))
+    assert rows == openpyxl_rows(workbook, "Sheet2")
+    assert rows[1][5] == datetime.datetime(2024, 3, 1, 8, 30)
+    assert rows[3] == (None,) * 8
+
+
+def test_file_object_and_missing_sheet(workbook):
+    with open(workbook, "rb") as fh, xlsx_reader.load(fh) as wb:
+        assert next(wb["Lookup"].iter_rows()) == ("not", "read")
+        with pytest.raises(KeyError):
+            wb["Sheet9"]
+        with pytest.raises(ValueError):
+            next(wb["Lookup"].iter_rows(values_only=False))
+
+
+def test_inline_strings(tmp_path):
+    path = str(tmp_path / "inline.xlsx")
+    sheet = ('<worksheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main"><sheetData>'
+             '<row r="1"><c r="A1" t="inlineStr"><is><t>Part</t></is></c>'
+             '<c r="C1" t="inlineStr"><is><r><t>rich </t></r><r><t>text</t></r></is></c></row>'
+             '</sheetData></worksheet>')
+    book = ('<workbook xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main" '
+            'xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships">'
+            '<sheets><sheet name="S" sheetId="1" r:id="rId1"/></sheets></workbook>')
+    rel = "http://schemas.openxmlformats.org/officeDocument/2006/relationships"
+    with zipfile.ZipFile(path, "w") as zf:
+        zf.writestr("_rels/.rels", '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+                                   f'<Relationship Id="rId1" Type="{rel}/officeDocument" Target="xl/workbook.xml"/>'
+                                   '</Relationships>')
+        zf.writestr("xl/workbook.xml", book)
+        zf.writestr("xl/_rels/workbook.xml.rels",
+                    '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+                    f'<Relationship Id="rId1" Type="{rel}/worksheet" Target="worksheets/sheet1.xml"/>'
+                    '</Relationships>')
+        zf.writestr("xl/worksheets/sheet1.xml", sheet)
+    with xlsx_reader.Workbook(path) as wb:
+        assert list(wb["S"].iter_rows()) == [("Part", None, "rich text")]
+
+
+def test_load_openpyxl(workbook, monkeypatch):
+    monkeypatch.setattr(xlsx_reader, "XLSX_READER", "openpyxl")
+    wb = xlsx_reader.load(workbook)
+    try:
+        assert not isinstance(wb, xlsx_reader.Workbook)
+        assert wb.sheetnames == ["Lookup", "Sheet2"]
+    finally:
+        wb.close()
@@ -0,0 +1,162 @@
+# -*- coding: utf-8 -*-
+"""
+Upload handling: spool request files to disk instead of holding them in RAM.
+
+- SpoolingRequest writes every uploaded file larger than UPLOAD_SPOOL_THRESHOLD
+  straight to a named temp file in UPLOAD_SPOOL_DIR (werkzeug's default keeps up
+  to 500 KB in memory and hides larger files in unnamed temp files)
+- source_of(file) hands extractors a path (fitz/openpyxl/PIL/docx open it
+  themselves) or, for small uploads, the in-memory bytes
+- take(file)/release(source) hand a spooled upload to work that outlives the request
+- open_workbook(source) opens an Excel source read-only
+- A finalized chunked upload (chunked_uploads.py) sent as `<field>_upload_id`
+  shows up in request.files[<field>] like any other spooled upload
+- Bytes held in memory per request are counted and sent as X-Upload-Mem-Bytes
+"""
+
+import io
+import os
+import mmap
+import hashlib
+import tempfile
+from contextlib import contextmanager
+
+from flask import Request, request
+from werkzeug.datastructures import FileStorage
+
+import chunked_uploads
+
+UPLOAD_MAX_MB = int(os.environ.get("UPLOAD_MAX_MB", "200"))
+UPLOAD_SPOOL_THRESHOLD = int(os.environ.get("UPLOAD_SPOOL_THRESHOLD", str(256 * 1024)))
+UPLOAD_SPOOL_DIR = os.environ.get("UPLOAD_SPOOL_DIR", os.path.join(tempfile.gettempdir(), "iampl-uploads"))
+
+
+class SpoolingRequest(Request):
+    def _get_file_stream(self, total_content_length, content_type, filename=None, content_length=None):
+        if total_content_length is not None and total_content_length <= UPLOAD_SPOOL_THRESHOLD:
+            return io.BytesIO()
+        os.makedirs(UPLOAD_SPOOL_DIR, exist_ok=True)
+        stream = tempfile.NamedTemporaryFile(dir=UPLOAD_SPOOL_DIR, prefix="upload-", delete=False)
+        self._spooled_paths = getattr(self, "_spooled_paths", []) + [stream.name]
+        return stream
+
+    def _load_form_data(self):
+        super()._load_form_data()
+        attached = [(k[:-len("_upload_id")], v) for k, v in self.form.items(multi=True)
+                    if k.endswith("_upload_id") and v]
+        if not attached:
+            return
+        files = self.files.copy()
+        for field, upload_id in attached:
+            if field in files:
+                continue
+            path, meta = chunked_uploads.store.open_complete(upload_id)
+            files[field] = FileStorage(open(path, "rb"), filename=meta["filename"], name=field,
+                                       content_type=meta.get("content_type"))
+        self.__dict__["files"] = self.parameter_storage_class(files)
+
+    def close(self):
+        super().close()  # closes the file streams first (required on Windows)
+        for path in getattr(self, "_spooled_paths", ()):
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+
+def _spool_path(file):
+    stream = file.stream
+    path = getattr(stream, "name", None)
+    if isinstance(path, str) and os.path.isfile(path):
+        stream.flush()
+        return path
+    return None
+
+
+def source_of(file):
+    """Path of the spooled upload, or the bytes of a small in-memory one."""
+    path = _spool_path(file)
+    if path is not None:
+        return path
+    data = file.stream.getvalue() if isinstance(file.stream, io.BytesIO) else file.read()
+    count_mem(len(data))
+    return data
+
+
+def take(file):
+    """
+    Like source_of(), but a spooled file is no longer removed when the request
+    ends: for streamed responses and background jobs that outlive the request.
+    The caller must release() it.
+    """
+    source = source_of(file)
+    if isinstance(source, str):
+        spooled = getattr(request, "_spooled_paths", [])
+        if source in spooled:
+            request._spooled_paths = [p for p in spooled if p != source]
+    return source
+
+
+def release(source):
+    """
+    Delete a source obtained from take(). No-op for in-memory bytes and for
+    chunked uploads, which stay available until deleted or expired.
+    """
+    if isinstance(source, str) and os.path.dirname(os.path.abspath(source)) == os.path.abspath(UPLOAD_SPOOL_DIR):
+        try:
+            os.remove(source)
+        except OSError:
+            pass
+
+
+def open_source(source):
+    """A file-like object over a path or bytes source."""
+    return source if isinstance(source, str) else io.BytesIO(source)
+
+
+@contextmanager
+def open_workbook(source):
+    """
+    Read-only workbook over a source (xlsx_reader.load()), closed on exit.
+    Paths are opened as file objects: spooled uploads have no .xlsx suffix,
+    which openpyxl rejects for file names.
+    """
+    import xlsx_reader
+    fh = open(source, "rb") if isinstance(source, str) else io.BytesIO(source)
+    try:
+        wb = xlsx_reader.load(fh)
+        try:
+            yield wb
+        finally:
+            wb.close()
+    finally:
+        fh.close()
+
+
+def digest_source(source):
+    """SHA-256 of a path (hashed through mmap, no copy into Python memory) or bytes."""
+    if not isinstance(source, str):
+        return hashlib.sha256(source).hexdigest()
+    h = hashlib.sha256()
+    with open(source, "rb") as f:
+        if os.fstat(f.fileno()).st_size:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                h.update(mm)
+    return h.hexdigest()
+
+
+def count_mem(nbytes):
+    request.upload_mem_bytes = getattr(request, "upload_mem_bytes", 0) + nbytes
+
+
+def init_app(app):
+    app.request_class = SpoolingRequest
+    # uploads no longer sit in RAM, so the limit can be well above the old 20 MB
+    app.config['MAX_CONTENT_LENGTH'] = UPLOAD_MAX_MB * 1024 * 1024
+
+    @app.after_request
+    def _report_upload_memory(resp):
+        held = getattr(request, "upload_mem_bytes", 0)
+        if held:
+            resp.headers["X-Upload-Mem-Bytes"] = str(held)
+        return resp
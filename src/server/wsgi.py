@@ -0,0 +1,70 @@
+# -*- coding: utf-8 -*-
+"""
+Production entry point for the Flask backend.
+
+    gunicorn -c gunicorn.conf.py wsgi:app        (Linux)
+    python wsgi.py                               (Windows / no gunicorn: waitress)
+
+Concurrency model
+-----------------
+Two kinds of traffic share this backend:
+
+- I/O-bound: login, OTP, password reset, employee CRUD, e-mail. Short and
+  mostly waiting on MySQL / SMTP. Served by WSGI *threads*; each request
+  checks out its own pooled DB connection (db_pool.py).
+- CPU-bound: /api/extract-text, /api/extract-text-stream, /api/ocr-image,
+  /api/parse-cmm. Tesseract, PyMuPDF rasterization, openpyxl parsing.
+
+Single pool (default, SERVE_POOL=all): every worker process runs `threads`
+threads, but CPU-bound routes may only occupy CPU_ROUTE_SLOTS of them
+(api.cpu_bound). The remaining threads always stay free for auth traffic,
+so one 200-dpi OCR job no longer blocks logins.
+
+Split pools (SERVE_POOL=cpu / SERVE_POOL=io): run two gunicorn instances
+with the same config on different ports and route by path in the reverse
+proxy, e.g. for nginx:
+
+    location ~ ^/api/(extract-text|ocr-image|parse-cmm) { proxy_pass http://127.0.0.1:5001; }
+    location /api/                                      { proxy_pass http://127.0.0.1:5002; }
+
+  cpu: one process per core, one thread each, long timeout, recycled often
+  io:  few processes, many threads, short timeout
+
+Process pools: each server process spawns its own PDF OCR, CMM sheet and
+batch report pools on first use (process_pools.py). They split one core
+budget, POOL_CORES = cpu_count // SERVE_WORKERS (exported by
+gunicorn.conf.py): half for OCR, a quarter each for the other two. With every
+pool busy in every worker, a host runs about one pool process per core.
+
+Startup: create_app() imports no extraction library and opens no DB
+connection; PyMuPDF, PIL, openpyxl, docx, pytesseract and the MySQL driver
+load on first use (startup_profile.py, breakdown at /api/startup). Under
+gunicorn the app is preloaded in the master, and with WARM_IMPORTS=1 (the
+default for the all/cpu profiles) the deferred libraries and the supplier
+index are loaded there once, so forked and recycled workers start instantly
+and share those pages. The io profile leaves them unloaded: its workers never
+run OCR and stay small. Nothing that owns a socket or a thread is created
+before the fork. Workers are recycled after max_requests (+ jitter) and
+given graceful_timeout to finish in-flight requests, which bounds memory
+growth from PIL / PyMuPDF.
+"""
+
+import os
+
+from api import create_app, warm
+
+app = create_app()
+
+if os.environ.get("WARM_IMPORTS", "0") == "1":
+    warm()
+
+if __name__ == "__main__":
+    # gunicorn does not run on Windows; waitress gives a threaded production server there.
+    from waitress import serve
+
+    serve(
+        app,
+        host=os.environ.get("SERVE_HOST", "0.0.0.0"),
+        port=int(os.environ.get("SERVE_PORT", "5000")),
+        threads=int(os.environ.get("SERVE_THREADS", "16")),
+    )
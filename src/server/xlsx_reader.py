@@ -0,0 +1,306 @@
+# -*- coding: utf-8 -*-
+"""
+Read-only .xlsx/.xlsm reader for the extraction paths (IPS sheets, CMM
+reports, the supplier list): cell values only, nothing kept but the row
+being read.
+
+- Only the parts a read needs are opened: workbook.xml and its rels, the
+  requested sheet, shared strings, and styles.xml (to recognize date cells).
+  The VBA project, drawings and other parts are never decompressed
+- Shared strings are parsed lazily, up to the highest index a cell asks for
+- Sheet XML is streamed from the zip member with xml.etree iterparse, or with
+  lxml's (XLSX_PARSER=lxml, if installed): lxml hands only <row> elements to
+  Python, but reading cells through its element proxies costs more than the
+  events it saves (bench_xlsx_reader.py), so etree is the default
+- Rows match openpyxl's read-only iter_rows(values_only=True) with
+  data_only=True: padded to the sheet's <dimension>, missing rows as empty
+  tuples, cached formula results, dates as datetime
+- Worksheets only; chartsheets are not listed
+- load() picks this reader or openpyxl's read-only mode (XLSX_READER=openpyxl)
+"""
+
+import os
+import posixpath
+import zipfile
+from xml.etree.ElementTree import fromstring, iterparse as _etree_iterparse
+
+try:
+    from lxml.etree import iterparse as _lxml_iterparse
+except ImportError:  # optional
+    _lxml_iterparse = None
+
+from openpyxl.styles.numbers import BUILTIN_FORMATS, is_date_format, is_timedelta_format
+from openpyxl.utils.cell import column_index_from_string, range_boundaries
+from openpyxl.utils.datetime import CALENDAR_MAC_1904, CALENDAR_WINDOWS_1900, from_excel, from_ISO8601
+
+XLSX_READER = os.environ.get("XLSX_READER", "fast").lower()   # fast | openpyxl
+XLSX_PARSER = os.environ.get("XLSX_PARSER", "etree").lower()   # etree | lxml
+
+_MAIN = "{http://schemas.openxmlformats.org/spreadsheetml/2006/main}"
+_REL_NS = "{http://schemas.openxmlformats.org/officeDocument/2006/relationships}"
+_PKG_REL = "{http://schemas.openxmlformats.org/package/2006/relationships}Relationship"
+_ROW, _CELL, _V, _IS, _T, _R = (_MAIN + t for t in ("row", "c", "v", "is", "t", "r"))
+_DIMENSION, _SHEET_DATA, _SI = _MAIN + "dimension", _MAIN + "sheetData", _MAIN + "si"
+
+_DIGITS = "0123456789"
+
+
+def _iterparse(source, tags, container):
+    """
+    Each element in `tags` once it is complete; it is dropped from the tree
+    when the caller moves on. `container` is the tag of their parent
+    (sheetData, sst), so finished elements do not pile up there.
+    """
+    if _lxml_iterparse is not None and XLSX_PARSER == "lxml":
+        # lxml filters the other tags in C
+        for _, el in _lxml_iterparse(source, events=("end",), tag=tags):
+            yield el
+            el.clear()
+            parent = el.getparent()
+            while el.getprevious() is not None:
+                del parent[0]
+    else:
+        parent = None
+        for event, el in _etree_iterparse(source, events=("start", "end")):
+            if event == "start":
+                if el.tag == container:
+                    parent = el
+            elif el.tag in tags:
+                yield el
+                if parent is not None:
+                    parent.clear()   # only the element just handled is left in it
+                else:
+                    el.clear()
+
+
+def _text(el):
+    # plain <t>, or the <t> of each rich-text run; phonetic runs (<rPh>) are not content
+    parts = [child.text or "" if child.tag == _T else child.findtext(_T) or ""
+             for child in el if child.tag in (_T, _R)]
+    return "".join(parts)
+
+
+class _SharedStrings:
+    """xl/sharedStrings.xml, parsed on demand up to the highest index asked for."""
+
+    def __init__(self, archive, part):
+        self._items = []
+        self._fh = archive.open(part) if part else None
+        self._rest = _iterparse(self._fh, (_SI,), _MAIN + "sst") if part else iter(())
+
+    def __getitem__(self, i):
+        items = self._items
+        if i >= len(items):
+            for si in self._rest:
+                items.append(_text(si).replace("x005F_", ""))   # as openpyxl reads them
+                if len(items) > i:
+                    break
+            else:
+                self.close()
+        return items[i]
+
+    def close(self):
+        if self._fh is not None:
+            self._rest.close()
+            self._fh.close()
+            self._fh = None
+
+
+class Workbook:
+    """
+    Read-only workbook over a path or binary file object. Like openpyxl's:
+    sheetnames, wb[name], wb.active, close(); also a context manager.
+    """
+
+    def __init__(self, file):
+        self._archive = zipfile.ZipFile(file)
+        try:
+            self._load()
+        except Exception:
+            self._archive.close()
+            raise
+
+    def _load(self):
+        root_rels = self._rels("_rels/.rels", "")
+        book = next(target for rtype, target in root_rels.values() if rtype.endswith("/officeDocument"))
+        rels = self._rels(posixpath.join(posixpath.dirname(book), "_rels", posixpath.basename(book) + ".rels"),
+                          posixpath.dirname(book))
+        node = fromstring(self._archive.read(book))
+
+        pr = node.find(_MAIN + "workbookPr")
+        date1904 = pr is not None and pr.get("date1904") in ("1", "true")
+        self.epoch = CALENDAR_MAC_1904 if date1904 else CALENDAR_WINDOWS_1900
+
+        self._parts = {}      # sheet name -> worksheet part
+        self._order = []      # every <sheet>, for activeTab
+        for sheet in node.iter(_MAIN + "sheet"):
+            rel = rels.get(sheet.get(_REL_NS + "id"))
+            name = sheet.get("name")
+            self._order.append(name)
+            if rel and rel[0].endswith("/worksheet"):
+                self._parts[name] = rel[1]
+        view = node.find(f"{_MAIN}bookViews/{_MAIN}workbookView")
+        self._active = int(view.get("activeTab", 0)) if view is not None else 0
+
+        by_type = {rtype.rsplit("/", 1)[-1]: target for rtype, target in rels.values()}
+        self._styles_part = by_type.get("styles")
+        self._date_styles = None
+        self._strings = _SharedStrings(self._archive, by_type.get("sharedStrings"))
+
+    def _rels(self, part, base):
+        """{id: (type, part name)} of a .rels part; targets resolved against `base`."""
+        try:
+            node = fromstring(self._archive.read(part))
+        except KeyError:
+            return {}
+        out = {}
+        for rel in node.iter(_PKG_REL):
+            target = rel.get("Target", "")
+            target = target[1:] if target.startswith("/") else posixpath.normpath(posixpath.join(base, target))
+            out[rel.get("Id")] = (rel.get("Type", ""), target)
+        return out
+
+    def date_styles(self):
+        """(date style ids, timedelta style ids) as strings, the way cells carry s="..."."""
+        if self._date_styles is None:
+            dates, deltas = set(), set()
+            if self._styles_part:
+                node = fromstring(self._archive.read(self._styles_part))
+                custom = {int(f.get("numFmtId")): f.get("formatCode")
+                          for f in node.iter(_MAIN + "numFmt")}
+                xfs = node.find(_MAIN + "cellXfs")
+                for idx, xf in enumerate(xfs if xfs is not None else ()):
+                    fmt_id = int(xf.get("numFmtId", 0))
+                    fmt = custom.get(fmt_id, BUILTIN_FORMATS.get(fmt_id))
+                    if fmt and is_date_format(fmt):
+                        dates.add(str(idx))
+                    if fmt and is_timedelta_format(fmt):
+                        deltas.add(str(idx))
+            self._date_styles = (dates, deltas)
+        return self._date_styles
+
+    @property
+    def sheetnames(self):
+        return list(self._parts)
+
+    def __getitem__(self, name):
+        if name not in self._parts:
+            raise KeyError(f"Worksheet {name} does not exist.")
+        return Worksheet(self, name, self._parts[name])
+
+    @property
+    def active(self):
+        if 0 <= self._active < len(self._order) and self._order[self._active] in self._parts:
+            return self[self._order[self._active]]
+        return None
+
+    def close(self):
+        self._strings.close()
+        self._archive.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class Worksheet:
+    def __init__(self, parent, title, part):
+        self.parent = parent
+        self.title = title
+        self._part = part
+
+    def iter_rows(self, values_only=True):
+        """Rows as tuples of values, from row 1 (the reader has no cell objects)."""
+        if not values_only:
+            raise ValueError("xlsx_reader reads values only")
+        wb = self.parent
+        strings = wb._strings
+        col_index = {}
+        max_col = max_row = None
+        dates = None
+        counter = idx = 1
+        with wb._archive.open(self._part) as fh:
+            for el in _iterparse(fh, (_DIMENSION, _ROW), _SHEET_DATA):
+                if el.tag == _DIMENSION:
+                    ref = el.get("ref")
+                    if ref:
+                        _, _, max_col, max_row = range_boundaries(ref)
+                    continue
+
+                r = el.get("r")
+                idx = counter if r is None else int(float(r))
+                if max_row is not None and idx > max_row:
+                    break
+                while counter < idx:   # missing rows
+                    counter += 1
+                    yield (None,) * max_col if max_col else ()
+                if counter > idx:
+                    continue
+                counter += 1
+
+                cells = []
+                column = 0
+                for c in el:
+                    if c.tag != _CELL:
+                        continue
+                    ref = c.get("r")
+                    if ref is None:
+                        column += 1
+                    else:
+                        letters = ref.rstrip(_DIGITS)
+                        column = col_index.get(letters)
+                        if column is None:
+                            column = col_index[letters] = column_index_from_string(letters)
+                    t = c.get("t", "n")
+                    if t == "inlineStr":
+                        inline = c.find(_IS)
+                        value = None if inline is None else _text(inline)
+                    else:
+                        value = c.findtext(_V) or None
+                        if value is None:
+                            pass
+                        elif t == "n":
+                            value = float(value) if "." in value or "E" in value or "e" in value else int(value)
+                            if dates is None:
+                                dates = wb.date_styles()
+                            s = c.get("s", "0")   # unstyled cells use cellXfs[0], as in openpyxl
+                            if dates[0] and s in dates[0]:
+                                try:
+                                    value = from_excel(value, wb.epoch, timedelta=s in dates[1])
+                                except (OverflowError, ValueError):
+                                    value = "#VALUE!"   # openpyxl's error for out-of-range dates
+                        elif t == "s":
+                            value = strings[int(value)]
+                        elif t == "b":
+                            value = bool(int(value))
+                        elif t == "d":
+                            value = from_ISO8601(value)
+                        # "str" (formula text) and "e" (error) stay strings
+                    cells.append((column, value))
+
+                if not cells and not max_col:
+                    yield ()
+                    continue
+                width = max_col or cells[-1][0]
+                row = [None] * width
+                for column, value in cells:
+                    if column <= width:
+                        row[column - 1] = value
+                yield tuple(row)
+
+        if max_row is not None and max_row < idx:
+            for _ in range(counter, max_row + 1):
+                yield (None,) * max_col if max_col else ()
+
+    def __repr__(self):
+        return f"<xlsx_reader.Worksheet {self.title!r}>"
+
+
+def load(file):
+    """Read-only workbook over a path or binary file object, from the reader XLSX_READER selects."""
+    if XLSX_READER == "openpyxl":
+        import openpyxl
+        return openpyxl.load_workbook(file, read_only=True, data_only=True)
+    return Workbook(file)